@@ -8,7 +8,15 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from database import get_db
 from models.schemas import TokenData, User
+from config import settings
+from redis_service import redis_service
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import fnmatch
 import os
+import threading
+import time
 from uuid import UUID
 
 # Configuration
@@ -22,6 +30,208 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # JWT Bearer token
 security = HTTPBearer()
 
+class PrincipalCache:
+    """Short-lived cache of authenticated principals keyed by user_id.
+
+    Entries live in a bounded per-process LRU and, when enabled, are mirrored
+    to Redis so other workers can skip the user/roles lookup as well.
+    Invalidations are broadcast over the near-cache pub/sub channel so every
+    worker drops its local copy, not only the one that made the change.
+    """
+    
+    def __init__(self, max_size: int = 1024, ttl: int = 30, use_redis: bool = False,
+                 key_prefix: str = "auth:principal"):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self.key_prefix = key_prefix
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+    
+    def _redis_key(self, user_id: str) -> str:
+        return f"{self.key_prefix}:{user_id}"
+    
+    @staticmethod
+    def _copy(principal: dict) -> dict:
+        copied = dict(principal)
+        copied["roles"] = list(principal.get("roles") or [])
+        return copied
+    
+    @staticmethod
+    def _from_redis(data: dict) -> dict:
+        """Restore the types lost by JSON serialization in Redis."""
+        principal = dict(data)
+        principal["user_id"] = UUID(str(data["user_id"]))
+        for field in ("created_at", "updated_at"):
+            if isinstance(data.get(field), str):
+                principal[field] = datetime.fromisoformat(data[field])
+        return principal
+    
+    def _store_local(self, user_id: str, principal: dict):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, self._copy(principal))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def get(self, user_id: str) -> Optional[dict]:
+        """Return a copy of the cached principal, or None on a miss."""
+        if not self.enabled:
+            return None
+        
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                expires_at, principal = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(user_id)
+                    return self._copy(principal)
+                del self._entries[user_id]
+        
+        if self.use_redis:
+            cached = redis_service.get(self._redis_key(user_id))
+            if isinstance(cached, dict):
+                try:
+                    principal = self._from_redis(cached)
+                except (KeyError, ValueError):
+                    return None
+                self._store_local(user_id, principal)
+                return self._copy(principal)
+        
+        return None
+    
+    def set(self, user_id: str, principal: dict):
+        """Cache a principal for the configured TTL."""
+        if not self.enabled:
+            return
+        self._store_local(user_id, principal)
+        if self.use_redis:
+            redis_service.set(self._redis_key(user_id), principal, self.ttl)
+    
+    def invalidate(self, user_id) -> None:
+        """Drop a principal after its profile or roles change, in every worker."""
+        user_id = str(user_id)
+        with self._lock:
+            self._entries.pop(user_id, None)
+        if self.use_redis:
+            redis_service.delete(self._redis_key(user_id))
+        redis_service.invalidate_near_cache(keys=[self._redis_key(user_id)])
+    
+    def apply_invalidation(self, keys: List[str], pattern: Optional[str] = None) -> None:
+        """Drop principals invalidated by another worker."""
+        prefix = f"{self.key_prefix}:"
+        with self._lock:
+            for key in keys:
+                if key.startswith(prefix):
+                    self._entries.pop(key[len(prefix):], None)
+            if pattern:
+                for user_id in [user_id for user_id in self._entries if fnmatch.fnmatchcase(self._redis_key(user_id), pattern)]:
+                    del self._entries[user_id]
+    
+    def clear(self) -> None:
+        """Drop every locally cached principal."""
+        with self._lock:
+            self._entries.clear()
+
+# Principal cache used by get_current_user
+principal_cache = PrincipalCache(
+    max_size=settings.get('PRINCIPAL_CACHE_SIZE', 1024),
+    ttl=settings.get('PRINCIPAL_CACHE_TTL', 30),
+    use_redis=settings.get('PRINCIPAL_CACHE_USE_REDIS', False)
+)
+redis_service.add_invalidation_listener(principal_cache.apply_invalidation)
+
+class PasswordHashingPool:
+    """Bounded thread pool for bcrypt work.
+
+    Hashing and verification take 100-300 ms of CPU each, so they are kept off
+    the event loop. When more than ``max_pending`` operations are queued or
+    running, new requests fail fast with 503 instead of piling up.
+    """
+    
+    def __init__(self, max_workers: int = 4, max_pending: int = 32):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "rejected": 0,
+            "total_seconds": 0.0,
+            "peak_pending": 0
+        }
+    
+    def _timed(self, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._stats["completed"] += 1
+                self._stats["total_seconds"] += elapsed
+    
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+    
+    async def run(self, func, *args):
+        """Run ``func(*args)`` on the pool, raising 503 when saturated."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication service is busy, please retry shortly",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+            self._stats["submitted"] += 1
+            self._stats["peak_pending"] = max(self._stats["peak_pending"], self._pending)
+        
+        try:
+            future = self._executor.submit(self._timed, func, *args)
+        except Exception:
+            self._release(None)
+            raise
+        # Release the slot when the worker thread finishes, even if the
+        # awaiting request has been cancelled in the meantime.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+    
+    def get_stats(self) -> dict:
+        """Return queue depth and throughput metrics."""
+        with self._lock:
+            pending = self._pending
+            stats = dict(self._stats)
+        completed = stats["completed"]
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": min(pending, self.max_workers),
+            "queue_depth": max(pending - self.max_workers, 0),
+            "submitted": stats["submitted"],
+            "completed": completed,
+            "rejected": stats["rejected"],
+            "peak_pending": stats["peak_pending"],
+            "avg_duration_ms": round(stats["total_seconds"] / completed * 1000, 2) if completed else 0.0
+        }
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+# Password hashing pool used by the async helpers below
+password_hasher = PasswordHashingPool(
+    max_workers=settings.get('PASSWORD_HASH_WORKERS', 4),
+    max_pending=settings.get('PASSWORD_HASH_MAX_PENDING', 32)
+)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -30,6 +240,14 @@ def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop."""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop."""
+    return await password_hasher.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -57,9 +275,8 @@ def verify_token(token: str) -> Optional[TokenData]:
     except JWTError:
         return None
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[dict]:
-    """Authenticate a user with email and password."""
-    # Get user with roles
+def _get_login_user(db: Session, email: str):
+    """Fetch an active user with password hash and roles by email."""
     query = text("""
         SELECT u.user_id, u.email, u.password_hash, u.first_name, u.last_name,
                u.phone, u.is_active, u.created_at, u.updated_at,
@@ -71,14 +288,9 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[dict]:
                  u.phone, u.is_active, u.created_at, u.updated_at
     """)
     
-    result = db.execute(query, {"email": email}).fetchone()
-    
-    if not result:
-        return None
-        
-    if not verify_password(password, result.password_hash):
-        return None
-        
+    return db.execute(query, {"email": email}).fetchone()
+
+def _login_user_to_dict(result) -> dict:
     return {
         "user_id": result.user_id,
         "email": result.email,
@@ -91,6 +303,30 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[dict]:
         "roles": result.roles
     }
 
+def authenticate_user(db: Session, email: str, password: str) -> Optional[dict]:
+    """Authenticate a user with email and password."""
+    result = _get_login_user(db, email)
+    
+    if not result:
+        return None
+        
+    if not verify_password(password, result.password_hash):
+        return None
+        
+    return _login_user_to_dict(result)
+
+async def authenticate_user_async(db: Session, email: str, password: str) -> Optional[dict]:
+    """Authenticate a user, verifying the password on the hashing pool."""
+    result = _get_login_user(db, email)
+    
+    if not result:
+        return None
+        
+    if not await verify_password_async(password, result.password_hash):
+        return None
+        
+    return _login_user_to_dict(result)
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> dict:
     """Get the current authenticated user."""
     credentials_exception = HTTPException(
@@ -102,6 +338,11 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     token_data = verify_token(credentials.credentials)
     if token_data is None:
         raise credentials_exception
+    
+    user_id = str(token_data.user_id)
+    cached_user = principal_cache.get(user_id)
+    if cached_user is not None:
+        return cached_user
         
     # Get user from database
     query = text("""
@@ -115,12 +356,12 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
                  u.created_at, u.updated_at
     """)
     
-    result = db.execute(query, {"user_id": str(token_data.user_id)}).fetchone()
+    result = db.execute(query, {"user_id": user_id}).fetchone()
     
     if result is None:
         raise credentials_exception
         
-    return {
+    user = {
         "user_id": result.user_id,
         "email": result.email,
         "first_name": result.first_name,
@@ -129,8 +370,11 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         "is_active": result.is_active,
         "created_at": result.created_at,
         "updated_at": result.updated_at,
-        "roles": result.roles
+        "roles": list(result.roles or [])
     }
+    principal_cache.set(user_id, user)
+    
+    return user
 
 def get_current_active_user(current_user: dict = Depends(get_current_user)) -> dict:
     """Get the current active user."""
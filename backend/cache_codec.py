@@ -0,0 +1,241 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+import json
+import logging
+import zlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_MSGPACK = 0x01
+FORMAT_JSON = 0x02
+COMPRESSED = 0x10
+
+# msgpack extension type codes
+EXT_DECIMAL = 1
+EXT_UUID = 2
+EXT_DATETIME = 3
+EXT_DATE = 4
+
+# Tag used for typed values in the JSON format
+TYPE_TAG = "__t"
+
+def _to_plain(value: Any) -> Any:
+    """Dump Pydantic models and tuples so the codecs only see builtin containers"""
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+class Codec(ABC):
+    """Base codec: subclasses implement dumps/loads for one payload format"""
+    
+    name = "base"
+    format_id = 0
+    
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        ...
+    
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        ...
+
+class MsgpackCodec(Codec):
+    """msgpack with extension types for Decimal, UUID, datetime and date"""
+    
+    name = "msgpack"
+    format_id = FORMAT_MSGPACK
+    
+    @staticmethod
+    def _default(value: Any) -> Any:
+        if isinstance(value, Decimal):
+            return msgpack.ExtType(EXT_DECIMAL, str(value).encode())
+        if isinstance(value, UUID):
+            return msgpack.ExtType(EXT_UUID, value.bytes)
+        if isinstance(value, datetime):
+            return msgpack.ExtType(EXT_DATETIME, value.isoformat().encode())
+        if isinstance(value, date):
+            return msgpack.ExtType(EXT_DATE, value.isoformat().encode())
+        plain = _to_plain(value)
+        if plain is not value:
+            return plain
+        return str(value)
+    
+    @staticmethod
+    def _ext_hook(code: int, data: bytes) -> Any:
+        if code == EXT_DECIMAL:
+            return Decimal(data.decode())
+        if code == EXT_UUID:
+            return UUID(bytes=data)
+        if code == EXT_DATETIME:
+            return datetime.fromisoformat(data.decode())
+        if code == EXT_DATE:
+            return date.fromisoformat(data.decode())
+        return msgpack.ExtType(code, data)
+    
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=self._default, use_bin_type=True)
+    
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+class JsonCodec(Codec):
+    """JSON (orjson when installed) with tagged objects for non-JSON types"""
+    
+    name = "json"
+    format_id = FORMAT_JSON
+    
+    _DECODERS: Dict[str, Callable[[str], Any]] = {
+        "decimal": Decimal,
+        "uuid": UUID,
+        "datetime": datetime.fromisoformat,
+        "date": date.fromisoformat,
+    }
+    
+    @classmethod
+    def _tag(cls, value: Any) -> Any:
+        value = _to_plain(value)
+        if isinstance(value, dict):
+            return {str(k): cls._tag(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [cls._tag(v) for v in value]
+        if isinstance(value, Decimal):
+            return {TYPE_TAG: "decimal", "v": str(value)}
+        if isinstance(value, UUID):
+            return {TYPE_TAG: "uuid", "v": str(value)}
+        if isinstance(value, datetime):
+            return {TYPE_TAG: "datetime", "v": value.isoformat()}
+        if isinstance(value, date):
+            return {TYPE_TAG: "date", "v": value.isoformat()}
+        return value
+    
+    @classmethod
+    def _untag(cls, value: Any) -> Any:
+        if isinstance(value, dict):
+            decoder = cls._DECODERS.get(value.get(TYPE_TAG)) if len(value) == 2 else None
+            if decoder is not None and "v" in value:
+                return decoder(value["v"])
+            return {k: cls._untag(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [cls._untag(v) for v in value]
+        return value
+    
+    def dumps(self, value: Any) -> bytes:
+        tagged = self._tag(value)
+        if orjson is not None:
+            return orjson.dumps(tagged, default=str)
+        return json.dumps(tagged, default=str, separators=(",", ":")).encode()
+    
+    def loads(self, data: bytes) -> Any:
+        if orjson is not None:
+            return self._untag(orjson.loads(data))
+        return self._untag(json.loads(data))
+
+CODECS: Dict[str, Callable[[], Codec]] = {
+    "msgpack": MsgpackCodec,
+    "json": JsonCodec,
+}
+
+def get_codec(name: str) -> Codec:
+    """Build a codec by name, falling back to JSON if its library is missing
+    
+    Args:
+        name: Codec name ("msgpack" or "json")
+    
+    Returns:
+        Codec instance
+    """
+    if name == "msgpack" and msgpack is None:
+        logger.warning("msgpack is not installed; falling back to the JSON cache codec")
+        name = "json"
+    if name not in CODECS:
+        raise ValueError(f"Unknown cache codec: {name}")
+    return CODECS[name]()
+
+class ValueSerializer:
+    """Frames codec output with a header byte and compresses large payloads
+    
+    The header byte names the format and whether the payload is
+    zlib-compressed. Header bytes are below 0x20, so values written before
+    codecs existed (plain JSON or ``str`` text) are still recognised and
+    decoded the old way.
+    """
+    
+    def __init__(self, codec: Optional[Codec] = None, compress_threshold: int = 1024,
+                 compress_level: int = 6):
+        self.codec = codec or get_codec("msgpack")
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self._decoders: Dict[int, Codec] = {self.codec.format_id: self.codec}
+    
+    def _decoder(self, format_id: int) -> Codec:
+        """Codec for a stored format, so values written by another codec still decode"""
+        if format_id not in self._decoders:
+            name = "msgpack" if format_id == FORMAT_MSGPACK else "json"
+            self._decoders[format_id] = get_codec(name)
+        return self._decoders[format_id]
+    
+    def dumps(self, value: Any) -> bytes:
+        """Encode a value for storage
+        
+        Args:
+            value: Value to encode
+        
+        Returns:
+            Header byte followed by the (possibly compressed) payload
+        """
+        payload = self.codec.dumps(value)
+        header = self.codec.format_id
+        if self.compress_threshold > 0 and len(payload) >= self.compress_threshold:
+            compressed = zlib.compress(payload, self.compress_level)
+            if len(compressed) < len(payload):
+                payload = compressed
+                header |= COMPRESSED
+        return bytes([header]) + payload
+    
+    def loads(self, data: Any) -> Any:
+        """Decode a stored value
+        
+        Args:
+            data: Bytes read from Redis
+        
+        Returns:
+            Decoded value
+        """
+        if isinstance(data, str):
+            data = data.encode()
+        if not data:
+            return ""
+        
+        header = data[0]
+        format_id = header & ~COMPRESSED
+        if format_id not in (FORMAT_MSGPACK, FORMAT_JSON):
+            return self._loads_legacy(data)
+        
+        payload = data[1:]
+        if header & COMPRESSED:
+            payload = zlib.decompress(payload)
+        return self._decoder(format_id).loads(payload)
+    
+    @staticmethod
+    def _loads_legacy(data: bytes) -> Any:
+        """Decode a value written as plain JSON or text before codecs existed"""
+        text = data.decode("utf-8", errors="replace")
+        try:
+            return json.loads(text)
+        except (json.JSONDecodeError, TypeError):
+            return text
@@ -133,6 +133,17 @@ def create_all_tables():
             )
         """))
         
+        # document_blobs table (content-addressed files shared by documents)
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS document_blobs (
+                sha256 TEXT PRIMARY KEY,
+                file_path TEXT NOT NULL,
+                file_size BIGINT NOT NULL,
+                ref_count INTEGER NOT NULL DEFAULT 0 CHECK (ref_count >= 0),
+                created_at TIMESTAMPTZ DEFAULT now()
+            )
+        """))
+        
         # documents table
         conn.execute(text("""
             CREATE TABLE IF NOT EXISTS documents (
@@ -145,10 +156,18 @@ def create_all_tables():
                 file_path TEXT NOT NULL,
                 file_size BIGINT,
                 mime_type TEXT,
+                file_hash TEXT REFERENCES document_blobs(sha256),
                 is_draft BOOLEAN DEFAULT TRUE,
+                uploaded_at TIMESTAMPTZ DEFAULT now(),
                 created_at TIMESTAMPTZ DEFAULT now()
             )
         """))
+        conn.execute(text("""
+            ALTER TABLE documents ADD COLUMN IF NOT EXISTS uploaded_at TIMESTAMPTZ DEFAULT now()
+        """))
+        conn.execute(text("""
+            ALTER TABLE documents ADD COLUMN IF NOT EXISTS file_hash TEXT REFERENCES document_blobs(sha256)
+        """))
         
         # 5) Tasks and History
         print("Creating task-related tables...")
@@ -217,12 +236,18 @@ def create_all_tables():
             'CREATE INDEX IF NOT EXISTS idx_docs_land ON documents(land_id)',
             'CREATE INDEX IF NOT EXISTS idx_docs_section ON documents(land_section_id)',
             'CREATE INDEX IF NOT EXISTS idx_docs_uploader ON documents(uploaded_by)',
+            'CREATE INDEX IF NOT EXISTS idx_docs_hash ON documents(file_hash)',
             'CREATE INDEX IF NOT EXISTS idx_tasks_land ON tasks(land_id)',
             'CREATE INDEX IF NOT EXISTS idx_tasks_assigned_to ON tasks(assigned_to)',
             'CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status)',
             'CREATE INDEX IF NOT EXISTS idx_task_history_task ON task_history(task_id)',
             'CREATE INDEX IF NOT EXISTS idx_task_history_period ON task_history(start_ts, end_ts)',
-            'CREATE INDEX IF NOT EXISTS idx_interest_land ON investor_interests(land_id)'
+            'CREATE INDEX IF NOT EXISTS idx_interest_land ON investor_interests(land_id)',
+            'CREATE INDEX IF NOT EXISTS idx_lands_created_keyset ON lands(created_at DESC, land_id DESC)',
+            'CREATE INDEX IF NOT EXISTS idx_tasks_created_keyset ON tasks(created_at DESC, task_id DESC)',
+            'CREATE INDEX IF NOT EXISTS idx_interest_created_keyset ON investor_interests(created_at DESC, interest_id DESC)',
+            'CREATE INDEX IF NOT EXISTS idx_docs_uploaded_keyset ON documents(uploaded_at DESC, document_id DESC)',
+            'CREATE INDEX IF NOT EXISTS idx_user_created_keyset ON "user"(created_at DESC, user_id DESC)'
         ]
         
         for index_sql in indexes:
@@ -393,7 +418,7 @@ def create_all_tables():
         """))
         
         conn.commit()
-        print("\n✅ Successfully created all 13 tables with indexes, triggers, and seed data!")
+        print("\n✅ Successfully created all 14 tables with indexes, triggers, and seed data!")
         
         # Verify tables were created
         result = conn.execute(text("""
@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from config import settings
 from typing import Optional
 from uuid import UUID
@@ -20,6 +21,26 @@ engine = create_engine(
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def get_async_database_url(url: str) -> str:
+    """Convert a sync PostgreSQL URL into its asyncpg equivalent."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+# Async engine for read-heavy endpoints so DB waits don't block the event loop
+ASYNC_DATABASE_URL = settings.get('ASYNC_DATABASE_URL', None) or get_async_database_url(DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=settings.get('DATABASE_ECHO', False),
+    pool_size=settings.get('DATABASE_POOL_SIZE', 10),
+    max_overflow=settings.get('DATABASE_MAX_OVERFLOW', 20),
+    pool_pre_ping=True
+)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Create Base class
 Base = declarative_base()
 
@@ -31,6 +52,11 @@ def get_db():
     finally:
         db.close()
 
+# Dependency to get async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Helper function to get user by email (for auth compatibility)
 def get_user_by_email(db: Session, email: str) -> Optional[dict]:
     """Get user by email address."""
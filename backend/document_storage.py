@@ -0,0 +1,558 @@
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+import zipfile
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# Uploads are read and written in large blocks so each threadpool hop
+# moves a meaningful amount of data
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Bundled files worth deflating; PDFs, images and .docx are already compressed
+COMPRESSIBLE_EXTENSIONS = {".txt", ".doc", ".tiff"}
+
+class StoredFile(NamedTuple):
+    """A file written by stream_upload"""
+    path: Path
+    size: int
+    sha256: str
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large. Maximum size: {max_size // (1024*1024)}MB"
+    )
+
+def _open_temp(directory: Path) -> tuple[Path, BinaryIO]:
+    """Create a temporary file next to the destination so the final rename is atomic"""
+    directory.mkdir(parents=True, exist_ok=True)
+    temp_path = directory / f".{uuid.uuid4().hex}.part"
+    return temp_path, open(temp_path, "wb")
+
+def _write_chunk(buffer: BinaryIO, hasher, chunk: bytes):
+    hasher.update(chunk)
+    buffer.write(chunk)
+
+def _commit(buffer: BinaryIO, temp_path: Path, dest: Path):
+    buffer.close()
+    os.replace(temp_path, dest)
+
+def _discard(buffer: BinaryIO, temp_path: Path):
+    buffer.close()
+    temp_path.unlink(missing_ok=True)
+
+async def stream_upload(
+    file: UploadFile,
+    dest: Path,
+    max_size: int,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> StoredFile:
+    """
+    Stream an upload to disk without blocking the event loop.
+    
+    The body is hashed while it is written to a temporary file, which is
+    renamed onto ``dest`` only once the whole upload has been received, so
+    readers never see a partial file. Blocking file I/O and hashing run in
+    the threadpool.
+    
+    Args:
+        file: Uploaded file
+        dest: Final path of the file
+        max_size: Maximum size in bytes
+        chunk_size: Bytes read and written per step
+    
+    Returns:
+        StoredFile: Path, size and SHA-256 hex digest of the written file
+    
+    Raises:
+        HTTPException: 413 if the upload is larger than ``max_size``
+    """
+    # The form parser has already spooled the upload by now; this only
+    # saves copying it. Reject on Content-Length to avoid receiving it.
+    if file.size is not None and file.size > max_size:
+        raise _too_large(max_size)
+    
+    temp_path, buffer = await run_in_threadpool(_open_temp, dest.parent)
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        while chunk := await file.read(chunk_size):
+            size += len(chunk)
+            if size > max_size:
+                raise _too_large(max_size)
+            await run_in_threadpool(_write_chunk, buffer, hasher, chunk)
+        await run_in_threadpool(_commit, buffer, temp_path, dest)
+    except BaseException:
+        # Also runs on cancellation, so clean up without awaiting
+        _discard(buffer, temp_path)
+        raise
+    
+    return StoredFile(dest, size, hasher.hexdigest())
+
+class BlobStore:
+    """Content-addressed document files with reference counts
+    
+    Files are stored once per SHA-256 under ``<root>/ab/cd/<sha256>`` and
+    counted in the ``document_blobs`` table. Uploads are first received
+    into ``<root>/incoming``; ``store_file`` and ``release`` then run inside
+    the caller's transaction, and ``purge`` removes a blob left without
+    references once that transaction has committed. Files are only moved
+    into place or removed while holding the blob row lock, and never before
+    the references to them are committed away, so concurrent uploads,
+    deletes and rollbacks cannot leave a document pointing at a missing
+    file. The steps and their commit are blocking; callers run them in one
+    threadpool call so the row lock is never held across an await.
+    """
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+    
+    def blob_path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+    
+    def _add_reference(self, db: Session, sha256: str, size: int) -> Path:
+        path = self.blob_path(sha256)
+        db.execute(text("""
+            INSERT INTO document_blobs (sha256, file_path, file_size, ref_count)
+            VALUES (:sha256, :file_path, :file_size, 1)
+            ON CONFLICT (sha256) DO UPDATE SET ref_count = document_blobs.ref_count + 1
+        """), {"sha256": sha256, "file_path": str(path), "file_size": size})
+        return path
+    
+    async def receive(self, file: UploadFile, max_size: int) -> StoredFile:
+        """
+        Stream an upload into the blob store's incoming directory, hashing it.
+        
+        Args:
+            file: Uploaded file
+            max_size: Maximum size in bytes
+        
+        Returns:
+            StoredFile: The received file, to be passed to ``store_file``
+        """
+        return await stream_upload(file, self.root / "incoming" / uuid.uuid4().hex, max_size)
+    
+    def store_file(self, db: Session, source: Path, size: int, sha256: str) -> tuple[StoredFile, bool]:
+        """
+        Add a reference to the blob holding an already hashed local file.
+        
+        A new blob is moved into place with a rename; if the content is
+        already stored, ``source`` is left for the caller to remove.
+        
+        Args:
+            db: Database session (not committed)
+            source: File on the same filesystem as the blob store
+            size: File size in bytes
+            sha256: File hash
+        
+        Returns:
+            tuple: The stored blob and whether ``source`` was moved into it
+        """
+        path = self._add_reference(db, sha256, size)
+        if path.exists():
+            return StoredFile(path, size, sha256), False
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, path)
+        return StoredFile(path, size, sha256), True
+    
+    def release(self, db: Session, sha256: str) -> bool:
+        """
+        Drop a reference to a blob.
+        
+        The row is kept at zero references and the file left in place, so
+        rolling back can never restore a reference to a removed file; call
+        ``purge`` after committing to remove an unreferenced blob.
+        
+        Args:
+            db: Database session (not committed)
+            sha256: Blob hash
+        
+        Returns:
+            bool: True if the blob has no references left
+        """
+        row = db.execute(text("""
+            UPDATE document_blobs SET ref_count = ref_count - 1
+            WHERE sha256 = :sha256
+            RETURNING ref_count
+        """), {"sha256": sha256}).fetchone()
+        
+        return row is not None and row.ref_count <= 0
+    
+    def purge(self, db: Session, sha256: str) -> bool:
+        """
+        Remove a blob if it still has no references, and commit.
+        
+        The row is deleted only while unreferenced, and the file is removed
+        while that row is locked, so an upload of the same content waiting
+        on the lock writes the file again. If this fails, the unreferenced
+        row and file are left for a later upload to reuse.
+        
+        Args:
+            db: Database session with nothing else pending
+            sha256: Blob hash
+        
+        Returns:
+            bool: True if the blob was removed
+        """
+        try:
+            row = db.execute(text("""
+                DELETE FROM document_blobs
+                WHERE sha256 = :sha256 AND ref_count <= 0
+                RETURNING file_path
+            """), {"sha256": sha256}).fetchone()
+            if row is not None:
+                Path(row.file_path).unlink(missing_ok=True)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not purge unreferenced blob {sha256}: {e}")
+            return False
+        return row is not None
+
+def _pwrite_all(fd: int, data: bytes, offset: int):
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+class ResumableUploads:
+    """Chunked uploads that survive dropped connections
+    
+    A session fixes the file size and chunk size up front. Chunk ``i``
+    covers bytes ``[i * chunk_size, (i + 1) * chunk_size)`` and may be sent
+    in any order and retried any number of times; only chunks received in
+    full are recorded. Partial state lives on disk next to the data
+    (``<id>.part``, ``<id>.json`` with the session and an append-only
+    ``<id>.chunks`` log) so it survives restarts; the session is also
+    cached in Redis when available so lookups skip the disk.
+    """
+    
+    def __init__(self, root: str, chunk_size: int, max_size: int, ttl: int,
+                 redis=None, key_prefix: str = "upload:session"):
+        self.root = Path(root)
+        self.chunk_size = chunk_size
+        self.max_size = max_size
+        self.ttl = ttl
+        self.redis = redis
+        self.key_prefix = key_prefix
+    
+    def data_path(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.part"
+    
+    def _meta_path(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.json"
+    
+    def _log_path(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.chunks"
+    
+    def _claim_path(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.completing"
+    
+    def _key(self, upload_id: str) -> str:
+        return f"{self.key_prefix}:{upload_id}"
+    
+    @staticmethod
+    def total_chunks(session: Dict[str, Any]) -> int:
+        return -(-session["total_size"] // session["chunk_size"])
+    
+    def create(self, land_id: str, user_id: str, document_type: str, file_name: str,
+               total_size: int, sha256: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Start an upload session with a preallocated (sparse) data file.
+        
+        Args:
+            land_id: Land the document belongs to
+            user_id: Uploading user
+            document_type: Type of document
+            file_name: Original file name
+            total_size: File size in bytes
+            sha256: Expected hash of the whole file, checked on completion
+        
+        Returns:
+            dict: The session
+        """
+        if total_size > self.max_size:
+            raise _too_large(self.max_size)
+        
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.purge_expired()
+        
+        session = {
+            "upload_id": uuid.uuid4().hex,
+            "land_id": land_id,
+            "user_id": user_id,
+            "document_type": document_type,
+            "file_name": file_name,
+            "total_size": total_size,
+            "chunk_size": self.chunk_size,
+            "sha256": sha256,
+            "expires_at": time.time() + self.ttl
+        }
+        upload_id = session["upload_id"]
+        with open(self.data_path(upload_id), "wb") as f:
+            f.truncate(total_size)
+        self._log_path(upload_id).touch()
+        
+        temp_path = self._meta_path(upload_id).with_suffix(".json.tmp")
+        temp_path.write_text(json.dumps(session))
+        os.replace(temp_path, self._meta_path(upload_id))
+        
+        if self.redis is not None:
+            self.redis.set(self._key(upload_id), session, expire=self.ttl)
+        return session
+    
+    def get(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a session, from Redis first and then from disk.
+        
+        Args:
+            upload_id: Upload session ID
+        
+        Returns:
+            The session, or None if it does not exist or has expired
+        """
+        if not upload_id.isalnum():
+            return None
+        
+        session = self.redis.get(self._key(upload_id)) if self.redis is not None else None
+        if session is None:
+            try:
+                session = json.loads(self._meta_path(upload_id).read_text())
+            except (OSError, ValueError):
+                return None
+            remaining = int(session["expires_at"] - time.time())
+            if self.redis is not None and remaining > 0:
+                self.redis.set(self._key(upload_id), session, expire=remaining)
+        
+        if session["expires_at"] <= time.time():
+            self.discard(upload_id)
+            return None
+        return session
+    
+    def received_chunks(self, upload_id: str) -> Set[int]:
+        try:
+            return {int(line) for line in self._log_path(upload_id).read_text().split()}
+        except OSError:
+            return set()
+    
+    def missing_chunks(self, session: Dict[str, Any]) -> List[int]:
+        received = self.received_chunks(session["upload_id"])
+        return [index for index in range(self.total_chunks(session)) if index not in received]
+    
+    async def write_chunk(self, session: Dict[str, Any], index: int, offset: int,
+                          body: AsyncIterator[bytes]) -> int:
+        """
+        Write one chunk at its offset, streaming the request body.
+        
+        The chunk is recorded as received only after every byte has been
+        written, so an interrupted chunk is simply sent again.
+        
+        Args:
+            session: Upload session
+            index: Chunk number
+            offset: Byte offset of the chunk; must equal ``index * chunk_size``
+            body: Chunk bytes
+        
+        Returns:
+            int: Number of bytes written
+        
+        Raises:
+            HTTPException: 400 if the index, offset or length is wrong
+        """
+        chunk_size = session["chunk_size"]
+        if not 0 <= index < self.total_chunks(session) or offset != index * chunk_size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Chunk {index} must start at offset {index * chunk_size}"
+            )
+        expected = min(chunk_size, session["total_size"] - offset)
+        
+        upload_id = session["upload_id"]
+        fd = await run_in_threadpool(os.open, self.data_path(upload_id), os.O_WRONLY)
+        written = 0
+        pending = bytearray()
+        try:
+            async for block in body:
+                if written + len(pending) + len(block) > expected:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Chunk {index} must be {expected} bytes"
+                    )
+                pending += block
+                # Request bodies arrive in small blocks; write in large ones
+                if len(pending) >= UPLOAD_CHUNK_SIZE:
+                    await run_in_threadpool(_pwrite_all, fd, bytes(pending), offset + written)
+                    written += len(pending)
+                    pending.clear()
+            if pending:
+                await run_in_threadpool(_pwrite_all, fd, bytes(pending), offset + written)
+                written += len(pending)
+        finally:
+            os.close(fd)
+        
+        if written != expected:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Chunk {index} must be {expected} bytes"
+            )
+        
+        await run_in_threadpool(self._record_chunk, upload_id, index)
+        return written
+    
+    def _record_chunk(self, upload_id: str, index: int):
+        # O_APPEND keeps concurrent chunk records from interleaving
+        fd = os.open(self._log_path(upload_id), os.O_WRONLY | os.O_APPEND)
+        try:
+            os.write(fd, f"{index}\n".encode())
+        finally:
+            os.close(fd)
+    
+    def claim(self, upload_id: str) -> bool:
+        """
+        Atomically take a session for completion.
+        
+        The session file is renamed away, so exactly one of several
+        concurrent or retried completions wins and the session can no
+        longer be looked up.
+        
+        Args:
+            upload_id: Upload session ID
+        
+        Returns:
+            bool: False if the session was already claimed
+        """
+        try:
+            os.rename(self._meta_path(upload_id), self._claim_path(upload_id))
+        except FileNotFoundError:
+            return False
+        if self.redis is not None:
+            self.redis.delete(self._key(upload_id))
+        return True
+    
+    def is_claimed(self, upload_id: str) -> bool:
+        return upload_id.isalnum() and self._claim_path(upload_id).exists()
+    
+    def release_claim(self, upload_id: str):
+        """Make a claimed session available again after a failed completion"""
+        try:
+            os.rename(self._claim_path(upload_id), self._meta_path(upload_id))
+        except FileNotFoundError:
+            pass
+    
+    def hash_data(self, upload_id: str) -> tuple[int, str]:
+        """Size and SHA-256 of the assembled data file"""
+        hasher = hashlib.sha256()
+        size = 0
+        with open(self.data_path(upload_id), "rb") as f:
+            while block := f.read(UPLOAD_CHUNK_SIZE):
+                size += len(block)
+                hasher.update(block)
+        return size, hasher.hexdigest()
+    
+    def discard(self, upload_id: str):
+        """Remove everything belonging to a session"""
+        for path in (self.data_path(upload_id), self._log_path(upload_id),
+                     self._meta_path(upload_id), self._claim_path(upload_id)):
+            path.unlink(missing_ok=True)
+        if self.redis is not None:
+            self.redis.delete(self._key(upload_id))
+    
+    def purge_expired(self) -> int:
+        """
+        Remove sessions past their expiry.
+        
+        Returns:
+            int: Number of sessions removed
+        """
+        now = time.time()
+        purged = 0
+        # Claimed sessions whose completion never finished expire too
+        for meta_path in [*self.root.glob("*.json"), *self.root.glob("*.completing")]:
+            try:
+                expired = json.loads(meta_path.read_text())["expires_at"] <= now
+            except (OSError, ValueError, KeyError):
+                continue
+            if expired:
+                self.discard(meta_path.stem)
+                purged += 1
+        if purged:
+            logger.info(f"Purged {purged} expired upload sessions")
+        return purged
+
+class _ZipSink:
+    """Write-only, non-seekable file object collecting ZIP output between yields
+    
+    Without ``tell``/``seek`` zipfile writes each entry's sizes in a data
+    descriptor after its data, which is what makes streaming possible.
+    """
+    
+    def __init__(self):
+        self.buffer = bytearray()
+    
+    def write(self, data) -> int:
+        self.buffer += data
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+def stream_zip(entries: Iterable[tuple[str, Path]], chunk_size: int = UPLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Generate a ZIP archive of files on the fly.
+    
+    Files are read in ``chunk_size`` blocks and each block is yielded as
+    soon as it is compressed, so memory use does not depend on the number
+    or size of the files and nothing is written to disk. Files that have
+    gone missing are skipped.
+    
+    Args:
+        entries: Archive names and the files to store under them
+        chunk_size: Bytes read per step
+    
+    Yields:
+        bytes: Consecutive parts of the archive
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w") as archive:
+        for name, path in entries:
+            try:
+                source = open(path, "rb")
+            except FileNotFoundError:
+                logger.warning(f"Skipping missing file {path} in ZIP bundle")
+                continue
+            
+            with source:
+                stat_result = os.fstat(source.fileno())
+                info = zipfile.ZipInfo(name, date_time=time.localtime(stat_result.st_mtime)[:6])
+                info.file_size = stat_result.st_size
+                if Path(name).suffix.lower() in COMPRESSIBLE_EXTENSIONS:
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                
+                with archive.open(info, "w", force_zip64=stat_result.st_size >= zipfile.ZIP64_LIMIT) as dest:
+                    while block := source.read(chunk_size):
+                        dest.write(block)
+                        if sink.buffer:
+                            yield sink.drain()
+            if sink.buffer:
+                yield sink.drain()
+    
+    # Central directory
+    yield sink.drain()
@@ -0,0 +1,811 @@
+from bisect import bisect_right
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Log lines written by logs.setup_logging start with "YYYY-MM-DD HH:MM:SS";
+# structured (JSON lines) records start with '{"ts":"YYYY-MM-DD HH:MM:SS"'
+TIMESTAMP_LENGTH = 19
+JSON_PREFIX = '{"ts":"'
+READ_BLOCK_SIZE = 64 * 1024
+
+def parse_timestamp(line) -> Optional[datetime]:
+    """Parse the leading timestamp of a log line without a regex
+    
+    Args:
+        line: Log line (str or bytes)
+    
+    Returns:
+        Timestamp, or None if the line does not start with one
+    """
+    head = line[:len(JSON_PREFIX) + TIMESTAMP_LENGTH]
+    if isinstance(head, bytes):
+        head = head.decode("ascii", errors="replace")
+    if head.startswith(JSON_PREFIX):
+        head = head[len(JSON_PREFIX):]
+    if len(head) < TIMESTAMP_LENGTH or head[4] != "-" or head[10] != " " or head[13] != ":":
+        return None
+    try:
+        return datetime(
+            int(head[0:4]), int(head[5:7]), int(head[8:10]),
+            int(head[11:13]), int(head[14:16]), int(head[17:19])
+        )
+    except ValueError:
+        return None
+
+def decode_json_line(line: str) -> Optional[Dict[str, Any]]:
+    """Decode a structured (JSON lines) log record
+    
+    Args:
+        line: Log line
+    
+    Returns:
+        Decoded record, or None if the line is not a JSON record
+    """
+    if not line.startswith("{"):
+        return None
+    try:
+        record = orjson.loads(line) if orjson is not None else json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Replace a file through a temp file private to this process
+    
+    The temp file is created next to path so the rename stays on one
+    filesystem, and it is removed again if writing or renaming fails.
+    
+    Args:
+        path: File to replace
+        data: New contents
+    """
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+def _sortable_seconds(timestamp: datetime) -> int:
+    """Naive timestamp as whole seconds, ordered like the datetime itself"""
+    return timestamp.toordinal() * 86400 + timestamp.hour * 3600 + timestamp.minute * 60 + timestamp.second
+
+def read_lines_reverse(path: Path, end_offset: Optional[int] = None,
+                       block_size: int = READ_BLOCK_SIZE) -> Iterator[Tuple[int, str]]:
+    """Yield the lines of a file from last to first, reading fixed-size blocks
+    
+    Args:
+        path: File to read
+        end_offset: Byte offset to start reading backwards from (defaults to EOF)
+        block_size: Bytes read per seek
+    
+    Yields:
+        (byte offset of the line, line text without the newline)
+    """
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END) if end_offset is None else end_offset
+        remainder = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            chunk = f.read(read_size) + remainder
+            lines = chunk.split(b"\n")
+            # The first piece may be the tail of a line that starts in an earlier block
+            remainder = lines.pop(0)
+            offset = position + len(chunk)
+            for line in reversed(lines):
+                offset -= len(line) + 1
+                if line.strip():
+                    yield offset + 1, line.decode("utf-8", errors="replace").rstrip("\r")
+        if remainder.strip():
+            yield 0, remainder.decode("utf-8", errors="replace").rstrip("\r")
+
+class LogOffsetIndex:
+    """Sidecar index from timestamps to byte offsets in an append-only log
+    
+    Stored next to the log as ``<name>.idx``: a header with a fingerprint of
+    the file's first line and the number of bytes indexed, then
+    ``(seconds, offset)`` entries. An entry is added at the first line of a
+    new second once ``stride`` bytes have passed since the previous entry, so
+    every line after an entry's offset is at least as new as the entry. The
+    index is extended incrementally; a changed fingerprint or a shrunk file
+    (rotation) rebuilds it from scratch.
+    """
+    
+    MAGIC = b"LIDX"
+    HEADER = struct.Struct("<4s8sQ")
+    ENTRY = struct.Struct("<qQ")
+    FINGERPRINT_BYTES = 256
+    
+    def __init__(self, log_path: Path, stride: int = READ_BLOCK_SIZE):
+        self.log_path = Path(log_path)
+        self.index_path = self.log_path.with_name(self.log_path.name + ".idx")
+        self.stride = stride
+        self.fingerprint = b""
+        self.indexed_size = 0
+        self.seconds: List[int] = []
+        self.offsets: List[int] = []
+        self._lock = threading.Lock()
+        self._load()
+    
+    def _load(self) -> None:
+        try:
+            data = self.index_path.read_bytes()
+        except OSError:
+            return
+        if len(data) < self.HEADER.size:
+            return
+        magic, fingerprint, indexed_size = self.HEADER.unpack_from(data)
+        if magic != self.MAGIC:
+            return
+        self.fingerprint, self.indexed_size = fingerprint, indexed_size
+        for seconds, offset in self.ENTRY.iter_unpack(data[self.HEADER.size:]):
+            self.seconds.append(seconds)
+            self.offsets.append(offset)
+    
+    def _save(self) -> None:
+        payload = bytearray(self.HEADER.pack(self.MAGIC, self.fingerprint, self.indexed_size))
+        for entry in zip(self.seconds, self.offsets):
+            payload += self.ENTRY.pack(*entry)
+        try:
+            _write_atomic(self.index_path, bytes(payload))
+        except OSError as e:
+            logger.warning(f"Could not write log index {self.index_path}: {e}")
+    
+    def _reset(self, fingerprint: bytes) -> None:
+        self.fingerprint = fingerprint
+        self.indexed_size = 0
+        self.seconds, self.offsets = [], []
+    
+    def refresh(self) -> None:
+        """Index lines appended since the last refresh"""
+        with self._lock:
+            try:
+                size = self.log_path.stat().st_size
+                with open(self.log_path, "rb") as f:
+                    first_line = f.readline(self.FINGERPRINT_BYTES)
+                    fingerprint = hashlib.blake2b(first_line, digest_size=8).digest()
+                    if fingerprint != self.fingerprint or size < self.indexed_size:
+                        self._reset(fingerprint)
+                    if size == self.indexed_size:
+                        return
+                    
+                    f.seek(self.indexed_size)
+                    offset = self.indexed_size
+                    last_offset = self.offsets[-1] if self.offsets else -self.stride
+                    last_seconds = self.seconds[-1] if self.seconds else None
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break
+                        timestamp = parse_timestamp(line)
+                        if timestamp is not None:
+                            seconds = _sortable_seconds(timestamp)
+                            if seconds != last_seconds and offset - last_offset >= self.stride:
+                                self.seconds.append(seconds)
+                                self.offsets.append(offset)
+                                last_offset = offset
+                            last_seconds = seconds
+                        offset += len(line)
+                    self.indexed_size = offset
+                    self.fingerprint = fingerprint
+            except OSError as e:
+                logger.warning(f"Could not index log file {self.log_path}: {e}")
+                return
+            self._save()
+    
+    def offset_after(self, end_time: datetime) -> Optional[int]:
+        """Byte offset from which every line is newer than end_time
+        
+        Args:
+            end_time: Upper bound of a time-range query
+        
+        Returns:
+            Offset to start a reverse scan from, or None to start at EOF
+        """
+        position = bisect_right(self.seconds, _sortable_seconds(end_time))
+        if position < len(self.offsets):
+            return self.offsets[position]
+        return None
+
+_indexes: Dict[Path, LogOffsetIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_offset_index(log_path: Path) -> LogOffsetIndex:
+    """Shared, refreshed offset index for a log file"""
+    key = Path(log_path).resolve()
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = LogOffsetIndex(key)
+    index.refresh()
+    return index
+
+class LogFilter:
+    """Query filters, checked against the raw timestamp before a line is parsed"""
+    
+    def __init__(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                 level: Optional[str] = None, source: Optional[str] = None, message: Optional[str] = None):
+        self.start = start
+        self.end = end
+        self.level = level.upper() if level else None
+        self.source = source.lower() if source else None
+        self.message = message.lower() if message else None
+    
+    def overlaps(self, first: Optional[datetime], last: Optional[datetime]) -> bool:
+        """Whether a segment spanning first..last can hold matching lines (None = unbounded)"""
+        if self.start and last and last < self.start:
+            return False
+        if self.end and first and first > self.end:
+            return False
+        return True
+    
+    def matches(self, entry) -> bool:
+        if self.start and entry.timestamp < self.start:
+            return False
+        if self.end and entry.timestamp > self.end:
+            return False
+        if self.level and entry.level.upper() != self.level:
+            return False
+        if self.source and self.source not in entry.source.lower():
+            return False
+        if self.message and self.message not in entry.message.lower():
+            return False
+        return True
+
+def _parse_entry(parse: Callable, line: str):
+    try:
+        return parse(line)
+    except Exception:
+        # Skip malformed log lines
+        return None
+
+def query_log(path: Path, parse: Callable, start: Optional[datetime] = None, end: Optional[datetime] = None,
+              level: Optional[str] = None, source: Optional[str] = None, message: Optional[str] = None,
+              limit: int = 100, use_index: bool = True) -> Tuple[list, bool]:
+    """Newest-first log query that stops as soon as enough entries match
+    
+    The file is read backwards; with an ``end`` bound the reverse scan
+    starts at the offset from the sidecar index, and it stops at the first
+    timestamped line older than ``start``. Lines are parsed only after the
+    cheap timestamp check passes.
+    
+    Args:
+        path: Log file
+        parse: Function turning a line into a LogEntry
+        start: Oldest timestamp to include
+        end: Newest timestamp to include
+        level: Level to match (case-insensitive)
+        source: Substring of the entry source (case-insensitive)
+        message: Substring of the message (case-insensitive)
+        limit: Maximum number of entries to return
+        use_index: Whether to seek with the sidecar index
+    
+    Returns:
+        (matching entries, whether more matches exist beyond limit)
+    """
+    return _query_plain(path, parse, LogFilter(start, end, level, source, message), limit, use_index)
+
+def _query_plain(path: Path, parse: Callable, log_filter: LogFilter, limit: int,
+                 use_index: bool = True) -> Tuple[list, bool]:
+    end_offset = get_offset_index(path).offset_after(log_filter.end) if log_filter.end and use_index else None
+    entries = []
+    for _, line in read_lines_reverse(path, end_offset):
+        timestamp = parse_timestamp(line)
+        if timestamp is not None:
+            if log_filter.start and timestamp < log_filter.start:
+                break
+            if log_filter.end and timestamp > log_filter.end:
+                continue
+        
+        entry = _parse_entry(parse, line)
+        if entry is None or not log_filter.matches(entry):
+            continue
+        if len(entries) == limit:
+            return entries, True
+        entries.append(entry)
+    return entries, False
+
+def _query_compressed(path: Path, parse: Callable, log_filter: LogFilter, limit: int) -> Tuple[list, bool]:
+    """Newest matches of a gzipped segment (read forward, keeping only the last limit + 1)"""
+    matches = deque(maxlen=limit + 1)
+    with gzip.open(path, "rb") as f:
+        for raw in f:
+            timestamp = parse_timestamp(raw)
+            if timestamp is not None:
+                if log_filter.start and timestamp < log_filter.start:
+                    continue
+                if log_filter.end and timestamp > log_filter.end:
+                    break
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            if not line.strip():
+                continue
+            entry = _parse_entry(parse, line)
+            if entry is not None and log_filter.matches(entry):
+                matches.append(entry)
+    entries = list(reversed(matches))
+    return entries[:limit], len(entries) > limit
+
+def open_segment(path: Path):
+    """Open a log segment for binary reading, decompressing .gz segments"""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+def _line_fingerprint(path: Path) -> Optional[str]:
+    """Hash of a segment's first line; it stays the same when the segment is rotated or compressed"""
+    try:
+        with open_segment(path) as f:
+            return hashlib.blake2b(f.readline(LogOffsetIndex.FINGERPRINT_BYTES), digest_size=8).hexdigest()
+    except OSError:
+        return None
+
+def compress_segment(source: str, dest: str) -> None:
+    """``RotatingFileHandler.rotator`` that gzips the rolled-over file
+    
+    The segment's first and last timestamps are recorded in the log's
+    manifest while the file is being compressed.
+    
+    Args:
+        source: File being rotated (the live log)
+        dest: Rotated segment name from ``segment_namer``
+    """
+    first = last = None
+    with open(source, "rb") as src, gzip.open(dest, "wb", compresslevel=6) as dst:
+        for line in src:
+            dst.write(line)
+            timestamp = parse_timestamp(line)
+            if timestamp is not None:
+                first = first or timestamp
+                last = timestamp
+    os.remove(source)
+    LogStore(Path(source)).record(Path(dest), first, last)
+
+def segment_namer(name: str) -> str:
+    """``RotatingFileHandler.namer`` giving rotated segments a .gz suffix"""
+    return name + ".gz"
+
+class LogStore:
+    """A log file and its rotated segments, queried newest first
+    
+    Segments are the live file followed by ``<name>.1[.gz]``, ``<name>.2[.gz]``
+    and so on. The first and last timestamp of every rotated segment is kept
+    in ``<name>.manifest.json``, keyed by the segment's size and mtime so the
+    entries stay valid while segments are renamed by later rotations.
+    Segments whose time range cannot overlap a query are never opened.
+    """
+    
+    def __init__(self, log_path: Path, max_segments: int = 50):
+        self.log_path = Path(log_path)
+        self.manifest_path = self.log_path.with_name(self.log_path.name + ".manifest.json")
+        self.max_segments = max_segments
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _identity(path: Path) -> str:
+        stat = path.stat()
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+    
+    def _load_manifest(self) -> Dict[str, dict]:
+        try:
+            return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_manifest(self, manifest: Dict[str, dict]) -> None:
+        try:
+            _write_atomic(self.manifest_path, json.dumps(manifest, indent=1).encode("utf-8"))
+        except OSError as e:
+            logger.warning(f"Could not write log manifest {self.manifest_path}: {e}")
+    
+    def record(self, path: Path, first: Optional[datetime], last: Optional[datetime]) -> None:
+        """Add a segment's time range to the manifest"""
+        with self._lock:
+            manifest = self._load_manifest()
+            manifest[self._identity(path)] = {
+                "file": path.name,
+                "first": first.isoformat() if first else None,
+                "last": last.isoformat() if last else None,
+            }
+            self._save_manifest(manifest)
+    
+    def rotated_paths(self) -> List[Path]:
+        """Rotated segments, newest first"""
+        paths = []
+        for number in range(1, self.max_segments + 1):
+            base = self.log_path.with_name(f"{self.log_path.name}.{number}")
+            compressed = base.with_name(base.name + ".gz")
+            if compressed.exists():
+                paths.append(compressed)
+            elif base.exists():
+                paths.append(base)
+            else:
+                break
+        return paths
+    
+    @staticmethod
+    def _scan_bounds(path: Path) -> Tuple[Optional[datetime], Optional[datetime]]:
+        first = last = None
+        with open_segment(path) as f:
+            for line in f:
+                timestamp = parse_timestamp(line)
+                if timestamp is not None:
+                    first = first or timestamp
+                    last = timestamp
+        return first, last
+    
+    def segments(self) -> List[Dict[str, Any]]:
+        """Live file and rotated segments with their time ranges, newest first
+        
+        Returns:
+            List of dicts with path, compressed, first and last (None = unknown or still growing)
+        """
+        segments = []
+        if self.log_path.exists():
+            with open_segment(self.log_path) as f:
+                first = parse_timestamp(f.readline())
+            segments.append({"path": self.log_path, "compressed": False, "first": first, "last": None})
+        
+        with self._lock:
+            manifest = self._load_manifest()
+            known = {}
+            changed = False
+            for path in self.rotated_paths():
+                try:
+                    identity = self._identity(path)
+                except OSError:
+                    continue
+                entry = manifest.get(identity)
+                if entry is None:
+                    # Segments rotated before the manifest existed are scanned once
+                    first, last = self._scan_bounds(path)
+                    entry = {
+                        "file": path.name,
+                        "first": first.isoformat() if first else None,
+                        "last": last.isoformat() if last else None,
+                    }
+                    changed = True
+                known[identity] = dict(entry, file=path.name)
+                segments.append({
+                    "path": path,
+                    "compressed": path.suffix == ".gz",
+                    "first": datetime.fromisoformat(entry["first"]) if entry["first"] else None,
+                    "last": datetime.fromisoformat(entry["last"]) if entry["last"] else None,
+                })
+            if changed or known != manifest:
+                self._save_manifest(known)
+        return segments
+    
+    def query(self, parse: Callable, start: Optional[datetime] = None, end: Optional[datetime] = None,
+              level: Optional[str] = None, source: Optional[str] = None, message: Optional[str] = None,
+              limit: int = 100) -> Tuple[list, bool]:
+        """Newest-first query across the live file and rotated segments (see query_log)"""
+        log_filter = LogFilter(start, end, level, source, message)
+        entries: list = []
+        for segment in self.segments():
+            if not log_filter.overlaps(segment["first"], segment["last"]):
+                continue
+            remaining = limit - len(entries)
+            if segment["compressed"]:
+                found, has_more = _query_compressed(segment["path"], parse, log_filter, remaining)
+            else:
+                found, has_more = _query_plain(segment["path"], parse, log_filter, remaining,
+                                               use_index=segment["path"] == self.log_path)
+            entries.extend(found)
+            if has_more:
+                return entries, True
+            if log_filter.start and segment["first"] and segment["first"] < log_filter.start:
+                break
+        return entries, False
+
+# Variable parts of messages collapsed when grouping messages into templates
+_TEMPLATE_PATTERNS = [
+    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "<uuid>"),
+    (re.compile(r"\b\d+(?:\.\d+)?"), "<n>"),
+]
+TEMPLATE_LENGTH = 100
+
+def message_template(message: str) -> str:
+    """Group a message with others that differ only in IDs and numbers
+    
+    Args:
+        message: Log message
+    
+    Returns:
+        Message with UUIDs and numbers replaced by placeholders, truncated
+    """
+    for pattern, placeholder in _TEMPLATE_PATTERNS:
+        message = pattern.sub(placeholder, message)
+    return message[:TEMPLATE_LENGTH] + "..." if len(message) > TEMPLATE_LENGTH else message
+
+def _minute_key(timestamp: datetime) -> int:
+    return _sortable_seconds(timestamp) // 60
+
+class LogStatsAggregator:
+    """Per-minute statistics maintained by tailing log files
+    
+    Each ``update`` reads only the bytes appended since the previous one
+    (finishing the rotated segment first if the file was rotated in between)
+    and adds every timestamped line to a bucket for its minute: counts per
+    level, counts per message template and the latest error samples. Buckets
+    older than ``retention_hours`` are dropped, and the state is saved to a
+    gzipped JSON file so a restart resumes from the saved offsets. Saves
+    happen only after something changed and at most every ``save_interval``
+    seconds; lines read after the last save are read again on restart. A log
+    seen for the first time is bootstrapped from its rotated segments that
+    overlap the retention window.
+    
+    Every worker process may ``start`` an aggregator on the same state file;
+    an exclusive ``flock`` on ``<state file>.lock`` elects the one that tails
+    the logs and saves. The others only reload the saved state when it
+    changes, and take over once the leader exits. Without ``fcntl`` every
+    started aggregator tails on its own.
+    """
+    
+    ERROR_LEVELS = ("ERROR", "CRITICAL")
+    VERSION = 1
+    
+    def __init__(self, log_files: Dict[str, Path], state_path: Path, parse: Callable,
+                 retention_hours: int = 168, error_samples: int = 3, save_interval: float = 60.0):
+        self.log_files = {name: Path(path) for name, path in log_files.items()}
+        self.stores = {name: LogStore(path) for name, path in self.log_files.items()}
+        self.state_path = Path(state_path)
+        self.parse = parse
+        self.retention_hours = retention_hours
+        self.error_samples = error_samples
+        self.save_interval = save_interval
+        self.positions: Dict[str, dict] = {}
+        self.buckets: Dict[str, Dict[int, dict]] = {name: {} for name in self.log_files}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._dirty = False
+        self._saved_at = float("-inf")
+        self.lock_path = self.state_path.with_name(self.state_path.name + ".lock")
+        self._lock_file = None
+        # None: not coordinating with other processes; False: following a leader
+        self._leader: Optional[bool] = None
+        self._state_mtime: Optional[int] = None
+        self._load()
+    
+    def _load(self) -> None:
+        try:
+            self._state_mtime = self.state_path.stat().st_mtime_ns
+            with gzip.open(self.state_path, "rt", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("version") != self.VERSION:
+            return
+        self.positions = state.get("positions", {})
+        self.buckets = {name: {} for name in self.log_files}
+        for name, buckets in state.get("buckets", {}).items():
+            if name in self.buckets:
+                self.buckets[name] = {int(minute): bucket for minute, bucket in buckets.items()}
+    
+    def _refresh(self) -> None:
+        """Reload the state if the leader saved it since the last load"""
+        try:
+            mtime = self.state_path.stat().st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._state_mtime:
+            self._load()
+    
+    def _lead(self) -> bool:
+        """Try to become the process that tails the logs"""
+        try:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        # Continue from whatever the previous leader saved last
+        self._leader = True
+        self._load()
+        return True
+    
+    def _save(self) -> None:
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        state = {
+            "version": self.VERSION,
+            "positions": self.positions,
+            "buckets": self.buckets,
+        }
+        payload = json.dumps(state, separators=(",", ":")).encode("utf-8")
+        try:
+            _write_atomic(self.state_path, gzip.compress(payload, compresslevel=6))
+        except OSError as e:
+            self._dirty = True
+            logger.warning(f"Could not save log stats state {self.state_path}: {e}")
+    
+    def _add_line(self, name: str, line: bytes) -> None:
+        timestamp = parse_timestamp(line)
+        if timestamp is None:
+            # Continuation lines (tracebacks) belong to the entry above them
+            return
+        try:
+            entry = self.parse(line.decode("utf-8", errors="replace").rstrip("\r\n"))
+        except Exception:
+            return
+        
+        bucket = self.buckets[name].setdefault(_minute_key(timestamp), {"levels": {}, "messages": {}, "errors": []})
+        bucket["levels"][entry.level] = bucket["levels"].get(entry.level, 0) + 1
+        template = message_template(entry.message)
+        bucket["messages"][template] = bucket["messages"].get(template, 0) + 1
+        if entry.level in self.ERROR_LEVELS and self.error_samples:
+            # Keep the newest samples of each minute
+            bucket["errors"] = bucket["errors"][-(self.error_samples - 1):] if self.error_samples > 1 else []
+            bucket["errors"].append(entry.model_dump(mode="json"))
+    
+    def _consume(self, name: str, path: Path, offset: int) -> int:
+        """Aggregate complete lines after offset; returns the new offset"""
+        with open_segment(path) as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._add_line(name, line)
+                offset += len(line)
+        return offset
+    
+    def _bootstrap(self, name: str) -> None:
+        """Aggregate rotated segments inside the retention window, oldest first"""
+        oldest = datetime.now() - timedelta(hours=self.retention_hours)
+        for segment in reversed(self.stores[name].segments()[1:]):
+            if segment["last"] is None or segment["last"] >= oldest:
+                self._consume(name, segment["path"], 0)
+    
+    def update(self) -> None:
+        """Aggregate lines appended to every log file since the last update
+        
+        While another process leads, reload its saved state instead.
+        """
+        with self._lock:
+            if self._leader is False and not self._lead():
+                self._refresh()
+                return
+            for name, path in self.log_files.items():
+                fingerprint = _line_fingerprint(path)
+                if fingerprint is None:
+                    continue
+                before = dict(self.positions.get(name, {}))
+                try:
+                    if name not in self.positions:
+                        self._bootstrap(name)
+                        position = {"fingerprint": fingerprint, "offset": 0}
+                    else:
+                        position = self.positions[name]
+                    if position["fingerprint"] != fingerprint or path.stat().st_size < position["offset"]:
+                        # Rotated: finish the previous file, then start the new one from the top
+                        for rotated in self.stores[name].rotated_paths()[:1]:
+                            if _line_fingerprint(rotated) == position["fingerprint"]:
+                                self._consume(name, rotated, position["offset"])
+                        position = {"fingerprint": fingerprint, "offset": 0}
+                    position["offset"] = self._consume(name, path, position["offset"])
+                except OSError as e:
+                    logger.warning(f"Could not aggregate log file {path}: {e}")
+                    continue
+                self.positions[name] = position
+                if position != before:
+                    self._dirty = True
+            
+            oldest = _minute_key(datetime.now() - timedelta(hours=self.retention_hours))
+            for buckets in self.buckets.values():
+                for minute in [minute for minute in buckets if minute < oldest]:
+                    del buckets[minute]
+                    self._dirty = True
+            if self._dirty and time.monotonic() - self._saved_at >= self.save_interval:
+                self._save()
+    
+    def flush(self) -> None:
+        """Save the state now if it changed since the last save"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+    
+    def stats(self, name: str, start: datetime, end: datetime, top: int = 10) -> Dict[str, Any]:
+        """Merge the buckets of one log between start and end
+        
+        Args:
+            name: Log type
+            start: Oldest time to include
+            end: Newest time to include
+            top: Number of top message templates and error samples to return
+        
+        Returns:
+            Dictionary with total_entries, levels, recent_errors and top_messages
+        """
+        first, last = _minute_key(start), _minute_key(end)
+        levels: Dict[str, int] = {}
+        messages: Dict[str, int] = {}
+        errors: List[dict] = []
+        with self._lock:
+            for minute in sorted(self.buckets.get(name, {}), reverse=True):
+                if minute < first or minute > last:
+                    continue
+                bucket = self.buckets[name][minute]
+                for level, count in bucket["levels"].items():
+                    levels[level] = levels.get(level, 0) + count
+                for template, count in bucket["messages"].items():
+                    messages[template] = messages.get(template, 0) + count
+                if len(errors) < top:
+                    errors.extend(reversed(bucket["errors"]))
+        
+        return {
+            "total_entries": sum(levels.values()),
+            "levels": levels,
+            "recent_errors": errors[:top],
+            "top_messages": dict(sorted(messages.items(), key=lambda item: item[1], reverse=True)[:top]),
+        }
+    
+    def start(self, interval: float = 5.0) -> None:
+        """Keep the buckets current from a daemon thread
+        
+        Args:
+            interval: Seconds between updates (and leadership attempts)
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        if fcntl is not None and self._lock_file is None:
+            try:
+                self._lock_file = open(self.lock_path, "ab")
+            except OSError as e:
+                logger.warning(f"Could not open log stats lock {self.lock_path}: {e}")
+            else:
+                with self._lock:
+                    self._leader = False
+                    self._lead()
+        self._stop.clear()
+        
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.update()
+                except Exception as e:
+                    logger.error(f"Log stats aggregation failed: {e}")
+                self._stop.wait(interval)
+        
+        self._thread = threading.Thread(target=run, name="log-stats-aggregator", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        with self._lock:
+            if self._lock_file is not None:
+                # Closing the file releases the flock for the next leader
+                self._lock_file.close()
+                self._lock_file = None
+                self._leader = None
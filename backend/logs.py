@@ -1,23 +1,202 @@
 import logging
 import logging.handlers
+import atexit
+import copy
+import json
 import os
+import queue
+import threading
 from datetime import datetime
 from pathlib import Path
 
+from config import settings
+from log_store import compress_segment, segment_namer
+
 # Create logs directory if it doesn't exist
 logs_dir = Path("logs")
 logs_dir.mkdir(exist_ok=True)
 
+class JsonLinesFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects
+    
+    The timestamp is always the first key so log readers can find it at a
+    fixed position. Typed fields passed as ``extra={"event_fields": {...}}``
+    are written under ``fields``. With a ``fallback`` formatter, records
+    without event fields keep the plain text format.
+    """
+    
+    def __init__(self, datefmt='%Y-%m-%d %H:%M:%S', fallback=None):
+        super().__init__(datefmt=datefmt)
+        self.fallback = fallback
+    
+    def format(self, record):
+        fields = getattr(record, "event_fields", None)
+        if fields is None and self.fallback is not None:
+            return self.fallback.format(record)
+        
+        payload = {
+            "ts": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "file": record.filename,
+            "line": record.lineno,
+            "msg": record.getMessage()
+        }
+        if fields is not None:
+            payload["fields"] = fields
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            # Records from the queue carry the traceback only as exc_text
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str, separators=(",", ":"))
+
+class BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that leaves flushing to the end of a listener batch"""
+    
+    batching = False
+    
+    def flush(self):
+        if not self.batching:
+            super().flush()
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never lets a full queue stall the caller
+    
+    Records below ERROR are dropped immediately when the queue is full;
+    ERROR and above wait up to ``error_timeout`` seconds first. Dropped
+    records are counted per level. Tracebacks are queued as ``exc_text``
+    for the listener's formatters instead of being merged into the message.
+    """
+    
+    def __init__(self, log_queue, error_timeout=0.1):
+        super().__init__(log_queue)
+        self.error_timeout = error_timeout
+        self.dropped = {}
+        self._lock = threading.Lock()
+    
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # The exception is gone by the time the listener formats the record
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record):
+        try:
+            if record.levelno >= logging.ERROR:
+                self.queue.put(record, timeout=self.error_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """Queue listener that writes records in batches and flushes once per batch
+    
+    Records from ``renewmart.access`` go to the access handlers and all
+    others to the application handlers.
+    """
+    
+    def __init__(self, log_queue, handlers, access_handlers, batch_size=256):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.access_handlers = tuple(access_handlers)
+        self.batch_size = batch_size
+        self.batches = 0
+        self.records = 0
+    
+    def handle(self, record):
+        record = self.prepare(record)
+        handlers = self.access_handlers if record.name.startswith("renewmart.access") else self.handlers
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+    
+    def _set_batching(self, enabled):
+        for handler in self.handlers + self.access_handlers:
+            if isinstance(handler, BatchedRotatingFileHandler):
+                handler.batching = enabled
+                if not enabled:
+                    handler.flush()
+    
+    def _monitor(self):
+        log_queue = self.queue
+        has_task_done = hasattr(log_queue, "task_done")
+        stopping = False
+        while not stopping:
+            batch = [log_queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            self._set_batching(True)
+            try:
+                for record in batch:
+                    if record is self._sentinel:
+                        stopping = True
+                        continue
+                    self.handle(record)
+                    self.records += 1
+            finally:
+                self._set_batching(False)
+                self.batches += 1
+                if has_task_done:
+                    for _ in batch:
+                        log_queue.task_done()
+
+_log_queue = None
+_queue_handlers = []
+_listener = None
+
+def shutdown_logging():
+    """Stop the queue listener, writing out every record still queued"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def get_logging_stats():
+    """
+    Get queue and drop counters for the logging pipeline.
+    
+    Returns:
+        dict: Queue depth, records written, batches and dropped records per level
+    """
+    dropped = {}
+    for handler in _queue_handlers:
+        for level, count in handler.dropped.items():
+            dropped[level] = dropped.get(level, 0) + count
+    return {
+        "queue_size": _log_queue.qsize() if _log_queue else 0,
+        "queue_capacity": _log_queue.maxsize if _log_queue else 0,
+        "records_written": _listener.records if _listener else 0,
+        "batches": _listener.batches if _listener else 0,
+        "dropped": dropped,
+        "dropped_total": sum(dropped.values())
+    }
+
 def setup_logging(log_level=logging.INFO):
     """
     Configure comprehensive logging for the RenewMart application.
     
+    Loggers only enqueue records; a listener thread writes them to the
+    console and log files in batches, so request handling never waits on
+    disk I/O.
+    
     Args:
         log_level: Logging level (default: INFO)
     
     Returns:
         logger: Configured logger instance
     """
+    global _log_queue, _queue_handlers, _listener
+    shutdown_logging()
     
     # Create logger
     logger = logging.getLogger("renewmart")
@@ -37,47 +216,76 @@ def setup_logging(log_level=logging.INFO):
         datefmt='%H:%M:%S'
     )
     
+    # Opt-in JSON lines: access logs become fully structured, and database and
+    # security events in the main log carry typed fields
+    if settings.get('LOG_STRUCTURED', False):
+        event_formatter = JsonLinesFormatter(fallback=detailed_formatter)
+        access_formatter = JsonLinesFormatter()
+    else:
+        event_formatter = access_formatter = detailed_formatter
+    
     # Console handler for development
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(simple_formatter)
-    logger.addHandler(console_handler)
     
     # File handler for all logs
-    file_handler = logging.handlers.RotatingFileHandler(
+    file_handler = BatchedRotatingFileHandler(
         logs_dir / "renewmart.log",
         maxBytes=10*1024*1024,  # 10MB
         backupCount=5
     )
+    # Rotated segments are gzipped and recorded in the log's manifest (see log_store.LogStore)
+    file_handler.rotator = compress_segment
+    file_handler.namer = segment_namer
     file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(detailed_formatter)
-    logger.addHandler(file_handler)
+    file_handler.setFormatter(event_formatter)
     
     # Error file handler for errors only
-    error_handler = logging.handlers.RotatingFileHandler(
+    error_handler = BatchedRotatingFileHandler(
         logs_dir / "renewmart_errors.log",
         maxBytes=5*1024*1024,  # 5MB
         backupCount=3
     )
+    error_handler.rotator = compress_segment
+    error_handler.namer = segment_namer
     error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(detailed_formatter)
-    logger.addHandler(error_handler)
+    error_handler.setFormatter(event_formatter)
     
     # Access log handler for API requests
-    access_handler = logging.handlers.RotatingFileHandler(
+    access_handler = BatchedRotatingFileHandler(
         logs_dir / "renewmart_access.log",
         maxBytes=10*1024*1024,  # 10MB
         backupCount=5
     )
+    access_handler.rotator = compress_segment
+    access_handler.namer = segment_namer
     access_handler.setLevel(logging.INFO)
-    access_handler.setFormatter(detailed_formatter)
+    access_handler.setFormatter(access_formatter)
+    
+    # Bounded queue drained by a single listener thread
+    _log_queue = queue.Queue(maxsize=settings.get('LOG_QUEUE_SIZE', 10000))
+    error_timeout = settings.get('LOG_QUEUE_ERROR_TIMEOUT', 0.1)
+    queue_handler = DroppingQueueHandler(_log_queue, error_timeout)
+    logger.addHandler(queue_handler)
     
     # Create separate logger for access logs
     access_logger = logging.getLogger("renewmart.access")
     access_logger.setLevel(logging.INFO)
-    access_logger.addHandler(access_handler)
+    access_logger.handlers.clear()
+    access_queue_handler = DroppingQueueHandler(_log_queue, error_timeout)
+    access_logger.addHandler(access_queue_handler)
     access_logger.propagate = False
     
+    _queue_handlers = [queue_handler, access_queue_handler]
+    _listener = BatchingQueueListener(
+        _log_queue,
+        [console_handler, file_handler, error_handler],
+        [access_handler],
+        batch_size=settings.get('LOG_BATCH_SIZE', 256)
+    )
+    _listener.start()
+    
     return logger
 
 def get_logger(name=None):
@@ -124,7 +332,15 @@ def log_api_request(method, path, status_code, response_time=None, user_id=None)
     if user_id:
         log_message += f" - User: {user_id}"
     
-    access_logger.info(log_message)
+    fields = {
+        "type": "access",
+        "method": method,
+        "path": path,
+        "status_code": status_code,
+        "response_time_ms": round(response_time, 2) if response_time is not None else None,
+        "user_id": str(user_id) if user_id else None
+    }
+    access_logger.info(log_message, extra={"event_fields": fields})
 
 def log_database_operation(operation, table, user_id=None, details=None):
     """
@@ -146,7 +362,14 @@ def log_database_operation(operation, table, user_id=None, details=None):
     if details:
         log_message += f" - {details}"
     
-    logger.info(log_message)
+    fields = {
+        "type": "database",
+        "operation": operation,
+        "table": table,
+        "user_id": str(user_id) if user_id else None,
+        "details": details
+    }
+    logger.info(log_message, extra={"event_fields": fields})
 
 def log_security_event(event_type, user_id=None, ip_address=None, details=None):
     """
@@ -171,12 +394,21 @@ def log_security_event(event_type, user_id=None, ip_address=None, details=None):
     if details:
         log_message += f" - {details}"
     
-    logger.warning(log_message)
+    fields = {
+        "type": "security",
+        "event_type": event_type,
+        "user_id": str(user_id) if user_id else None,
+        "ip_address": ip_address,
+        "details": details
+    }
+    logger.warning(log_message, extra={"event_fields": fields})
 
 # Initialize logging when module is imported
 if not logging.getLogger("renewmart").handlers:
     setup_logging()
 
+atexit.register(shutdown_logging)
+
 # Integration with FastAPI logging middleware
 def log_request_middleware(request, response, process_time):
     """
@@ -7,7 +7,9 @@ import uvicorn
 import time
 import logging
 from pydantic import ValidationError
-from database import engine, Base
+from database import engine, async_engine, Base
+from auth import password_hasher
+from redis_service import redis_service, async_redis_service
 from routers import auth, users, lands, sections, tasks, investors, documents, logs as logs_router, cache, health
 import logs
 from logs import log_request_middleware, setup_request_logging
@@ -28,9 +30,14 @@ async def lifespan(app: FastAPI):
     # Startup
     Base.metadata.create_all(bind=engine)
     setup_request_logging()  # Initialize request logging
+    logs_router.log_stats.start(settings.get('LOG_STATS_INTERVAL', 5))
     yield
     # Shutdown
-    pass
+    logs_router.log_stats.stop()
+    password_hasher.shutdown()
+    redis_service.close()
+    await async_redis_service.close()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="RenewMart API",
@@ -2,7 +2,7 @@
 from .users import User, UserRole
 from .lookup_tables import LuRole, LuStatus, LuTaskStatus, LuEnergyType
 from .lands import Land, LandSection, SectionDefinition
-from .documents import Document
+from .documents import Document, DocumentBlob
 from .tasks import Task, TaskHistory
 from .investors import InvestorInterest
 
@@ -10,7 +10,7 @@ __all__ = [
     'User', 'UserRole',
     'LuRole', 'LuStatus', 'LuTaskStatus', 'LuEnergyType',
     'Land', 'LandSection', 'SectionDefinition',
-    'Document',
+    'Document', 'DocumentBlob',
     'Task', 'TaskHistory',
     'InvestorInterest'
 ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, BigInteger
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -18,6 +18,7 @@ class Document(Base):
     file_path = Column(String, nullable=False)
     file_size = Column(Integer)
     mime_type = Column(String)
+    file_hash = Column(String, ForeignKey("document_blobs.sha256"))
     description = Column(Text)
     uploaded_by = Column(UUID(as_uuid=True), ForeignKey("user.user_id"), nullable=False)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -25,4 +26,15 @@ class Document(Base):
     # Relationships
     land = relationship("Land", back_populates="documents")
     land_section = relationship("LandSection", back_populates="documents")
-    uploader = relationship("User", back_populates="uploaded_documents")
\ No newline at end of file
+    uploader = relationship("User", back_populates="uploaded_documents")
+
+
+class DocumentBlob(Base):
+    """Content-addressed file shared by all documents with the same content"""
+    __tablename__ = "document_blobs"
+    
+    sha256 = Column(String, primary_key=True)
+    file_path = Column(String, nullable=False)
+    file_size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
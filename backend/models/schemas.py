@@ -513,6 +513,22 @@ class Document(DocumentBase):
     uploaded_by: Optional[UUID] = None
     created_at: datetime
 
+class ResumableUploadCreate(BaseSchema):
+    document_type: str = Field(..., max_length=100, description="Type of document")
+    file_name: str = Field(..., max_length=255, description="Original file name")
+    total_size: int = Field(..., gt=0, description="File size in bytes")
+    sha256: Optional[str] = Field(None, pattern=r'^[0-9a-f]{64}$', description="Expected SHA-256 of the whole file")
+
+class ResumableUploadStatus(BaseSchema):
+    upload_id: str
+    land_id: UUID
+    file_name: str
+    total_size: int
+    chunk_size: int
+    total_chunks: int
+    received_chunks: List[int]
+    expires_at: datetime
+
 # ============================================================================
 # TASK SCHEMAS
 # ============================================================================
@@ -698,7 +714,8 @@ class LogEntry(BaseSchema):
 
 class LogQueryResponse(BaseSchema):
     logs: List[LogEntry] = Field(..., description="List of log entries")
-    total_count: int = Field(..., ge=0, description="Total number of matching logs")
+    total_count: int = Field(..., ge=0, description="Number of matching logs returned")
+    has_more: bool = Field(False, description="Whether older matching logs exist beyond the limit")
     query_params: LogQueryParams = Field(..., description="Query parameters used")
     execution_time_ms: float = Field(..., ge=0, description="Query execution time in milliseconds")
 
@@ -909,5 +926,43 @@ class PaginatedResponse(BaseSchema):
         }
     )
 
+class CursorPaginatedResponse(PaginatedResponse):
+    """Keyset-paginated envelope; total/page/pages are not computed."""
+    total: Optional[int] = Field(
+        None, 
+        ge=0, 
+        description="Not computed for cursor pagination"
+    )
+    page: Optional[int] = Field(
+        None, 
+        ge=1, 
+        description="Not used for cursor pagination"
+    )
+    pages: Optional[int] = Field(
+        None, 
+        ge=0, 
+        description="Not computed for cursor pagination"
+    )
+    next_cursor: Optional[str] = Field(
+        None, 
+        description="Opaque cursor for the next page; pass it back as the `cursor` query parameter",
+        example="eyJjIjogIjIwMjQtMDEtMTVUMTA6MzA6MDArMDA6MDAiLCAiaWQiOiAiLi4uIn0"
+    )
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "items": [
+                    {"id": 1, "name": "Item 1"},
+                    {"id": 2, "name": "Item 2"}
+                ],
+                "size": 20,
+                "has_next": True,
+                "has_prev": True,
+                "next_cursor": "eyJjIjogIjIwMjQtMDEtMTVUMTA6MzA6MDArMDA6MDAiLCAiaWQiOiAiLi4uIn0"
+            }
+        }
+    )
+
 # Forward references
 LandWithSections.model_rebuild()
\ No newline at end of file
@@ -0,0 +1,115 @@
+from fastapi import HTTPException, status
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+from uuid import UUID
+import base64
+import json
+
+from models.schemas import CursorPaginatedResponse
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    """Encode a (created_at, id) keyset position as an opaque cursor.
+    
+    Args:
+        created_at: Timestamp of the last row on the page
+        row_id: Primary key of the last row on the page
+    
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps({"c": created_at.isoformat(), "id": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Opaque cursor string
+    
+    Returns:
+        Tuple of (created_at, id)
+    
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["c"]), UUID(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def apply_keyset(
+    base_query: str,
+    params: Dict[str, Any],
+    cursor: Optional[str],
+    limit: int,
+    created_column: str,
+    id_column: str
+) -> str:
+    """Append the keyset predicate, ordering and limit to a query.
+    
+    Rows are ordered newest first by (created_column, id_column) and one
+    extra row is requested so the caller can tell whether a next page exists.
+    The predicate is a row comparison so a composite index on
+    (created_at DESC, id DESC) serves every page at the same cost.
+    
+    Args:
+        base_query: Query text ending in a WHERE clause
+        params: Bind parameters, updated in place
+        cursor: Cursor from the previous page, if any
+        limit: Page size
+        created_column: Qualified created_at column
+        id_column: Qualified primary key column
+    
+    Returns:
+        Query text with keyset pagination applied
+    """
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        base_query += f" AND ({created_column}, {id_column}) < (:cursor_created_at, :cursor_id)"
+        params["cursor_created_at"] = cursor_created_at
+        params["cursor_id"] = cursor_id
+    
+    base_query += f" ORDER BY {created_column} DESC, {id_column} DESC LIMIT :limit"
+    params["limit"] = limit + 1
+    return base_query
+
+def build_cursor_page(
+    rows: List[Any],
+    limit: int,
+    cursor: Optional[str],
+    to_item: Callable[[Any], Any],
+    id_attr: str,
+    created_attr: str = "created_at"
+) -> CursorPaginatedResponse:
+    """Build the paginated envelope from rows fetched via apply_keyset.
+    
+    Args:
+        rows: Up to limit + 1 result rows
+        limit: Page size
+        cursor: Cursor used to fetch this page, if any
+        to_item: Converts a row into a response item
+        id_attr: Row attribute holding the primary key
+        created_attr: Row attribute holding the creation timestamp
+    
+    Returns:
+        CursorPaginatedResponse for the page
+    """
+    has_next = len(rows) > limit
+    page_rows = rows[:limit]
+    next_cursor = None
+    if has_next and page_rows:
+        last = page_rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_attr), getattr(last, id_attr))
+    
+    return CursorPaginatedResponse(
+        items=[to_item(row) for row in page_rows],
+        size=limit,
+        has_next=has_next,
+        has_prev=cursor is not None,
+        next_cursor=next_cursor
+    )
@@ -3,9 +3,25 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
+from limits.storage import Storage, SlidingWindowCounterSupport
+from typing import Dict, Optional, Tuple
+from contextlib import contextmanager
 import redis
 from config import settings
+import hashlib
 import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
@@ -23,13 +39,405 @@ try:
     redis_client.ping()
     logger.info("Redis connection established for rate limiting")
 except Exception as e:
-    logger.warning(f"Redis connection failed, falling back to in-memory storage: {e}")
+    logger.warning(f"Redis connection failed, falling back to shared-memory counters: {e}")
     redis_client = None
 
+class SharedWindowTable:
+    """Sliding-window counters in a memory-mapped file shared by all workers
+    
+    Used when Redis is unavailable so that every worker on the host draws
+    from the same counters instead of each allowing the full limit. Each
+    slot holds a key hash, the current window index and the current and
+    previous window counts; keys are placed by hash with short linear
+    probing. Access is serialised with ``flock`` (a thread lock only on
+    platforms without ``fcntl``).
+    """
+    
+    SLOT = struct.Struct("<QqII")
+    PROBES = 4
+    
+    def __init__(self, path: Optional[str] = None, slots: int = 65536):
+        self.slots = slots
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd = None
+        size = slots * self.SLOT.size
+        if path:
+            try:
+                self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+                if os.fstat(self._fd).st_size < size:
+                    os.ftruncate(self._fd, size)
+                self._map = mmap.mmap(self._fd, size)
+                return
+            except OSError as e:
+                logger.warning(f"Shared rate limit table unavailable ({e}); using per-process counters")
+                if self._fd is not None:
+                    os.close(self._fd)
+                self._fd = None
+        self._map = mmap.mmap(-1, size)
+    
+    @property
+    def shared(self) -> bool:
+        return self._fd is not None
+    
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if self._fd is not None and fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if self._fd is not None and fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+    
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+    
+    def _find(self, key_hash: int, window_index: int) -> Tuple[int, Tuple[int, int, int, int]]:
+        """Slot offset and contents for a key, claiming a free or stale slot if needed"""
+        start = key_hash % self.slots
+        fallback = None
+        for probe in range(self.PROBES):
+            offset = ((start + probe) % self.slots) * self.SLOT.size
+            entry = self.SLOT.unpack_from(self._map, offset)
+            if entry[0] == key_hash:
+                return offset, entry
+            if fallback is None and (entry[0] == 0 or entry[1] < window_index - 1):
+                fallback = offset
+        offset = fallback if fallback is not None else start * self.SLOT.size
+        return offset, (key_hash, window_index, 0, 0)
+    
+    @staticmethod
+    def _roll(entry: Tuple[int, int, int, int], window_index: int) -> Tuple[int, int]:
+        """(previous, current) counts as seen from window_index"""
+        _, stored_index, current, previous = entry
+        if stored_index == window_index:
+            return previous, current
+        if stored_index == window_index - 1:
+            return current, 0
+        return 0, 0
+    
+    def acquire(self, key: str, limit: int, window: int, requested: int, minimum: int, now: float) -> int:
+        """Take up to ``requested`` tokens (at least ``minimum``) from the window; returns tokens granted"""
+        window_index = int(now // window)
+        key_hash = self._hash(key)
+        with self._locked():
+            offset, entry = self._find(key_hash, window_index)
+            previous, current = self._roll(entry, window_index)
+            weighted = previous * (window - now % window) / window + current
+            available = math.floor(limit - weighted)
+            granted = min(requested, available) if available >= minimum else 0
+            self.SLOT.pack_into(self._map, offset, key_hash, window_index, current + granted, previous)
+            return granted
+    
+    def window(self, key: str, window: int, now: float) -> Tuple[int, int]:
+        """(previous, current) window counts for a key"""
+        window_index = int(now // window)
+        with self._locked():
+            _, entry = self._find(self._hash(key), window_index)
+            return self._roll(entry, window_index)
+    
+    def incr(self, key: str, expiry: int, amount: int, now: float) -> int:
+        """Add to a fixed-window counter; windows are aligned to multiples of ``expiry``"""
+        window_index = int(now // expiry)
+        key_hash = self._hash(key)
+        with self._locked():
+            offset, entry = self._find(key_hash, window_index)
+            count = entry[2] if entry[1] == window_index and entry[3] == expiry else 0
+            count += amount
+            self.SLOT.pack_into(self._map, offset, key_hash, window_index, count, expiry)
+            return count
+    
+    def counter(self, key: str, now: float) -> Tuple[int, float]:
+        """Fixed-window count for a key and the time it resets"""
+        with self._locked():
+            _, entry = self._find(self._hash(key), 0)
+        _, window_index, count, expiry = entry
+        if not expiry or window_index != int(now // expiry):
+            return 0, now
+        return count, (window_index + 1) * expiry
+    
+    def clear(self, key: str) -> None:
+        key_hash = self._hash(key)
+        with self._locked():
+            offset, entry = self._find(key_hash, 0)
+            if entry[0] == key_hash:
+                self.SLOT.pack_into(self._map, offset, 0, 0, 0, 0)
+    
+    def reset(self) -> None:
+        with self._locked():
+            self._map[:] = bytes(len(self._map))
+
+class _Lease:
+    __slots__ = ("tokens", "expires_at")
+    
+    def __init__(self, tokens: int, expires_at: float):
+        self.tokens = tokens
+        self.expires_at = expires_at
+
+class SlidingWindowEngine:
+    """Sliding-window-counter rate limiting with an atomic Redis Lua script
+    
+    The weighted count of the previous and current fixed windows is checked
+    and incremented in one script call. For generous limits (at least
+    ``lease_min_limit``) a worker takes ``lease_size`` tokens per call and
+    serves the following requests for that key locally until the lease runs
+    out or expires after ``lease_ttl`` seconds. Leased tokens are already
+    counted in Redis, so leasing can only under-admit (by at most
+    ``lease_size - 1`` per worker and key), never exceed a limit. If Redis
+    is unreachable the shared-memory table is used and Redis is retried
+    after ``retry_interval`` seconds.
+    
+    Plain fixed-window counters (``incr``/``get_counter``) are kept as well
+    so the ``limits`` storage also serves the other strategies.
+    """
+    
+    KEY_PREFIX = "ratelimit"
+    FIXED_PREFIX = "fixed"
+    
+    # KEYS = current window key, previous window key
+    # ARGV = limit, window seconds, now, tokens requested, minimum tokens
+    ACQUIRE_SCRIPT = """
+        local limit = tonumber(ARGV[1])
+        local window = tonumber(ARGV[2])
+        local now = tonumber(ARGV[3])
+        local current = tonumber(redis.call('get', KEYS[1]) or '0')
+        local previous = tonumber(redis.call('get', KEYS[2]) or '0')
+        local weighted = previous * (window - now % window) / window + current
+        local available = math.floor(limit - weighted)
+        if available < tonumber(ARGV[5]) then
+            return 0
+        end
+        local granted = math.min(tonumber(ARGV[4]), available)
+        redis.call('incrby', KEYS[1], granted)
+        redis.call('expire', KEYS[1], window * 2)
+        return granted
+    """
+    
+    # KEYS = counter key; ARGV = expiry seconds, amount
+    INCR_SCRIPT = """
+        local count = redis.call('incrby', KEYS[1], ARGV[2])
+        if count == tonumber(ARGV[2]) then
+            redis.call('expire', KEYS[1], ARGV[1])
+        end
+        return count
+    """
+    
+    def __init__(self, client: Optional[redis.Redis], table: SharedWindowTable, lease_size: int = 5,
+                 lease_min_limit: int = 100, lease_ttl: float = 1.0, retry_interval: float = 5.0):
+        self.client = client
+        self.table = table
+        self.lease_size = lease_size
+        self.lease_min_limit = lease_min_limit
+        self.lease_ttl = lease_ttl
+        self.retry_interval = retry_interval
+        self._script = client.register_script(self.ACQUIRE_SCRIPT) if client else None
+        self._incr_script = client.register_script(self.INCR_SCRIPT) if client else None
+        self._leases: Dict[str, _Lease] = {}
+        self._lock = threading.Lock()
+        self._redis_down_until = 0.0
+        self.stats = {"redis_calls": 0, "lease_hits": 0, "fallback_calls": 0, "rejected": 0}
+    
+    @property
+    def using_redis(self) -> bool:
+        return self.client is not None and time.time() >= self._redis_down_until
+    
+    def _window_keys(self, key: str, window: int, now: float) -> Tuple[str, str]:
+        window_index = int(now // window)
+        return f"{self.KEY_PREFIX}:{key}:{window_index}", f"{self.KEY_PREFIX}:{key}:{window_index - 1}"
+    
+    def _fixed_key(self, key: str) -> str:
+        return f"{self.FIXED_PREFIX}:{key}"
+    
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+    
+    def _acquire(self, key: str, limit: int, window: int, requested: int, minimum: int, now: float) -> int:
+        """Take tokens from Redis, or from the shared table if Redis is down"""
+        if self.using_redis:
+            try:
+                self._count("redis_calls")
+                return int(self._script(
+                    keys=list(self._window_keys(key, window, now)),
+                    args=[limit, window, now, requested, minimum]
+                ))
+            except redis.RedisError as e:
+                logger.warning(f"Redis rate limiting unavailable, using shared-memory counters: {e}")
+                self._redis_down_until = now + self.retry_interval
+        self._count("fallback_calls")
+        return self.table.acquire(key, limit, window, requested, minimum, now)
+    
+    def acquire(self, key: str, limit: int, window: int, amount: int = 1) -> bool:
+        """Consume ``amount`` tokens for a key
+        
+        Args:
+            key: Rate limit key
+            limit: Requests allowed per window
+            window: Window length in seconds
+            amount: Tokens to consume
+        
+        Returns:
+            True if the request is within the limit
+        """
+        now = time.time()
+        leasing = amount == 1 and self.lease_size > 1 and limit >= self.lease_min_limit
+        if leasing:
+            with self._lock:
+                lease = self._leases.get(key)
+                if lease and lease.tokens > 0 and lease.expires_at > now:
+                    lease.tokens -= 1
+                    self.stats["lease_hits"] += 1
+                    return True
+        
+        granted = self._acquire(key, limit, window, self.lease_size if leasing else amount, amount, now)
+        if granted < amount:
+            self._count("rejected")
+            return False
+        
+        if leasing:
+            window_end = (int(now // window) + 1) * window
+            with self._lock:
+                self._leases[key] = _Lease(granted - amount, min(now + self.lease_ttl, window_end))
+        return True
+    
+    def get_window(self, key: str, window: int) -> Tuple[int, float, int, float]:
+        """Counts and remaining seconds for the previous and current windows"""
+        now = time.time()
+        current_expires_in = window - now % window
+        previous_expires_in = current_expires_in
+        if self.using_redis:
+            try:
+                current, previous = self.client.mget(self._window_keys(key, window, now))
+                return int(previous or 0), previous_expires_in, int(current or 0), current_expires_in
+            except redis.RedisError as e:
+                logger.warning(f"Redis rate limit window read failed: {e}")
+                self._redis_down_until = now + self.retry_interval
+        previous, current = self.table.window(key, window, now)
+        return previous, previous_expires_in, current, current_expires_in
+    
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        """Add to a fixed-window counter that expires ``expiry`` seconds after it starts"""
+        now = time.time()
+        fixed_key = self._fixed_key(key)
+        if self.using_redis:
+            try:
+                self._count("redis_calls")
+                return int(self._incr_script(keys=[f"{self.KEY_PREFIX}:{fixed_key}"], args=[expiry, amount]))
+            except redis.RedisError as e:
+                logger.warning(f"Redis rate limiting unavailable, using shared-memory counters: {e}")
+                self._redis_down_until = now + self.retry_interval
+        self._count("fallback_calls")
+        return self.table.incr(fixed_key, expiry, amount, now)
+    
+    def get_counter(self, key: str) -> Tuple[int, float]:
+        """Fixed-window count for a key and the time it resets"""
+        now = time.time()
+        fixed_key = self._fixed_key(key)
+        if self.using_redis:
+            try:
+                name = f"{self.KEY_PREFIX}:{fixed_key}"
+                with self.client.pipeline(transaction=False) as pipe:
+                    count, ttl = pipe.get(name).ttl(name).execute()
+                return int(count or 0), now + max(ttl, 0)
+            except redis.RedisError as e:
+                logger.warning(f"Redis rate limit counter read failed: {e}")
+                self._redis_down_until = now + self.retry_interval
+        return self.table.counter(fixed_key, now)
+    
+    def clear(self, key: str, window: Optional[int] = None) -> None:
+        with self._lock:
+            self._leases.pop(key, None)
+        self.table.clear(key)
+        self.table.clear(self._fixed_key(key))
+        if self.using_redis:
+            keys = [f"{self.KEY_PREFIX}:{self._fixed_key(key)}"]
+            if window:
+                keys.extend(self._window_keys(key, window, time.time()))
+            try:
+                self.client.delete(*keys)
+            except redis.RedisError as e:
+                logger.warning(f"Redis rate limit clear failed: {e}")
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._leases.clear()
+        self.table.reset()
+        if self.using_redis:
+            try:
+                keys = list(self.client.scan_iter(match=f"{self.KEY_PREFIX}:*", count=500))
+                if keys:
+                    self.client.unlink(*keys)
+            except redis.RedisError as e:
+                logger.warning(f"Redis rate limit reset failed: {e}")
+
+def _default_shared_table_path() -> str:
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "renewmart-ratelimit")
+
+rate_limit_engine = SlidingWindowEngine(
+    redis_client,
+    SharedWindowTable(
+        getattr(settings, 'RATE_LIMIT_SHARED_TABLE_PATH', '') or _default_shared_table_path(),
+        getattr(settings, 'RATE_LIMIT_SHARED_TABLE_SLOTS', 65536)
+    ),
+    lease_size=getattr(settings, 'RATE_LIMIT_LEASE_SIZE', 5),
+    lease_min_limit=getattr(settings, 'RATE_LIMIT_LEASE_MIN_LIMIT', 100),
+    lease_ttl=getattr(settings, 'RATE_LIMIT_LEASE_TTL', 1.0)
+)
+
+class SlidingWindowStorage(Storage, SlidingWindowCounterSupport):
+    """``limits`` storage backed by rate_limit_engine (``sliding-window://``)
+    
+    Built for the sliding-window-counter strategy; the fixed-window
+    counters behind ``incr``/``get``/``get_expiry`` serve the others.
+    """
+    
+    STORAGE_SCHEME = ["sliding-window"]
+    
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions, **options)
+        self.engine = rate_limit_engine
+    
+    @property
+    def base_exceptions(self):
+        return redis.RedisError
+    
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        return self.engine.incr(key, expiry, amount)
+    
+    def get(self, key: str) -> int:
+        return self.engine.get_counter(key)[0]
+    
+    def get_expiry(self, key: str) -> float:
+        return self.engine.get_counter(key)[1]
+    
+    def check(self) -> bool:
+        return True
+    
+    def reset(self) -> Optional[int]:
+        self.engine.reset()
+        return None
+    
+    def clear(self, key: str) -> None:
+        self.engine.clear(key)
+    
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        return self.engine.acquire(key, limit, expiry, amount)
+    
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        return self.engine.get_window(key, expiry)
+    
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        self.engine.clear(key, expiry)
+
 # Rate limiter configuration
 limiter = Limiter(
     key_func=get_remote_address,
-    storage_uri=f"redis://{getattr(settings, 'REDIS_HOST', 'localhost')}:{getattr(settings, 'REDIS_PORT', 6379)}/{getattr(settings, 'REDIS_DB', 0)}" if redis_client else "memory://",
+    storage_uri="sliding-window://",
+    strategy="sliding-window-counter",
     default_limits=["1000/hour"]  # Global default limit
 )
 
@@ -112,7 +520,8 @@ def create_rate_limiter_with_custom_key():
     """Create a rate limiter with custom key function"""
     return Limiter(
         key_func=get_client_identifier,
-        storage_uri=f"redis://{getattr(settings, 'REDIS_HOST', 'localhost')}:{getattr(settings, 'REDIS_PORT', 6379)}/{getattr(settings, 'REDIS_DB', 0)}" if redis_client else "memory://",
+        storage_uri="sliding-window://",
+        strategy="sliding-window-counter",
         default_limits=["1000/hour"]
     )
 
@@ -138,8 +547,10 @@ def check_rate_limiter_health() -> dict:
     """Check the health of the rate limiting system"""
     health_status = {
         "rate_limiter": "healthy",
-        "storage": "memory" if not redis_client else "redis",
-        "redis_connection": False
+        "storage": "redis" if rate_limit_engine.using_redis else "memory",
+        "shared_memory_fallback": rate_limit_engine.table.shared,
+        "redis_connection": False,
+        "engine_stats": dict(rate_limit_engine.stats)
     }
     
     if redis_client:
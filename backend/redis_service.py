@@ -1,47 +1,190 @@
 import redis
+import redis.asyncio as aioredis
 import json
 import pickle
-from typing import Any, Optional, Union, Dict, List
+from typing import Any, Optional, Union, Dict, List, Iterable, Callable, Tuple
 from functools import wraps
 from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import UUID
+import inspect
+import math
+import random
 import logging
 from config import settings
 import asyncio
+import fnmatch
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+from cache_codec import ValueSerializer, get_codec
 
 logger = logging.getLogger(__name__)
 
+class NearCache:
+    """Bounded in-process LRU with per-entry TTL (the L1 tier in front of Redis)
+    
+    Values are kept in their serialized Redis form and decoded on every read,
+    so callers can never mutate a shared cached object.
+    """
+    
+    def __init__(self, max_size: int = 2048, ttl: int = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a serialized value if present and not expired"""
+        if not self.enabled:
+            return None
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: str, value: bytes, expire: Optional[int] = None):
+        """Store a serialized value, bounded by the L1 TTL and the Redis expiry"""
+        if not self.enabled:
+            return
+        
+        ttl = min(self.ttl, expire) if expire else self.ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, *keys: str) -> int:
+        """Drop specific keys"""
+        with self._lock:
+            removed = sum(1 for key in keys if self._entries.pop(key, None) is not None)
+            self.invalidations += removed
+            return removed
+    
+    def invalidate_pattern(self, pattern: str) -> int:
+        """Drop keys matching a Redis-style glob pattern"""
+        with self._lock:
+            keys = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+            return len(keys)
+    
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get L1 statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / max(lookups, 1) * 100, 2),
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
 class RedisService:
-    """Redis service for caching and session management"""
+    """Redis service for caching and session management
+    
+    Keys under the configured near-cache prefixes (lookup data such as roles
+    and section definitions) are also kept in a per-process LRU. Writes and
+    deletes broadcast an invalidation message over pub/sub so every worker
+    drops its local copy. Other per-process caches can receive the same
+    messages through ``add_invalidation_listener``.
+    """
+    
+    INVALIDATION_CHANNEL = "cache:near:invalidate"
+    RELEASE_LOCK_SCRIPT = """
+        if redis.call('get', KEYS[1]) == ARGV[1] then
+            return redis.call('del', KEYS[1])
+        end
+        return 0
+    """
     
     def __init__(self):
         self.redis_client: Optional[redis.Redis] = None
+        # Cached values are binary (see cache_codec), so they use a client without response decoding
+        self.binary_client: Optional[redis.Redis] = None
         self.is_connected = False
+        self.serializer = ValueSerializer(
+            codec=get_codec(getattr(settings, 'CACHE_CODEC', 'msgpack')),
+            compress_threshold=getattr(settings, 'CACHE_COMPRESS_THRESHOLD', 1024),
+            compress_level=getattr(settings, 'CACHE_COMPRESS_LEVEL', 6)
+        )
+        self.instance_id = uuid.uuid4().hex
+        self.near_cache = NearCache(
+            max_size=getattr(settings, 'NEAR_CACHE_SIZE', 2048),
+            ttl=getattr(settings, 'NEAR_CACHE_TTL', 300)
+        )
+        self.near_cache_prefixes = tuple(getattr(settings, 'NEAR_CACHE_PREFIXES', ["lookup:"]))
+        self._metrics_lock = threading.Lock()
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self._pubsub = None
+        self._pubsub_thread = None
+        self._invalidation_listeners: List[Callable[[List[str], Optional[str]], None]] = []
+        self._scripts: Dict[str, Any] = {}
         self._initialize_connection()
     
     def _initialize_connection(self):
         """Initialize Redis connection with fallback handling"""
         try:
-            self.redis_client = redis.Redis(
+            connection_kwargs = dict(
                 host=getattr(settings, 'REDIS_HOST', 'localhost'),
                 port=getattr(settings, 'REDIS_PORT', 6379),
                 db=getattr(settings, 'REDIS_DB', 0),
                 password=getattr(settings, 'REDIS_PASSWORD', '') or None,
-                decode_responses=True,
                 socket_connect_timeout=5,
                 socket_timeout=5,
                 retry_on_timeout=True,
                 health_check_interval=30
             )
+            self.redis_client = redis.Redis(decode_responses=True, **connection_kwargs)
+            self.binary_client = redis.Redis(decode_responses=False, **connection_kwargs)
+            self._scripts = {}
             
             # Test connection
             self.redis_client.ping()
             self.is_connected = True
             logger.info(f"Redis connected successfully to {settings.REDIS_HOST}:{settings.REDIS_PORT}")
-            
+            self._start_invalidation_listener()
+        
         except Exception as e:
             logger.warning(f"Redis connection failed: {e}. Caching will be disabled.")
             self.redis_client = None
+            self.binary_client = None
             self.is_connected = False
     
     def reconnect(self) -> bool:
@@ -50,30 +193,149 @@ class RedisService:
             self._initialize_connection()
         return self.is_connected
     
+    def _start_invalidation_listener(self):
+        """Subscribe to near-cache invalidation messages from other workers"""
+        if not (self.near_cache.enabled or self._invalidation_listeners) or self._pubsub_thread is not None:
+            return
+        
+        try:
+            self._pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.INVALIDATION_CHANNEL: self._handle_invalidation})
+            self._pubsub_thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        except Exception as e:
+            logger.warning(f"Near-cache invalidation listener unavailable: {e}")
+            self._pubsub = None
+            self._pubsub_thread = None
+    
+    def _handle_invalidation(self, message: Dict[str, Any]):
+        """Apply an invalidation message published by another worker"""
+        try:
+            payload = json.loads(message["data"])
+        except (json.JSONDecodeError, TypeError, KeyError):
+            return
+        
+        if payload.get("origin") == self.instance_id:
+            return
+        if payload.get("keys"):
+            self.near_cache.invalidate(*payload["keys"])
+        if payload.get("pattern"):
+            self.near_cache.invalidate_pattern(payload["pattern"])
+        for listener in self._invalidation_listeners:
+            try:
+                listener(payload.get("keys") or [], payload.get("pattern"))
+            except Exception as e:
+                logger.error(f"Invalidation listener error: {e}")
+    
+    def add_invalidation_listener(self, listener: Callable[[List[str], Optional[str]], None]):
+        """Receive invalidations published by other workers
+        
+        Args:
+            listener: Called with the invalidated keys and pattern
+        """
+        self._invalidation_listeners.append(listener)
+        if self.is_connected and self.redis_client:
+            self._start_invalidation_listener()
+    
+    def _is_near_cached(self, key: str) -> bool:
+        """Check whether a key is served from the in-process tier"""
+        return self.near_cache.enabled and key.startswith(self.near_cache_prefixes)
+    
+    def invalidate_near_cache(self, keys: Optional[List[str]] = None, pattern: Optional[str] = None):
+        """Drop near-cached keys locally and in every other worker
+        
+        Args:
+            keys: Exact keys to drop
+            pattern: Redis-style glob pattern to drop
+        """
+        if keys:
+            self.near_cache.invalidate(*keys)
+        if pattern:
+            self.near_cache.invalidate_pattern(pattern)
+        
+        if not self.is_connected or not self.redis_client or not (keys or pattern):
+            return
+        
+        try:
+            message = {"origin": self.instance_id, "keys": keys or [], "pattern": pattern}
+            self.redis_client.publish(self.INVALIDATION_CHANNEL, json.dumps(message))
+        except Exception as e:
+            logger.error(f"Near-cache invalidation publish error: {e}")
+    
+    def close(self):
+        """Stop the invalidation listener"""
+        if self._pubsub_thread is not None:
+            self._pubsub_thread.stop()
+            self._pubsub_thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+    
+    def _record_l2(self, hit: bool):
+        """Record a Redis (L2) lookup outcome"""
+        with self._metrics_lock:
+            if hit:
+                self.l2_hits += 1
+            else:
+                self.l2_misses += 1
+    
+    def _serialize(self, value: Any) -> bytes:
+        """Serialize a value for storage with the configured codec"""
+        return self.serializer.dumps(value)
+    
+    def _deserialize(self, value: bytes) -> Any:
+        """Deserialize a stored value (including values written as plain JSON/text)"""
+        return self.serializer.loads(value)
+    
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """Get hit metrics for the in-process (L1) and Redis (L2) tiers
+        
+        Returns:
+            Dictionary with L1 and L2 statistics
+        """
+        with self._metrics_lock:
+            l2_lookups = self.l2_hits + self.l2_misses
+            l2 = {
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "hit_rate": round(self.l2_hits / max(l2_lookups, 1) * 100, 2)
+            }
+        
+        return {
+            "codec": {
+                "name": self.serializer.codec.name,
+                "compress_threshold": self.serializer.compress_threshold
+            },
+            "l1": {
+                **self.near_cache.get_stats(),
+                "prefixes": list(self.near_cache_prefixes),
+                "listener_running": self._pubsub_thread is not None
+            },
+            "l2": l2
+        }
+    
     def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
         """Set a key-value pair in Redis with optional expiration
         
         Args:
             key: Redis key
-            value: Value to store (will be JSON serialized)
+            value: Value to store (encoded with the configured codec)
             expire: Expiration time in seconds
-            
+        
         Returns:
             True if successful, False otherwise
         """
         if not self.is_connected or not self.redis_client:
             return False
-            
+        
         try:
-            # Serialize complex objects to JSON
-            if isinstance(value, (dict, list, tuple)):
-                serialized_value = json.dumps(value, default=str)
-            else:
-                serialized_value = str(value)
+            serialized_value = self._serialize(value)
             
-            result = self.redis_client.set(key, serialized_value, ex=expire)
+            result = self.binary_client.set(key, serialized_value, ex=expire)
+            if result and self._is_near_cached(key):
+                self.invalidate_near_cache(keys=[key])
+                self.near_cache.set(key, serialized_value, expire)
             return bool(result)
-            
+        
         except Exception as e:
             logger.error(f"Redis SET error for key '{key}': {e}")
             return False
@@ -84,24 +346,29 @@ class RedisService:
         Args:
             key: Redis key
             default: Default value if key doesn't exist
-            
+        
         Returns:
             Stored value or default
         """
+        near_cached = self._is_near_cached(key)
+        if near_cached:
+            value = self.near_cache.get(key)
+            if value is not None:
+                return self._deserialize(value)
+        
         if not self.is_connected or not self.redis_client:
             return default
-            
+        
         try:
-            value = self.redis_client.get(key)
+            value = self.binary_client.get(key)
+            self._record_l2(value is not None)
             if value is None:
                 return default
             
-            # Try to deserialize JSON
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
-                
+            if near_cached:
+                self.near_cache.set(key, value)
+            return self._deserialize(value)
+        
         except Exception as e:
             logger.error(f"Redis GET error for key '{key}': {e}")
             return default
@@ -111,31 +378,123 @@ class RedisService:
         
         Args:
             keys: Redis keys to delete
-            
+        
         Returns:
             Number of keys deleted
         """
         if not self.is_connected or not self.redis_client or not keys:
             return 0
-            
+        
+        near_keys = [key for key in keys if self._is_near_cached(key)]
+        if near_keys:
+            self.invalidate_near_cache(keys=near_keys)
+        
         try:
             return self.redis_client.delete(*keys)
         except Exception as e:
             logger.error(f"Redis DELETE error for keys {keys}: {e}")
             return 0
     
+    def get_many(self, keys: List[str], default: Any = None) -> Dict[str, Any]:
+        """Get several values in one round trip (MGET)
+        
+        Args:
+            keys: Redis keys
+            default: Value for keys that don't exist
+        
+        Returns:
+            Dictionary mapping every requested key to its value or default
+        """
+        results = {key: default for key in keys}
+        remaining = []
+        for key in dict.fromkeys(keys):
+            value = self.near_cache.get(key) if self._is_near_cached(key) else None
+            if value is not None:
+                results[key] = self._deserialize(value)
+            else:
+                remaining.append(key)
+        
+        if not remaining or not self.is_connected or not self.redis_client:
+            return results
+        
+        try:
+            values = self.binary_client.mget(remaining)
+        except Exception as e:
+            logger.error(f"Redis MGET error for {len(remaining)} keys: {e}")
+            return results
+        
+        for key, value in zip(remaining, values):
+            self._record_l2(value is not None)
+            if value is None:
+                continue
+            if self._is_near_cached(key):
+                self.near_cache.set(key, value)
+            try:
+                results[key] = self._deserialize(value)
+            except Exception as e:
+                logger.error(f"Redis MGET decode error for key '{key}': {e}")
+        return results
+    
+    def set_many(self, items: Dict[str, Any], expire: Union[int, Dict[str, int], None] = None) -> bool:
+        """Set several key-value pairs in one round trip
+        
+        Args:
+            items: Mapping of Redis key to value
+            expire: Expiration in seconds for every key, or a mapping of per-key expirations
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not items:
+            return True
+        
+        with self.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(key, value, expire.get(key) if isinstance(expire, dict) else expire)
+        return pipe.succeeded
+    
+    def delete_many(self, keys: List[str]) -> int:
+        """Delete several keys in one round trip without blocking Redis (UNLINK)
+        
+        Args:
+            keys: Redis keys to delete
+        
+        Returns:
+            Number of keys deleted
+        """
+        if not keys:
+            return 0
+        
+        with self.pipeline(transaction=False) as pipe:
+            pipe.unlink(*keys)
+        return sum(pipe.results)
+    
+    def pipeline(self, transaction: bool = True) -> "RedisPipeline":
+        """Queue commands for a single round trip
+        
+        Use as a context manager; queued commands are executed on exit. With
+        ``transaction=True`` they run atomically inside MULTI/EXEC.
+        
+        Args:
+            transaction: Wrap the commands in MULTI/EXEC
+        
+        Returns:
+            RedisPipeline
+        """
+        return RedisPipeline(self, transaction)
+    
     def exists(self, key: str) -> bool:
         """Check if a key exists in Redis
         
         Args:
             key: Redis key
-            
+        
         Returns:
             True if key exists, False otherwise
         """
         if not self.is_connected or not self.redis_client:
             return False
-            
+        
         try:
             return bool(self.redis_client.exists(key))
         except Exception as e:
@@ -148,13 +507,13 @@ class RedisService:
         Args:
             key: Redis key
             seconds: Expiration time in seconds
-            
+        
         Returns:
             True if successful, False otherwise
         """
         if not self.is_connected or not self.redis_client:
             return False
-            
+        
         try:
             return bool(self.redis_client.expire(key, seconds))
         except Exception as e:
@@ -166,13 +525,13 @@ class RedisService:
         
         Args:
             key: Redis key
-            
+        
         Returns:
             TTL in seconds, -1 if no expiration, -2 if key doesn't exist
         """
         if not self.is_connected or not self.redis_client:
             return -2
-            
+        
         try:
             return self.redis_client.ttl(key)
         except Exception as e:
@@ -185,19 +544,84 @@ class RedisService:
         Args:
             key: Redis key
             amount: Amount to increment by
-            
+        
         Returns:
             New value after increment, None if failed
         """
         if not self.is_connected or not self.redis_client:
             return None
-            
+        
         try:
             return self.redis_client.incrby(key, amount)
         except Exception as e:
             logger.error(f"Redis INCRBY error for key '{key}': {e}")
             return None
     
+    def eval_script(self, script: str, keys: List[str], args: List[Any], default: Any = None) -> Any:
+        """Run a Lua script (cached server-side and invoked with EVALSHA)
+        
+        Args:
+            script: Lua source
+            keys: KEYS for the script
+            args: ARGV for the script
+            default: Value returned if Redis is unavailable or the script fails
+        
+        Returns:
+            Raw script result (bytes are not decoded) or default
+        """
+        if not self.is_connected or not self.binary_client:
+            return default
+        
+        try:
+            runner = self._scripts.get(script)
+            if runner is None:
+                runner = self._scripts[script] = self.binary_client.register_script(script)
+            return runner(keys=keys, args=args)
+        except Exception as e:
+            logger.error(f"Redis script error for keys {keys}: {e}")
+            return default
+    
+    def acquire_lock(self, key: str, ttl_ms: int) -> Optional[str]:
+        """Acquire a short-lived lock with SET NX PX
+        
+        Args:
+            key: Lock key
+            ttl_ms: Lock lifetime in milliseconds
+        
+        Returns:
+            Lock token if acquired, None otherwise
+        """
+        if not self.is_connected or not self.redis_client:
+            return None
+        
+        token = uuid.uuid4().hex
+        try:
+            if self.redis_client.set(key, token, nx=True, px=ttl_ms):
+                return token
+            return None
+        except Exception as e:
+            logger.error(f"Redis lock error for key '{key}': {e}")
+            return None
+    
+    def release_lock(self, key: str, token: str) -> bool:
+        """Release a lock only if it is still held with the given token
+        
+        Args:
+            key: Lock key
+            token: Token returned by acquire_lock
+        
+        Returns:
+            True if the lock was released, False otherwise
+        """
+        if not self.is_connected or not self.redis_client:
+            return False
+        
+        try:
+            return bool(self.redis_client.eval(self.RELEASE_LOCK_SCRIPT, 1, key, token))
+        except Exception as e:
+            logger.error(f"Redis unlock error for key '{key}': {e}")
+            return False
+    
     def get_health_status(self) -> Dict[str, Any]:
         """Get Redis health status
         
@@ -226,222 +650,1288 @@ class RedisService:
         
         return status
 
-# Global Redis service instance
-redis_service = RedisService()
-
-# Caching decorators
-def cache_result(expire: int = 300, key_prefix: str = ""):
-    """Decorator to cache function results
-    
-    Args:
-        expire: Cache expiration time in seconds (default: 5 minutes)
-        key_prefix: Prefix for cache keys
+class RedisPipeline:
+    """Batched Redis commands with the same graceful degradation as RedisService
     
-    Returns:
-        Decorated function
+    Values passed to ``set`` are encoded with the service codec and ``get``
+    results are decoded. When Redis is unavailable or the batch fails,
+    ``execute`` returns an empty list and ``succeeded`` is False instead of
+    raising.
     """
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Generate cache key
-            cache_key = f"{key_prefix}:{func.__name__}:{hash(str(args) + str(sorted(kwargs.items())))}"
-            
-            # Try to get from cache
-            cached_result = redis_service.get(cache_key)
-            if cached_result is not None:
-                logger.debug(f"Cache hit for key: {cache_key}")
-                return cached_result
-            
-            # Execute function and cache result
-            result = func(*args, **kwargs)
-            if result is not None:
-                redis_service.set(cache_key, result, expire)
-                logger.debug(f"Cached result for key: {cache_key}")
-            
-            return result
-        return wrapper
-    return decorator
-
-def cache_async_result(expire: int = 300, key_prefix: str = ""):
-    """Decorator to cache async function results
     
-    Args:
-        expire: Cache expiration time in seconds (default: 5 minutes)
-        key_prefix: Prefix for cache keys
+    def __init__(self, service: RedisService, transaction: bool = True):
+        self.service = service
+        self.transaction = transaction
+        self._commands: List[tuple] = []
+        self._near_keys: List[str] = []
+        self.results: List[Any] = []
+        self.succeeded = False
     
-    Returns:
-        Decorated async function
-    """
-    def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            # Generate cache key
-            cache_key = f"{key_prefix}:{func.__name__}:{hash(str(args) + str(sorted(kwargs.items())))}"
-            
-            # Try to get from cache
-            cached_result = redis_service.get(cache_key)
-            if cached_result is not None:
-                logger.debug(f"Cache hit for key: {cache_key}")
-                return cached_result
-            
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            if result is not None:
-                redis_service.set(cache_key, result, expire)
-                logger.debug(f"Cached result for key: {cache_key}")
-            
-            return result
-        return wrapper
-    return decorator
-
-# Session management
-class SessionManager:
-    """Redis-based session management"""
+    def __enter__(self) -> "RedisPipeline":
+        return self
     
-    def __init__(self, session_prefix: str = "session", default_expire: int = 3600):
-        self.session_prefix = session_prefix
-        self.default_expire = default_expire
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.execute()
+        return False
     
-    def _get_session_key(self, session_id: str) -> str:
-        """Generate session key"""
-        return f"{self.session_prefix}:{session_id}"
+    def _queue(self, command: str, *args, decode: bool = False, **kwargs) -> "RedisPipeline":
+        self._commands.append((command, args, kwargs, decode))
+        return self
     
-    def create_session(self, session_id: str, data: Dict[str, Any], expire: Optional[int] = None) -> bool:
-        """Create a new session
-        
-        Args:
-            session_id: Unique session identifier
-            data: Session data
-            expire: Session expiration time in seconds
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        key = self._get_session_key(session_id)
-        expire_time = expire or self.default_expire
-        
-        session_data = {
-            "data": data,
-            "created_at": datetime.utcnow().isoformat(),
-            "last_accessed": datetime.utcnow().isoformat()
-        }
-        
-        return redis_service.set(key, session_data, expire_time)
+    def _touch(self, *keys: str):
+        self._near_keys.extend(key for key in keys if self.service._is_near_cached(key))
     
-    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Get session data
+    def set(self, key: str, value: Any, expire: Optional[int] = None) -> "RedisPipeline":
+        """Queue a SET of an encoded value"""
+        self._touch(key)
+        return self._queue("set", key, self.service._serialize(value), ex=expire)
+    
+    def get(self, key: str) -> "RedisPipeline":
+        """Queue a GET; the result is decoded"""
+        return self._queue("get", key, decode=True)
+    
+    def delete(self, *keys: str) -> "RedisPipeline":
+        """Queue a DEL"""
+        self._touch(*keys)
+        return self._queue("delete", *keys)
+    
+    def unlink(self, *keys: str) -> "RedisPipeline":
+        """Queue an UNLINK"""
+        self._touch(*keys)
+        return self._queue("unlink", *keys)
+    
+    def expire(self, key: str, seconds: int) -> "RedisPipeline":
+        """Queue an EXPIRE"""
+        return self._queue("expire", key, seconds)
+    
+    def increment(self, key: str, amount: int = 1) -> "RedisPipeline":
+        """Queue an INCRBY"""
+        return self._queue("incrby", key, amount)
+    
+    def execute(self) -> List[Any]:
+        """Run the queued commands in one round trip
         
-        Args:
-            session_id: Session identifier
-            
         Returns:
-            Session data or None if not found
+            Command results in queue order, or an empty list on failure
         """
-        key = self._get_session_key(session_id)
-        session_data = redis_service.get(key)
+        commands, self._commands = self._commands, []
+        self.results = []
+        self.succeeded = False
+        if not commands:
+            self.succeeded = True
+            return self.results
+        if not self.service.is_connected or not self.service.binary_client:
+            return self.results
         
-        if session_data:
-            # Update last accessed time
-            session_data["last_accessed"] = datetime.utcnow().isoformat()
-            redis_service.set(key, session_data, self.default_expire)
-            return session_data.get("data")
+        if self._near_keys:
+            self.service.invalidate_near_cache(keys=list(dict.fromkeys(self._near_keys)))
+            self._near_keys = []
         
-        return None
-    
-    def update_session(self, session_id: str, data: Dict[str, Any]) -> bool:
-        """Update session data
+        try:
+            pipe = self.service.binary_client.pipeline(transaction=self.transaction)
+            for command, args, kwargs, _ in commands:
+                getattr(pipe, command)(*args, **kwargs)
+            raw_results = pipe.execute()
+        except Exception as e:
+            logger.error(f"Redis pipeline error ({len(commands)} commands): {e}")
+            return self.results
+        
+        for (_, _, _, decode), result in zip(commands, raw_results):
+            if decode and result is not None:
+                result = self.service._deserialize(result)
+            self.results.append(result)
+        self.succeeded = True
+        return self.results
+
+# Global Redis service instance
+redis_service = RedisService()
+
+class AsyncRedisService:
+    """Non-blocking Redis access for coroutines (redis.asyncio with a connection pool)
+    
+    Shares the codec, near cache and L2 metrics of a RedisService and follows
+    its connection state, so an unavailable Redis degrades the same way: reads
+    return defaults and writes return False.
+    """
+    
+    def __init__(self, service: RedisService, max_connections: int = 50):
+        self.service = service
+        self.max_connections = max_connections
+        self._client: Optional[aioredis.Redis] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._scripts: Dict[str, Any] = {}
+    
+    @property
+    def is_connected(self) -> bool:
+        return self.service.is_connected
+    
+    def _get_client(self) -> aioredis.Redis:
+        """Get the pooled client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        # Connections are bound to the loop that opened them
+        if self._client is None or self._loop is not loop:
+            pool = aioredis.ConnectionPool(
+                host=getattr(settings, 'REDIS_HOST', 'localhost'),
+                port=getattr(settings, 'REDIS_PORT', 6379),
+                db=getattr(settings, 'REDIS_DB', 0),
+                password=getattr(settings, 'REDIS_PASSWORD', '') or None,
+                max_connections=self.max_connections,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                health_check_interval=30
+            )
+            self._client = aioredis.Redis(connection_pool=pool)
+            self._loop = loop
+            self._scripts = {}
+        return self._client
+    
+    async def _invalidate_near_cache(self, keys: List[str]):
+        """Drop near-cached keys locally and broadcast the invalidation"""
+        self.service.near_cache.invalidate(*keys)
+        try:
+            message = {"origin": self.service.instance_id, "keys": keys, "pattern": None}
+            await self._get_client().publish(RedisService.INVALIDATION_CHANNEL, json.dumps(message))
+        except Exception as e:
+            logger.error(f"Near-cache invalidation publish error: {e}")
+    
+    async def get(self, key: str, default: Any = None) -> Any:
+        """Get a value from Redis
         
         Args:
-            session_id: Session identifier
-            data: New session data
+            key: Redis key
+            default: Default value if key doesn't exist
+        
+        Returns:
+            Stored value or default
+        """
+        near_cached = self.service._is_near_cached(key)
+        if near_cached:
+            value = self.service.near_cache.get(key)
+            if value is not None:
+                return self.service._deserialize(value)
+        
+        if not self.is_connected:
+            return default
+        
+        try:
+            value = await self._get_client().get(key)
+            self.service._record_l2(value is not None)
+            if value is None:
+                return default
             
+            if near_cached:
+                self.service.near_cache.set(key, value)
+            return self.service._deserialize(value)
+        except Exception as e:
+            logger.error(f"Redis async GET error for key '{key}': {e}")
+            return default
+    
+    async def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
+        """Set a key-value pair in Redis with optional expiration
+        
+        Args:
+            key: Redis key
+            value: Value to store (encoded with the configured codec)
+            expire: Expiration time in seconds
+        
         Returns:
             True if successful, False otherwise
         """
-        key = self._get_session_key(session_id)
-        existing_session = redis_service.get(key)
+        if not self.is_connected:
+            return False
         
-        if existing_session:
-            existing_session["data"].update(data)
-            existing_session["last_accessed"] = datetime.utcnow().isoformat()
-            return redis_service.set(key, existing_session, self.default_expire)
+        try:
+            serialized_value = self.service._serialize(value)
+            result = await self._get_client().set(key, serialized_value, ex=expire)
+            if result and self.service._is_near_cached(key):
+                await self._invalidate_near_cache([key])
+                self.service.near_cache.set(key, serialized_value, expire)
+            return bool(result)
+        except Exception as e:
+            logger.error(f"Redis async SET error for key '{key}': {e}")
+            return False
+    
+    async def delete(self, *keys: str) -> int:
+        """Delete one or more keys from Redis
         
+        Args:
+            keys: Redis keys to delete
+        
+        Returns:
+            Number of keys deleted
+        """
+        if not self.is_connected or not keys:
+            return 0
+        
+        near_keys = [key for key in keys if self.service._is_near_cached(key)]
+        if near_keys:
+            await self._invalidate_near_cache(near_keys)
+        
+        try:
+            return await self._get_client().delete(*keys)
+        except Exception as e:
+            logger.error(f"Redis async DELETE error for keys {keys}: {e}")
+            return 0
+    
+    async def exists(self, key: str) -> bool:
+        """Check if a key exists in Redis
+        
+        Args:
+            key: Redis key
+        
+        Returns:
+            True if key exists, False otherwise
+        """
+        if not self.is_connected:
+            return False
+        
+        try:
+            return bool(await self._get_client().exists(key))
+        except Exception as e:
+            logger.error(f"Redis async EXISTS error for key '{key}': {e}")
+            return False
+    
+    async def set_with_tags(self, key: str, value: Any, tag_keys: List[str], expire: int) -> bool:
+        """Store a value and add its key to tag sets in one round trip
+        
+        Args:
+            key: Redis key
+            value: Value to store
+            tag_keys: Tag set keys to register the key under
+            expire: Expiration time in seconds
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.is_connected:
+            return False
+        
+        try:
+            pipe = self._get_client().pipeline(transaction=False)
+            pipe.set(key, self.service._serialize(value), ex=expire)
+            for tag_key in tag_keys:
+                pipe.sadd(tag_key, key)
+                pipe.expire(tag_key, expire + 60)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Redis async SET error for key '{key}': {e}")
+            return False
+    
+    async def eval_script(self, script: str, keys: List[str], args: List[Any], default: Any = None) -> Any:
+        """Run a Lua script (cached server-side and invoked with EVALSHA)
+        
+        Args:
+            script: Lua source
+            keys: KEYS for the script
+            args: ARGV for the script
+            default: Value returned if Redis is unavailable or the script fails
+        
+        Returns:
+            Raw script result (bytes are not decoded) or default
+        """
+        if not self.is_connected:
+            return default
+        
+        try:
+            client = self._get_client()
+            runner = self._scripts.get(script)
+            if runner is None:
+                runner = self._scripts[script] = client.register_script(script)
+            return await runner(keys=keys, args=args)
+        except Exception as e:
+            logger.error(f"Redis async script error for keys {keys}: {e}")
+            return default
+    
+    async def acquire_lock(self, key: str, ttl_ms: int) -> Optional[str]:
+        """Acquire a short-lived lock with SET NX PX
+        
+        Args:
+            key: Lock key
+            ttl_ms: Lock lifetime in milliseconds
+        
+        Returns:
+            Lock token if acquired, None otherwise
+        """
+        if not self.is_connected:
+            return None
+        
+        token = uuid.uuid4().hex
+        try:
+            if await self._get_client().set(key, token, nx=True, px=ttl_ms):
+                return token
+            return None
+        except Exception as e:
+            logger.error(f"Redis async lock error for key '{key}': {e}")
+            return None
+    
+    async def release_lock(self, key: str, token: str) -> bool:
+        """Release a lock only if it is still held with the given token
+        
+        Args:
+            key: Lock key
+            token: Token returned by acquire_lock
+        
+        Returns:
+            True if the lock was released, False otherwise
+        """
+        if not self.is_connected:
+            return False
+        
+        try:
+            return bool(await self._get_client().eval(RedisService.RELEASE_LOCK_SCRIPT, 1, key, token))
+        except Exception as e:
+            logger.error(f"Redis async unlock error for key '{key}': {e}")
+            return False
+    
+    async def close(self):
+        """Close the connection pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+# Global async Redis service instance
+async_redis_service = AsyncRedisService(
+    redis_service,
+    max_connections=getattr(settings, 'REDIS_ASYNC_MAX_CONNECTIONS', 50)
+)
+
+# Caching decorators
+# Arguments that never influence a cached result (connections, request objects)
+DEFAULT_KEY_EXCLUDE = ("db", "request")
+
+def _canonicalize(value: Any) -> Any:
+    """Convert a value into a deterministic, JSON-serializable form
+    
+    Unlike ``hash()``, the result does not depend on PYTHONHASHSEED, so every
+    worker process derives the same cache key for the same arguments.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _canonicalize(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonicalize(v) for v in value), key=lambda v: json.dumps(v, sort_keys=True))
+    if hasattr(value, "model_dump"):
+        return _canonicalize(value.model_dump(mode="json"))
+    if isinstance(value, (datetime, UUID, Decimal)):
+        return f"{type(value).__name__}:{value}"
+    return f"{type(value).__name__}:{value!s}"
+
+def build_cache_key(key_prefix: str, func, args: tuple, kwargs: dict,
+                    exclude: Iterable[str] = DEFAULT_KEY_EXCLUDE) -> str:
+    """Build a process-independent cache key for a function call
+    
+    Args:
+        key_prefix: Prefix for cache keys
+        func: Cached function
+        args: Positional call arguments
+        kwargs: Keyword call arguments
+        exclude: Parameter names left out of the key
+    
+    Returns:
+        Cache key of the form "<prefix>:<function>:<blake2 digest>"
+    """
+    try:
+        bound = inspect.signature(func).bind_partial(*args, **kwargs)
+        call_args = dict(bound.arguments)
+    except (TypeError, ValueError):
+        call_args = {"args": list(args), **kwargs}
+    
+    excluded = set(exclude)
+    payload = {name: value for name, value in call_args.items() if name not in excluded}
+    canonical = json.dumps(_canonicalize(payload), sort_keys=True, separators=(",", ":"))
+    digest = hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+    return f"{key_prefix}:{func.__module__}.{func.__qualname__}:{digest}"
+
+class CacheCounters:
+    """Thread-safe hit/miss counters for a cached function"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.early_refreshes = 0
+        self.coalesced = 0
+        self.stale_served = 0
+    
+    def record(self, hit: bool, stored: bool = False):
+        """Record the outcome of a cache lookup"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if stored:
+                self.stores += 1
+    
+    def record_event(self, name: str):
+        """Record a stampede-protection event (early_refreshes, coalesced, stale_served)"""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the current counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "early_refreshes": self.early_refreshes,
+                "coalesced": self.coalesced,
+                "stale_served": self.stale_served,
+                "hit_rate": round(self.hits / max(lookups, 1) * 100, 2)
+            }
+
+# Counters for every decorated function, keyed by qualified name
+cache_counters: Dict[str, CacheCounters] = {}
+
+def _register_counters(func) -> CacheCounters:
+    """Create and register the counters for a decorated function"""
+    name = f"{func.__module__}.{func.__qualname__}"
+    return cache_counters.setdefault(name, CacheCounters(name))
+
+def get_decorator_stats() -> Dict[str, Dict[str, Any]]:
+    """Get hit/miss counters for every cached function
+    
+    Returns:
+        Dictionary of counters keyed by qualified function name
+    """
+    return {name: counters.snapshot() for name, counters in cache_counters.items()}
+
+# Stampede protection
+# Computations in flight in this process, so concurrent callers await one result
+_inflight: Dict[str, asyncio.Future] = {}
+
+class _LeaderCancelled(Exception):
+    """The caller computing a coalesced result was cancelled; waiters retry"""
+
+def _wrap_entry(value: Any, delta: float, expire: int) -> Dict[str, Any]:
+    """Wrap a computed value with its compute time and expiry for early refresh"""
+    return {"__cached__": True, "value": value, "delta": delta, "expires_at": time.time() + expire}
+
+def _unwrap_entry(cached: Any) -> Optional[Dict[str, Any]]:
+    """Return the cache entry envelope, wrapping values stored without one"""
+    if cached is None:
+        return None
+    if isinstance(cached, dict) and cached.get("__cached__"):
+        return cached
+    return {"value": cached, "delta": 0.0, "expires_at": float("inf")}
+
+def _should_refresh_early(entry: Dict[str, Any], beta: float) -> bool:
+    """Probabilistic early expiration (XFetch)
+    
+    The closer an entry is to expiry, and the longer it took to compute, the
+    more likely a reader is to recompute it ahead of time, so the refresh
+    happens on one request instead of every request at the expiry instant.
+    """
+    if beta <= 0 or not entry.get("delta"):
         return False
+    jitter = -entry["delta"] * beta * math.log(1.0 - random.random())
+    return time.time() + jitter >= entry["expires_at"]
+
+def _store_result(cache_key: str, result: Any, delta: float, expire: int,
+                  tags: Optional[Callable[..., List[str]]], args: tuple, kwargs: dict) -> bool:
+    """Store a computed result and register its invalidation tags"""
+    if result is None:
+        return False
+    stored = redis_service.set(cache_key, _wrap_entry(result, delta, expire), expire)
+    if stored and tags is not None:
+        response_cache.tag(cache_key, tags(*args, **kwargs), expire)
+    return stored
+
+async def _store_result_async(cache_key: str, result: Any, delta: float, expire: int,
+                              tags: Optional[Callable[..., List[str]]], args: tuple, kwargs: dict) -> bool:
+    """Store a computed result and its invalidation tags without blocking the loop"""
+    if result is None:
+        return False
+    entry = _wrap_entry(result, delta, expire)
+    if tags is None or not response_cache.enabled:
+        return await async_redis_service.set(cache_key, entry, expire)
+    tag_keys = [response_cache._tag_key(tag) for tag in set(tags(*args, **kwargs))]
+    return await async_redis_service.set_with_tags(cache_key, entry, tag_keys, expire)
+
+async def _await_other_worker(cache_key: str, lock_timeout: float, poll_interval: float) -> Optional[Dict[str, Any]]:
+    """Poll for a result another worker is computing under the Redis lock"""
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(poll_interval)
+        entry = _unwrap_entry(await async_redis_service.get(cache_key))
+        if entry is not None:
+            return entry
+    return None
+
+def _wait_for_other_worker(cache_key: str, lock_timeout: float, poll_interval: float) -> Optional[Dict[str, Any]]:
+    """Blocking variant of _await_other_worker for sync functions"""
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        entry = _unwrap_entry(redis_service.get(cache_key))
+        if entry is not None:
+            return entry
+    return None
+
+def cache_result(expire: int = 300, key_prefix: str = "", exclude: Iterable[str] = DEFAULT_KEY_EXCLUDE,
+                 single_flight: bool = False, early_refresh: float = 0.0,
+                 lock_timeout: float = 10.0, poll_interval: float = 0.05,
+                 tags: Optional[Callable[..., List[str]]] = None):
+    """Decorator to cache function results
+    
+    Args:
+        expire: Cache expiration time in seconds (default: 5 minutes)
+        key_prefix: Prefix for cache keys
+        exclude: Parameter names left out of the cache key (e.g. "db", "current_user");
+            only exclude arguments the result does not depend on
+        single_flight: Recompute under a Redis SET NX lock so only one worker
+            runs the function on a miss; the others wait for its result
+        early_refresh: XFetch beta; values above 0 recompute probabilistically
+            before expiry (1.0 is the usual setting)
+        lock_timeout: Seconds to hold the recompute lock / wait for another worker
+        poll_interval: Seconds between cache polls while waiting
+        tags: Callable receiving the call arguments and returning response cache tags
+    
+    Returns:
+        Decorated function
+    """
+    def decorator(func):
+        counters = _register_counters(func)
+        
+        def compute(cache_key, args, kwargs):
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            delta = time.perf_counter() - started
+            stored = _store_result(cache_key, result, delta, expire, tags, args, kwargs)
+            counters.record(hit=False, stored=stored)
+            if stored:
+                logger.debug(f"Cached result for key: {cache_key}")
+            return result
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Generate cache key
+            cache_key = build_cache_key(key_prefix, func, args, kwargs, exclude)
+            
+            # Try to get from cache
+            entry = _unwrap_entry(redis_service.get(cache_key))
+            if entry is not None:
+                if not _should_refresh_early(entry, early_refresh):
+                    counters.record(hit=True)
+                    logger.debug(f"Cache hit for key: {cache_key}")
+                    return entry["value"]
+                counters.record_event("early_refreshes")
+            
+            if not single_flight or not redis_service.is_connected:
+                return compute(cache_key, args, kwargs)
+            
+            # Single flight: the Redis lock serializes workers and threads alike
+            lock_key = f"lock:{cache_key}"
+            token = redis_service.acquire_lock(lock_key, int(lock_timeout * 1000))
+            if token is None:
+                if entry is not None:
+                    counters.record_event("stale_served")
+                    return entry["value"]
+                fresh = _wait_for_other_worker(cache_key, lock_timeout, poll_interval)
+                if fresh is not None:
+                    counters.record_event("coalesced")
+                    return fresh["value"]
+            
+            try:
+                return compute(cache_key, args, kwargs)
+            finally:
+                if token is not None:
+                    redis_service.release_lock(lock_key, token)
+        wrapper.cache_counters = counters
+        return wrapper
+    return decorator
+
+def cache_async_result(expire: int = 300, key_prefix: str = "", exclude: Iterable[str] = DEFAULT_KEY_EXCLUDE,
+                       single_flight: bool = False, early_refresh: float = 0.0,
+                       lock_timeout: float = 10.0, poll_interval: float = 0.05,
+                       tags: Optional[Callable[..., List[str]]] = None):
+    """Decorator to cache async function results
+    
+    Args:
+        expire: Cache expiration time in seconds (default: 5 minutes)
+        key_prefix: Prefix for cache keys
+        exclude: Parameter names left out of the cache key (e.g. "db", "current_user");
+            only exclude arguments the result does not depend on
+        single_flight: Coalesce concurrent misses in this process onto one
+            future and across workers with a Redis SET NX lock
+        early_refresh: XFetch beta; values above 0 recompute probabilistically
+            before expiry (1.0 is the usual setting)
+        lock_timeout: Seconds to hold the recompute lock / wait for another worker
+        poll_interval: Seconds between cache polls while waiting
+        tags: Callable receiving the call arguments and returning response cache tags
+    
+    Returns:
+        Decorated async function
+    """
+    def decorator(func):
+        counters = _register_counters(func)
+        
+        async def compute(cache_key, args, kwargs):
+            started = time.perf_counter()
+            result = await func(*args, **kwargs)
+            delta = time.perf_counter() - started
+            stored = await _store_result_async(cache_key, result, delta, expire, tags, args, kwargs)
+            counters.record(hit=False, stored=stored)
+            if stored:
+                logger.debug(f"Cached result for key: {cache_key}")
+            return result
+        
+        async def compute_locked(cache_key, entry, args, kwargs):
+            if not async_redis_service.is_connected:
+                return await compute(cache_key, args, kwargs)
+            
+            lock_key = f"lock:{cache_key}"
+            token = await async_redis_service.acquire_lock(lock_key, int(lock_timeout * 1000))
+            if token is None:
+                if entry is not None:
+                    counters.record_event("stale_served")
+                    return entry["value"]
+                fresh = await _await_other_worker(cache_key, lock_timeout, poll_interval)
+                if fresh is not None:
+                    counters.record_event("coalesced")
+                    return fresh["value"]
+            
+            try:
+                return await compute(cache_key, args, kwargs)
+            finally:
+                if token is not None:
+                    await async_redis_service.release_lock(lock_key, token)
+        
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            # Generate cache key
+            cache_key = build_cache_key(key_prefix, func, args, kwargs, exclude)
+            
+            # Try to get from cache
+            entry = _unwrap_entry(await async_redis_service.get(cache_key))
+            if entry is not None:
+                if not _should_refresh_early(entry, early_refresh):
+                    counters.record(hit=True)
+                    logger.debug(f"Cache hit for key: {cache_key}")
+                    return entry["value"]
+                counters.record_event("early_refreshes")
+            
+            if not single_flight:
+                return await compute(cache_key, args, kwargs)
+            
+            # Join a computation already running in this process; if its
+            # caller is cancelled, the first waiter to wake takes over
+            loop = asyncio.get_running_loop()
+            while True:
+                pending = _inflight.get(cache_key)
+                if pending is None or pending.get_loop() is not loop:
+                    break
+                counters.record_event("coalesced")
+                try:
+                    return await asyncio.shield(pending)
+                except _LeaderCancelled:
+                    continue
+            
+            future = loop.create_future()
+            # Mark the exception retrieved so an unawaited failure is not logged twice
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            _inflight[cache_key] = future
+            try:
+                result = await compute_locked(cache_key, entry, args, kwargs)
+                future.set_result(result)
+                return result
+            except asyncio.CancelledError:
+                # Only this caller went away; don't cancel the waiters
+                future.set_exception(_LeaderCancelled())
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            finally:
+                if _inflight.get(cache_key) is future:
+                    del _inflight[cache_key]
+        wrapper.cache_counters = counters
+        return wrapper
+    return decorator
+
+# Session management
+class SessionManager:
+    """Redis-based session management
+    
+    Each session is a Redis hash: ``created_at``, ``last_accessed``, ``ttl``
+    and ``role`` bookkeeping fields plus one ``d:<name>`` field per data item
+    (encoded with the cache codec). Reads, touches and partial updates are
+    single Lua script calls, so a touch no longer rewrites the whole session
+    and ``update_session`` only writes the fields that changed.
+    
+    A per-role index backs the session analytics:
+    ``{<prefix>:index}:<role>:access`` (score = last access time plus the
+    session's own TTL, i.e. when it expires unless accessed again),
+    ``{<prefix>:index}:<role>:created`` (score = creation time) and a running
+    ``created_sum`` counter, so counts and average age are read without
+    scanning session keys. The index keys share one hash tag and are kept
+    up to date by a second script call after each session write, so every
+    script only touches the keys it declares (as Redis Cluster requires).
+    Sessions that expire on their own are pruned from the index in batches
+    when the stats are read.
+    """
+    
+    DATA_PREFIX = "d:"
+    
+    # KEYS[1] = session key; ARGV = ttl, field, value, field, value...
+    # Returns the role the session was indexed under before ('' if new)
+    CREATE_SCRIPT = """
+        local old_role = redis.call('hget', KEYS[1], 'role') or ''
+        redis.call('del', KEYS[1])
+        redis.call('hset', KEYS[1], unpack(ARGV, 2))
+        redis.call('expire', KEYS[1], tonumber(ARGV[1]))
+        return old_role
+    """
+    
+    # Refresh the sliding expiry of KEYS[1]; ARGV[1] = now, ARGV[2] = default ttl
+    _TOUCH = """
+        if redis.call('exists', KEYS[1]) == 0 then
+            return false
+        end
+        local ttl = tonumber(redis.call('hget', KEYS[1], 'ttl')) or tonumber(ARGV[2])
+        redis.call('hset', KEYS[1], 'last_accessed', ARGV[1])
+        redis.call('expire', KEYS[1], ttl)
+    """
+    
+    # KEYS[1] = session key; ARGV = now, default ttl
+    GET_SCRIPT = _TOUCH + """
+        return redis.call('hgetall', KEYS[1])
+    """
+    
+    # KEYS[1] = session key; ARGV = now, default ttl, field, value, field, value...
+    # Returns role, ttl and created_ts for the index update
+    UPDATE_SCRIPT = _TOUCH + """
+        if #ARGV > 2 then
+            redis.call('hset', KEYS[1], unpack(ARGV, 3))
+        end
+        return redis.call('hmget', KEYS[1], 'role', 'ttl', 'created_ts')
+    """
+    
+    # KEYS[1] = session key; returns the session's role ('' if it had none) or nil if missing
+    DELETE_SCRIPT = """
+        if redis.call('exists', KEYS[1]) == 0 then
+            return false
+        end
+        local role = redis.call('hget', KEYS[1], 'role') or ''
+        redis.call('del', KEYS[1])
+        return role
+    """
+    
+    # KEYS = access, created, created_sum, roles; ARGV = session id, expires at, created at, role
+    INDEX_SCRIPT = """
+        if redis.call('zadd', KEYS[1], ARGV[2], ARGV[1]) == 1 then
+            redis.call('zadd', KEYS[2], ARGV[3], ARGV[1])
+            redis.call('incrbyfloat', KEYS[3], ARGV[3])
+            redis.call('sadd', KEYS[4], ARGV[4])
+        end
+        return 1
+    """
+    
+    # KEYS = access, created, created_sum; ARGV = session id
+    UNINDEX_SCRIPT = """
+        local created = redis.call('zscore', KEYS[2], ARGV[1])
+        if created then
+            redis.call('incrbyfloat', KEYS[3], -tonumber(created))
+            redis.call('zrem', KEYS[2], ARGV[1])
+        end
+        return redis.call('zrem', KEYS[1], ARGV[1])
+    """
+    
+    # KEYS = access, created, created_sum; ARGV = now timestamp, prune batch size
+    STATS_SCRIPT = """
+        local expired = redis.call('zrangebyscore', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+        for _, sid in ipairs(expired) do
+            local created = redis.call('zscore', KEYS[2], sid)
+            if created then
+                redis.call('incrbyfloat', KEYS[3], -tonumber(created))
+                redis.call('zrem', KEYS[2], sid)
+            end
+            redis.call('zrem', KEYS[1], sid)
+        end
+        local count = redis.call('zcard', KEYS[1])
+        if count == 0 then
+            redis.call('del', KEYS[3])
+            return {0, '0', #expired}
+        end
+        return {count, redis.call('get', KEYS[3]) or '0', #expired}
+    """
+    
+    def __init__(self, session_prefix: str = "session", default_expire: int = 3600,
+                 default_role: str = "unknown", prune_batch_size: int = 500):
+        self.session_prefix = session_prefix
+        self.default_expire = default_expire
+        self.default_role = default_role
+        self.prune_batch_size = prune_batch_size
+    
+    def _get_session_key(self, session_id: str) -> str:
+        """Generate session key"""
+        return f"{self.session_prefix}:{session_id}"
+    
+    def _get_index_prefix(self) -> str:
+        """Prefix for the session index keys; the hash tag keeps them in one cluster slot"""
+        return f"{{{self.session_prefix}:index}}"
+    
+    def _index_keys(self, role: str) -> List[str]:
+        """KEYS for INDEX_SCRIPT; the first three are those of UNINDEX_SCRIPT and STATS_SCRIPT"""
+        base = f"{self._get_index_prefix()}:{role}"
+        return [f"{base}:access", f"{base}:created", f"{base}:created_sum", f"{self._get_index_prefix()}:roles"]
+    
+    @staticmethod
+    def _now() -> str:
+        return datetime.utcnow().isoformat()
+    
+    @staticmethod
+    def _text(value: Any) -> Optional[str]:
+        return value.decode() if isinstance(value, bytes) else value
+    
+    def _encode_fields(self, data: Dict[str, Any]) -> List[Any]:
+        """Flatten session data into HSET field/value arguments"""
+        args = []
+        for name, value in data.items():
+            args.extend([f"{self.DATA_PREFIX}{name}", redis_service._serialize(value)])
+        return args
+    
+    def _decode_fields(self, raw: Any) -> Optional[Dict[str, Any]]:
+        """Rebuild a session from an HGETALL reply (flat list or mapping)"""
+        if not raw:
+            return None
+        
+        items = raw.items() if isinstance(raw, dict) else zip(raw[::2], raw[1::2])
+        session = {"data": {}}
+        for field, value in items:
+            field = self._text(field)
+            if field.startswith(self.DATA_PREFIX):
+                session["data"][field[len(self.DATA_PREFIX):]] = redis_service._deserialize(value)
+            else:
+                session[field] = self._text(value)
+        return session
+    
+    def _resolve_role(self, data: Dict[str, Any], role: Optional[str]) -> str:
+        """Role a session is indexed under: explicit, from the data, or the default"""
+        if role:
+            return role
+        if data.get("role"):
+            return str(data["role"])
+        roles = data.get("roles")
+        if roles:
+            return str(roles[0])
+        return self.default_role
+    
+    def _create_args(self, session_id: str, data: Dict[str, Any], expire: Optional[int],
+                     role: Optional[str]) -> Tuple[List[Any], List[Any]]:
+        """ARGV for CREATE_SCRIPT and for the INDEX_SCRIPT call that follows it"""
+        expire_time = expire or self.default_expire
+        role = self._resolve_role(data, role)
+        now = self._now()
+        now_ts = time.time()
+        fields = [
+            "created_at", now, "last_accessed", now, "created_ts", now_ts,
+            "ttl", expire_time, "role", role
+        ]
+        return [expire_time] + fields + self._encode_fields(data), [session_id, now_ts + expire_time, now_ts, role]
+    
+    def _touch_args(self) -> List[Any]:
+        """Leading ARGV shared by GET_SCRIPT and UPDATE_SCRIPT"""
+        return [self._now(), self.default_expire]
+    
+    def _index_args(self, session_id: str, role: Any, ttl: Any, created_ts: Any) -> Optional[List[Any]]:
+        """ARGV for INDEX_SCRIPT after a touch, from the session's stored fields"""
+        role = self._text(role)
+        if not role:
+            return None
+        now_ts = time.time()
+        ttl = float(self._text(ttl) or self.default_expire)
+        created_ts = float(self._text(created_ts) or now_ts)
+        return [session_id, now_ts + ttl, created_ts, role]
+    
+    def create_session(self, session_id: str, data: Dict[str, Any], expire: Optional[int] = None,
+                       role: Optional[str] = None) -> bool:
+        """Create a new session
+        
+        Args:
+            session_id: Unique session identifier
+            data: Session data
+            expire: Session expiration time in seconds
+            role: Role to index the session under (defaults to data["role"] or data["roles"][0])
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        args, index_args = self._create_args(session_id, data, expire, role)
+        old_role = redis_service.eval_script(self.CREATE_SCRIPT, [self._get_session_key(session_id)], args)
+        if old_role is None:
+            return False
+        if self._text(old_role):
+            redis_service.eval_script(self.UNINDEX_SCRIPT, self._index_keys(self._text(old_role))[:3], [session_id])
+        redis_service.eval_script(self.INDEX_SCRIPT, self._index_keys(index_args[3]), index_args)
+        return True
+    
+    def _reindex(self, args: Optional[List[Any]]):
+        if args:
+            redis_service.eval_script(self.INDEX_SCRIPT, self._index_keys(args[3]), args)
+    
+    def get_session_info(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get session data with its timestamps, refreshing the sliding expiry
+        
+        Args:
+            session_id: Session identifier
+        
+        Returns:
+            Dictionary with data, created_at and last_accessed, or None if not found
+        """
+        raw = redis_service.eval_script(self.GET_SCRIPT, [self._get_session_key(session_id)], self._touch_args())
+        session = self._decode_fields(raw)
+        if session:
+            self._reindex(self._index_args(session_id, session.get("role"), session.get("ttl"), session.get("created_ts")))
+        return session
+    
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get session data
+        
+        Args:
+            session_id: Session identifier
+        
+        Returns:
+            Session data or None if not found
+        """
+        session = self.get_session_info(session_id)
+        return session["data"] if session else None
+    
+    def touch_session(self, session_id: str) -> bool:
+        """Refresh last access time and expiry without reading the session
+        
+        Args:
+            session_id: Session identifier
+        
+        Returns:
+            True if the session exists, False otherwise
+        """
+        return self.update_session(session_id, {})
+    
+    def update_session(self, session_id: str, data: Dict[str, Any]) -> bool:
+        """Update session data
+        
+        Only the given fields are written; other fields are left untouched.
+        
+        Args:
+            session_id: Session identifier
+            data: Changed session fields
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        args = self._touch_args() + self._encode_fields(data)
+        result = redis_service.eval_script(self.UPDATE_SCRIPT, [self._get_session_key(session_id)], args)
+        if not result:
+            return False
+        self._reindex(self._index_args(session_id, *result))
+        return True
     
     def delete_session(self, session_id: str) -> bool:
         """Delete a session
         
         Args:
             session_id: Session identifier
-            
+        
         Returns:
             True if successful, False otherwise
         """
-        key = self._get_session_key(session_id)
-        return redis_service.delete(key) > 0
+        role = redis_service.eval_script(self.DELETE_SCRIPT, [self._get_session_key(session_id)], [])
+        if role is None:
+            return False
+        if self._text(role):
+            redis_service.eval_script(self.UNINDEX_SCRIPT, self._index_keys(self._text(role))[:3], [session_id])
+        return True
     
     def session_exists(self, session_id: str) -> bool:
         """Check if session exists
         
         Args:
             session_id: Session identifier
-            
+        
         Returns:
             True if session exists, False otherwise
         """
         key = self._get_session_key(session_id)
         return redis_service.exists(key)
+    
+    def get_active_sessions(self) -> Dict[str, Any]:
+        """Live session counts and average age per role, read from the index
+        
+        Sessions past their own expiry are pruned from the index, at most
+        ``prune_batch_size`` per role per call.
+        
+        Returns:
+            Dictionary with total_sessions, session_stats (count per role),
+            average_age_seconds (per role and overall) and pruned
+        """
+        stats = {"total_sessions": 0, "session_stats": {}, "average_age_seconds": {}, "pruned": 0}
+        if not redis_service.is_connected or not redis_service.redis_client:
+            return stats
+        
+        try:
+            roles = sorted(redis_service.redis_client.smembers(f"{self._get_index_prefix()}:roles"))
+        except Exception as e:
+            logger.error(f"Session index read error: {e}")
+            return stats
+        
+        now_ts = time.time()
+        total_created = 0.0
+        for role in roles:
+            result = redis_service.eval_script(
+                self.STATS_SCRIPT, self._index_keys(role)[:3], [now_ts, self.prune_batch_size]
+            )
+            if not result:
+                continue
+            count, created_sum, pruned = int(result[0]), float(result[1]), int(result[2])
+            stats["pruned"] += pruned
+            if count == 0:
+                continue
+            stats["session_stats"][role] = count
+            stats["average_age_seconds"][role] = round(now_ts - created_sum / count, 1)
+            stats["total_sessions"] += count
+            total_created += created_sum
+        
+        if stats["total_sessions"]:
+            stats["average_age_seconds"]["overall"] = round(now_ts - total_created / stats["total_sessions"], 1)
+        return stats
+    
+    # Async variants for coroutines; they use the pooled redis.asyncio client
+    async def create_session_async(self, session_id: str, data: Dict[str, Any], expire: Optional[int] = None,
+                                   role: Optional[str] = None) -> bool:
+        """Create a new session without blocking the event loop (see create_session)"""
+        args, index_args = self._create_args(session_id, data, expire, role)
+        old_role = await async_redis_service.eval_script(self.CREATE_SCRIPT, [self._get_session_key(session_id)], args)
+        if old_role is None:
+            return False
+        if self._text(old_role):
+            await async_redis_service.eval_script(
+                self.UNINDEX_SCRIPT, self._index_keys(self._text(old_role))[:3], [session_id]
+            )
+        await async_redis_service.eval_script(self.INDEX_SCRIPT, self._index_keys(index_args[3]), index_args)
+        return True
+    
+    async def _reindex_async(self, args: Optional[List[Any]]):
+        if args:
+            await async_redis_service.eval_script(self.INDEX_SCRIPT, self._index_keys(args[3]), args)
+    
+    async def get_session_info_async(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get session data and timestamps without blocking the event loop (see get_session_info)"""
+        raw = await async_redis_service.eval_script(
+            self.GET_SCRIPT, [self._get_session_key(session_id)], self._touch_args()
+        )
+        session = self._decode_fields(raw)
+        if session:
+            await self._reindex_async(
+                self._index_args(session_id, session.get("role"), session.get("ttl"), session.get("created_ts"))
+            )
+        return session
+    
+    async def get_session_async(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get session data without blocking the event loop (see get_session)"""
+        session = await self.get_session_info_async(session_id)
+        return session["data"] if session else None
+    
+    async def touch_session_async(self, session_id: str) -> bool:
+        """Refresh last access time and expiry without blocking the event loop"""
+        return await self.update_session_async(session_id, {})
+    
+    async def update_session_async(self, session_id: str, data: Dict[str, Any]) -> bool:
+        """Update changed session fields without blocking the event loop (see update_session)"""
+        args = self._touch_args() + self._encode_fields(data)
+        result = await async_redis_service.eval_script(self.UPDATE_SCRIPT, [self._get_session_key(session_id)], args)
+        if not result:
+            return False
+        await self._reindex_async(self._index_args(session_id, *result))
+        return True
+    
+    async def delete_session_async(self, session_id: str) -> bool:
+        """Delete a session without blocking the event loop"""
+        role = await async_redis_service.eval_script(self.DELETE_SCRIPT, [self._get_session_key(session_id)], [])
+        if role is None:
+            return False
+        if self._text(role):
+            await async_redis_service.eval_script(
+                self.UNINDEX_SCRIPT, self._index_keys(self._text(role))[:3], [session_id]
+            )
+        return True
+    
+    async def session_exists_async(self, session_id: str) -> bool:
+        """Check if a session exists without blocking the event loop"""
+        key = self._get_session_key(session_id)
+        return await async_redis_service.exists(key)
 
 # Global session manager instance
 session_manager = SessionManager()
 
 # Cache invalidation utilities
 class CacheManager:
-    """Utilities for cache management and invalidation"""
+    """Utilities for cache management and invalidation
     
-    @staticmethod
-    def invalidate_pattern(pattern: str) -> int:
-        """Invalidate cache keys matching a pattern
+    Pattern invalidation walks the keyspace with SCAN and removes matches in
+    pipelined UNLINK batches, so no single command blocks Redis for the
+    other clients sharing the database (including the rate limiter).
+    """
+    
+    def __init__(self, batch_size: int = 500):
+        self.batch_size = max(1, batch_size)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "runs": 0,
+            "keys_deleted": 0,
+            "batches": 0,
+            "errors": 0,
+            "total_duration_ms": 0.0,
+            "last_run": None
+        }
+    
+    def _record_run(self, report: Dict[str, Any]):
+        """Fold a finished invalidation report into the cumulative metrics"""
+        with self._stats_lock:
+            self._stats["runs"] += 1
+            self._stats["keys_deleted"] += report["keys_deleted"]
+            self._stats["batches"] += report["batches"]
+            self._stats["errors"] += 0 if report["completed"] else 1
+            self._stats["total_duration_ms"] += report["duration_ms"]
+            self._stats["last_run"] = report
+    
+    def scan_invalidate(self, pattern: str, batch_size: Optional[int] = None,
+                        delete: Optional[Callable[[List[str]], int]] = None) -> Dict[str, Any]:
+        """Invalidate keys matching a pattern with SCAN and batched UNLINK
         
         Args:
             pattern: Redis key pattern (e.g., "user:*", "cache:api:*")
-            
+            batch_size: Keys per SCAN page and UNLINK pipeline (default: configured batch size)
+            delete: Removes one batch of keys and returns how many were removed
+                (default: pipelined UNLINK)
+        
         Returns:
-            Number of keys deleted
+            Progress report with keys matched/deleted, batches and duration
         """
+        batch_size = max(1, batch_size or self.batch_size)
+        report = {
+            "pattern": pattern,
+            "batch_size": batch_size,
+            "keys_matched": 0,
+            "keys_deleted": 0,
+            "batches": 0,
+            "duration_ms": 0.0,
+            "completed": True
+        }
+        
         if not redis_service.is_connected or not redis_service.redis_client:
-            return 0
+            report["completed"] = False
+            return report
+        
+        client = redis_service.redis_client
+        started = time.perf_counter()
+        redis_service.invalidate_near_cache(pattern=pattern)
+        
+        def flush(batch: List[str]):
+            if delete is not None:
+                report["keys_deleted"] += delete(batch)
+            else:
+                pipe = client.pipeline(transaction=False)
+                pipe.unlink(*batch)
+                report["keys_deleted"] += sum(pipe.execute())
+            report["batches"] += 1
         
         try:
-            keys = redis_service.redis_client.keys(pattern)
-            if keys:
-                return redis_service.delete(*keys)
-            return 0
+            batch = []
+            for key in client.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                report["keys_matched"] += 1
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
         except Exception as e:
             logger.error(f"Cache invalidation error for pattern '{pattern}': {e}")
-            return 0
+            report["completed"] = False
+        
+        report["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        self._record_run(report)
+        logger.debug(
+            f"Invalidated {report['keys_deleted']} keys for pattern '{pattern}' "
+            f"in {report['batches']} batches ({report['duration_ms']} ms)"
+        )
+        return report
     
-    @staticmethod
-    def clear_user_cache(user_id: str) -> int:
-        """Clear all cache entries for a specific user
+    def invalidate_pattern(self, pattern: str) -> int:
+        """Invalidate cache keys matching a pattern
         
         Args:
-            user_id: User identifier
-            
+            pattern: Redis key pattern (e.g., "user:*", "cache:api:*")
+        
         Returns:
             Number of keys deleted
         """
+        return self.scan_invalidate(pattern)["keys_deleted"]
+    
+    def clear_user_cache_report(self, user_id: str, batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """Clear all cache entries for a specific user and report progress
+        
+        Args:
+            user_id: User identifier
+            batch_size: Keys per SCAN page and UNLINK pipeline
+        
+        Returns:
+            Combined report with one entry per pattern
+        """
         patterns = [
             f"user:{user_id}:*",
-            f"*:user:{user_id}:*",
-            f"session:{user_id}*"
+            f"*:user:{user_id}:*"
         ]
         
-        total_deleted = 0
-        for pattern in patterns:
-            total_deleted += CacheManager.invalidate_pattern(pattern)
+        reports = [self.scan_invalidate(pattern, batch_size) for pattern in patterns]
+        # Sessions go through the session manager so they also leave the role index
+        session_prefix = f"{session_manager.session_prefix}:"
+        reports.append(self.scan_invalidate(
+            f"{session_prefix}{user_id}*", batch_size,
+            delete=lambda keys: sum(session_manager.delete_session(key[len(session_prefix):]) for key in keys)
+        ))
+        return {
+            "keys_deleted": sum(report["keys_deleted"] for report in reports),
+            "batches": sum(report["batches"] for report in reports),
+            "duration_ms": round(sum(report["duration_ms"] for report in reports), 2),
+            "completed": all(report["completed"] for report in reports),
+            "patterns": reports
+        }
+    
+    def clear_user_cache(self, user_id: str) -> int:
+        """Clear all cache entries for a specific user
+        
+        Args:
+            user_id: User identifier
+        
+        Returns:
+            Number of keys deleted
+        """
+        return self.clear_user_cache_report(user_id)["keys_deleted"]
+    
+    def get_invalidation_stats(self) -> Dict[str, Any]:
+        """Get cumulative invalidation metrics
         
-        return total_deleted
+        Returns:
+            Dictionary with run, key and batch counts and the last run report
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["batch_size"] = self.batch_size
+        stats["avg_duration_ms"] = round(stats["total_duration_ms"] / max(stats["runs"], 1), 2)
+        stats["total_duration_ms"] = round(stats["total_duration_ms"], 2)
+        return stats
     
     @staticmethod
     def get_cache_stats() -> Dict[str, Any]:
@@ -470,4 +1960,158 @@ class CacheManager:
             return {"status": "error", "error": str(e)}
 
 # Global cache manager instance
-cache_manager = CacheManager()
\ No newline at end of file
+cache_manager = CacheManager(batch_size=settings.get('CACHE_INVALIDATION_BATCH_SIZE', 500))
+
+# Tagged API response cache
+class ResponseCache:
+    """Cache for API read responses with tag-based invalidation.
+    
+    Each entry is registered in one Redis set per tag (e.g. ``land:<id>``,
+    ``owner:<id>``, ``interests:<land_id>``) so write paths can drop exactly
+    the responses they affect instead of invalidating by glob.
+    """
+    
+    def __init__(self, prefix: str = "cache:api", tag_prefix: str = "cache:tag",
+                 default_expire: int = 60, enabled: bool = True):
+        self.prefix = prefix
+        self.tag_prefix = tag_prefix
+        self.default_expire = default_expire
+        self.enabled = enabled and default_expire > 0
+    
+    def _tag_key(self, tag: str) -> str:
+        """Generate tag set key"""
+        return f"{self.tag_prefix}:{tag}"
+    
+    def build_key(self, namespace: str, **params: Any) -> str:
+        """Build a cache key from an endpoint namespace and its parameters
+        
+        Args:
+            namespace: Endpoint namespace (e.g., "lands:list")
+            params: Parameters the response depends on
+        
+        Returns:
+            Cache key
+        """
+        canonical = json.dumps(_canonicalize(params), sort_keys=True, separators=(",", ":"))
+        digest = hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+        return f"{self.prefix}:{namespace}:{digest}"
+    
+    def get(self, key: str) -> Any:
+        """Get a cached response
+        
+        Args:
+            key: Cache key from build_key
+        
+        Returns:
+            Cached JSON-compatible value or None
+        """
+        if not self.enabled:
+            return None
+        return redis_service.get(key)
+    
+    def set(self, key: str, value: Any, tags: List[str], expire: Optional[int] = None) -> bool:
+        """Cache a response and register it under its tags
+        
+        Args:
+            key: Cache key from build_key
+            value: Response value (Pydantic models are dumped with their field types)
+            tags: Tags the response depends on
+            expire: Expiration time in seconds
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.set_many([(key, value, tags)], expire)
+    
+    def set_many(self, entries: List[tuple], expire: Optional[int] = None) -> bool:
+        """Cache several responses and their tags in one round trip
+        
+        Args:
+            entries: (key, value, tags) tuples
+            expire: Expiration time in seconds
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.enabled or not entries or not redis_service.is_connected or not redis_service.redis_client:
+            return False
+        
+        expire_time = expire or self.default_expire
+        try:
+            pipe = redis_service.binary_client.pipeline(transaction=False)
+            tag_keys = set()
+            for key, value, tags in entries:
+                pipe.set(key, redis_service._serialize(value), ex=expire_time)
+                for tag in set(tags):
+                    tag_key = self._tag_key(tag)
+                    pipe.sadd(tag_key, key)
+                    tag_keys.add(tag_key)
+            for tag_key in tag_keys:
+                # Tag sets outlive their entries slightly so no member is orphaned
+                pipe.expire(tag_key, expire_time + 60)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Response cache SET error for {len(entries)} entries: {e}")
+            return False
+    
+    def tag(self, key: str, tags: List[str], expire: Optional[int] = None) -> bool:
+        """Register an existing cache key under invalidation tags
+        
+        Args:
+            key: Cache key stored elsewhere (e.g. by cache_async_result)
+            tags: Tags the entry depends on
+            expire: Lifetime of the entry in seconds
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.enabled or not tags or not redis_service.is_connected or not redis_service.redis_client:
+            return False
+        
+        expire_time = expire or self.default_expire
+        try:
+            pipe = redis_service.redis_client.pipeline(transaction=False)
+            for tag in set(tags):
+                tag_key = self._tag_key(tag)
+                pipe.sadd(tag_key, key)
+                pipe.expire(tag_key, expire_time + 60)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Response cache TAG error for key '{key}': {e}")
+            return False
+    
+    def invalidate_tags(self, *tags: str) -> int:
+        """Drop every cached response registered under any of the tags
+        
+        Args:
+            tags: Tags to invalidate
+        
+        Returns:
+            Number of cached responses deleted
+        """
+        if not self.enabled or not tags or not redis_service.is_connected or not redis_service.redis_client:
+            return 0
+        
+        tag_keys = [self._tag_key(tag) for tag in set(tags)]
+        try:
+            pipe = redis_service.redis_client.pipeline(transaction=False)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            keys = set()
+            for members in pipe.execute():
+                keys.update(members)
+            
+            deleted = redis_service.redis_client.unlink(*keys) if keys else 0
+            redis_service.redis_client.unlink(*tag_keys)
+            return deleted
+        except Exception as e:
+            logger.error(f"Response cache invalidation error for tags {tags}: {e}")
+            return 0
+
+# Global response cache instance
+response_cache = ResponseCache(
+    default_expire=settings.get('RESPONSE_CACHE_TTL', 60),
+    enabled=settings.get('RESPONSE_CACHE_ENABLED', True)
+)
@@ -8,7 +8,7 @@ from models.schemas import (
     UserCreate, UserResponse, UserLogin, Token, ErrorResponse, SuccessResponse,
     UserRole, LuRole
 )
-from auth import authenticate_user, create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES, get_password_hash
+from auth import authenticate_user_async, create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES, get_password_hash_async
 from pydantic import ValidationError
 from rate_limiter import enhanced_limiter, RateLimits
 
@@ -107,7 +107,7 @@ async def register_user(request: Request, user_data: UserCreate, db: Session = D
             )
         
         # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         db_user = User(
             email=user_data.email,
             password_hash=hashed_password,
@@ -142,6 +142,8 @@ async def register_user(request: Request, user_data: UserCreate, db: Session = D
             is_active=db_user.is_active,
             roles=roles
         )
+    except HTTPException:
+        raise
     except ValidationError as e:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -219,7 +221,7 @@ async def register_user(request: Request, user_data: UserCreate, db: Session = D
 )
 @enhanced_limiter.limit(RateLimits.AUTH_LOGIN)
 async def login_for_access_token(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from typing import Dict, Any, Optional
+from datetime import datetime
 import logging
 
-from redis_service import redis_service, cache_manager, session_manager
+from redis_service import redis_service, cache_manager, session_manager, get_decorator_stats
 from auth import get_current_user
 from models.schemas import SuccessResponse, ErrorResponse
 from rate_limiter import enhanced_limiter, RateLimits
@@ -31,6 +32,9 @@ router = APIRouter(
     - Memory usage and performance metrics
     - Hit/miss ratios and statistics
     - Total number of cached keys
+    - Cumulative pattern invalidation metrics
+    - Hit/miss counters for each cached function
+    - In-process (L1) and Redis (L2) tier hit metrics
     
     **Authentication Required:** Valid JWT token
     
@@ -58,6 +62,26 @@ router = APIRouter(
                             "hits": 8500,
                             "misses": 1500,
                             "hit_rate": 85.0
+                        },
+                        "invalidation_stats": {
+                            "runs": 12,
+                            "keys_deleted": 340,
+                            "batches": 14,
+                            "errors": 0,
+                            "batch_size": 500,
+                            "avg_duration_ms": 3.2
+                        },
+                        "decorator_stats": {
+                            "routers.tasks.get_task_stats": {
+                                "hits": 420,
+                                "misses": 35,
+                                "stores": 35,
+                                "hit_rate": 92.31
+                            }
+                        },
+                        "tiered_cache": {
+                            "l1": {"size": 12, "hits": 9800, "misses": 40, "hit_rate": 99.59},
+                            "l2": {"hits": 1200, "misses": 300, "hit_rate": 80.0}
                         }
                     }
                 }
@@ -83,6 +107,9 @@ def get_cache_status(
         return {
             "redis_health": redis_health,
             "cache_stats": cache_stats,
+            "invalidation_stats": cache_manager.get_invalidation_stats(),
+            "decorator_stats": get_decorator_stats(),
+            "tiered_cache": redis_service.get_cache_metrics(),
             "timestamp": request.state.__dict__.get('start_time', 0)
         }
         
@@ -100,6 +127,9 @@ def get_cache_status(
     description="""
     Invalidate cache entries based on pattern matching.
     
+    Matching keys are found with incremental SCAN and removed in pipelined
+    UNLINK batches, so large invalidations do not block Redis for other clients.
+    
     This endpoint allows administrators to clear specific cache entries or patterns
     to force cache refresh. Useful for:
     - Clearing stale data after updates
@@ -126,6 +156,10 @@ def get_cache_status(
                         "data": {
                             "pattern": "user:123:*",
                             "keys_deleted": 15,
+                            "keys_matched": 15,
+                            "batches": 1,
+                            "duration_ms": 1.8,
+                            "completed": True,
                             "timestamp": "2024-01-15T10:30:00Z"
                         }
                     }
@@ -150,6 +184,7 @@ def get_cache_status(
 def invalidate_cache(
     request: Request,
     pattern: str,
+    batch_size: Optional[int] = Query(None, ge=1, le=10000, description="Keys per SCAN/UNLINK batch"),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -172,18 +207,23 @@ def invalidate_cache(
         )
     
     try:
-        keys_deleted = cache_manager.invalidate_pattern(pattern)
+        report = cache_manager.scan_invalidate(pattern, batch_size)
         
         logger.info(
             f"Cache invalidated by user {current_user.get('user_id')}. "
-            f"Pattern: {pattern}, Keys deleted: {keys_deleted}"
+            f"Pattern: {pattern}, Keys deleted: {report['keys_deleted']}, "
+            f"Batches: {report['batches']}, Duration: {report['duration_ms']} ms"
         )
         
         return SuccessResponse(
             message="Cache invalidated successfully",
             data={
                 "pattern": pattern,
-                "keys_deleted": keys_deleted,
+                "keys_deleted": report["keys_deleted"],
+                "keys_matched": report["keys_matched"],
+                "batches": report["batches"],
+                "duration_ms": report["duration_ms"],
+                "completed": report["completed"],
                 "timestamp": request.state.__dict__.get('start_time', 0)
             }
         )
@@ -229,6 +269,9 @@ def invalidate_cache(
                         "data": {
                             "user_id": "123e4567-e89b-12d3-a456-426614174000",
                             "keys_deleted": 8,
+                            "batches": 2,
+                            "duration_ms": 4.1,
+                            "completed": True,
                             "timestamp": "2024-01-15T10:30:00Z"
                         }
                     }
@@ -241,6 +284,7 @@ def invalidate_cache(
 def clear_user_cache(
     request: Request,
     user_id: str,
+    batch_size: Optional[int] = Query(None, ge=1, le=10000, description="Keys per SCAN/UNLINK batch"),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -259,18 +303,22 @@ def clear_user_cache(
         )
     
     try:
-        keys_deleted = cache_manager.clear_user_cache(user_id)
+        report = cache_manager.clear_user_cache_report(user_id, batch_size)
         
         logger.info(
             f"User cache cleared by {current_user_id} for user {user_id}. "
-            f"Keys deleted: {keys_deleted}"
+            f"Keys deleted: {report['keys_deleted']}, Batches: {report['batches']}, "
+            f"Duration: {report['duration_ms']} ms"
         )
         
         return SuccessResponse(
             message="User cache cleared successfully",
             data={
                 "user_id": user_id,
-                "keys_deleted": keys_deleted,
+                "keys_deleted": report["keys_deleted"],
+                "batches": report["batches"],
+                "duration_ms": report["duration_ms"],
+                "completed": report["completed"],
                 "timestamp": request.state.__dict__.get('start_time', 0)
             }
         )
@@ -311,6 +359,13 @@ def clear_user_cache(
                             "investor": 15,
                             "admin": 2
                         },
+                        "average_age_seconds": {
+                            "landowner": 1260.5,
+                            "investor": 840.0,
+                            "admin": 300.2,
+                            "overall": 1071.1
+                        },
+                        "pruned": 3,
                         "timestamp": "2024-01-15T10:30:00Z"
                     }
                 }
@@ -337,8 +392,6 @@ def get_active_sessions(
         )
     
     try:
-        # This is a simplified implementation
-        # In a real scenario, you'd query Redis for session patterns
         if not redis_service.is_connected:
             return {
                 "message": "Redis not connected - session tracking unavailable",
@@ -346,14 +399,12 @@ def get_active_sessions(
                 "timestamp": request.state.__dict__.get('start_time', 0)
             }
         
-        # Get basic session statistics
-        # Note: This is a simplified version - real implementation would
-        # scan Redis for session keys and analyze them
+        # Counts come from the per-role session index, not a key scan
+        stats = session_manager.get_active_sessions()
         return {
             "message": "Session tracking available",
-            "total_sessions": "Available with Redis connection",
-            "note": "Full session analytics require Redis pattern scanning",
-            "timestamp": request.state.__dict__.get('start_time', 0)
+            **stats,
+            "timestamp": datetime.utcnow().isoformat()
         }
         
     except Exception as e:
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form, Query
+from fastapi.routing import APIRoute
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List, Optional
@@ -8,74 +9,99 @@ from pathlib import Path
 import os
 import uuid
 import shutil
-from datetime import datetime
+import mimetypes
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
 
 from database import get_db
 from auth import get_current_user, require_admin
 from models.schemas import (
     DocumentCreate, DocumentUpdate, DocumentResponse,
-    MessageResponse
+    MessageResponse, CursorPaginatedResponse,
+    ResumableUploadCreate, ResumableUploadStatus
 )
+from pagination import apply_keyset, build_cursor_page
+from document_storage import BlobStore, ResumableUploads, StoredFile, stream_zip
+from redis_service import redis_service
+from config import settings
+from starlette.concurrency import run_in_threadpool
 
-router = APIRouter(prefix="/documents", tags=["documents"])
+class BodyLimitRoute(APIRoute):
+    """Route that enforces an endpoint's ``max_body_size`` on Content-Length
+    
+    FastAPI parses (and spools to disk) a multipart form before any
+    dependency runs, so the limit has to be checked here, before the body
+    is read at all.
+    """
+    
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        limit = getattr(self.endpoint, "max_body_size", None)
+        if limit is None:
+            return handler
+        
+        async def limited_handler(request: Request) -> Response:
+            content_length = request.headers.get("content-length")
+            if content_length is None or not content_length.isdigit():
+                raise HTTPException(
+                    status_code=status.HTTP_411_LENGTH_REQUIRED,
+                    detail="Content-Length header required"
+                )
+            if int(content_length) > limit:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Request body too large. Maximum size: {limit // (1024*1024)}MB"
+                )
+            return await handler(request)
+        
+        return limited_handler
+
+def max_body_size(limit: int):
+    """Set the largest request body BodyLimitRoute accepts for an endpoint"""
+    def decorator(func):
+        func.max_body_size = limit
+        return func
+    return decorator
+
+router = APIRouter(prefix="/documents", tags=["documents"], route_class=BodyLimitRoute)
 
 # Configuration
 UPLOAD_DIR = "uploads/documents"
+BLOB_DIR = "uploads/blobs"
+PARTIAL_UPLOAD_DIR = "uploads/partial"
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MULTIPART_OVERHEAD = 64 * 1024  # Boundaries and form fields around the file
 ALLOWED_EXTENSIONS = {".pdf", ".doc", ".docx", ".jpg", ".jpeg", ".png", ".tiff", ".txt"}
+# Downloads are permission-checked, so only browsers may cache them and must revalidate
+DOWNLOAD_CACHE_CONTROL = "private, no-cache"
 
 # Ensure upload directory exists
 Path(UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
 
+# Uploaded files are stored once per content hash
+document_blobs = BlobStore(BLOB_DIR)
+
+# Large files are uploaded in chunks over several requests
+resumable_uploads = ResumableUploads(
+    PARTIAL_UPLOAD_DIR,
+    chunk_size=settings.get('DOCUMENT_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024),
+    max_size=settings.get('DOCUMENT_MAX_RESUMABLE_SIZE', 1024 * 1024 * 1024),
+    ttl=settings.get('DOCUMENT_UPLOAD_SESSION_TTL', 86400),
+    redis=redis_service
+)
+
 # Helper functions
-def validate_file(file: UploadFile) -> tuple[bool, str]:
+def validate_file(file_name: str) -> tuple[bool, str]:
     """Validate uploaded file"""
     # Check file extension
-    file_ext = Path(file.filename).suffix.lower()
+    file_ext = Path(file_name).suffix.lower()
     if file_ext not in ALLOWED_EXTENSIONS:
         return False, f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
     
     return True, "Valid"
 
-def save_uploaded_file(file: UploadFile, land_id: str) -> tuple[str, int]:
-    """Save uploaded file and return file path and size"""
-    # Generate unique filename
-    file_ext = Path(file.filename).suffix.lower()
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    
-    # Create land-specific directory
-    land_dir = Path(UPLOAD_DIR) / str(land_id)
-    land_dir.mkdir(parents=True, exist_ok=True)
-    
-    file_path = land_dir / unique_filename
-    
-    # Save file
-    file_size = 0
-    with open(file_path, "wb") as buffer:
-        while chunk := file.file.read(8192):
-            file_size += len(chunk)
-            if file_size > MAX_FILE_SIZE:
-                # Clean up partial file
-                os.unlink(file_path)
-                raise HTTPException(
-                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB"
-                )
-            buffer.write(chunk)
-    
-    return str(file_path), file_size
-
-# Document endpoints
-@router.post("/upload/{land_id}", response_model=DocumentResponse)
-async def upload_document(
-    land_id: UUID,
-    document_type: str = Form(...),
-    file: UploadFile = File(...),
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Upload a document for a land (owner or admin only)."""
-    # Check if land exists and user has permission
+def check_upload_permission(db: Session, land_id: UUID, current_user: dict):
+    """Ensure the land exists and the user may upload documents for it"""
     land_check = text("""
         SELECT owner_id, status_key FROM lands WHERE land_id = :land_id
     """)
@@ -95,64 +121,150 @@ async def upload_document(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions to upload documents for this land"
         )
-    
-    # Validate file
-    is_valid, error_msg = validate_file(file)
-    if not is_valid:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=error_msg
+
+def insert_document(db: Session, land_id: str, document_type: str, file_name: str,
+                    stored: StoredFile, uploaded_by: str) -> str:
+    """Insert a document row for a stored blob and return its ID (not committed)"""
+    document_id = str(uuid.uuid4())
+    insert_query = text("""
+        INSERT INTO documents (
+            document_id, land_id, document_type, file_name, 
+            file_path, file_size, file_hash, mime_type, uploaded_by
+        ) VALUES (
+            :document_id, :land_id, :document_type, :file_name,
+            :file_path, :file_size, :file_hash, :mime_type, :uploaded_by
         )
+    """)
     
+    db.execute(insert_query, {
+        "document_id": document_id,
+        "land_id": land_id,
+        "document_type": document_type,
+        "file_name": file_name,
+        "file_path": str(stored.path),
+        "file_size": stored.size,
+        "file_hash": stored.sha256,
+        "mime_type": mimetypes.guess_type(file_name)[0],
+        "uploaded_by": uploaded_by
+    })
+    return document_id
+
+def commit_document(db: Session, received: StoredFile, land_id: str, document_type: str,
+                    file_name: str, uploaded_by: str) -> str:
+    """
+    Reference the blob for a received file, insert its document and commit.
+    
+    Blocking; run it in the threadpool. The blob row lock taken by
+    ``store_file`` is released by the commit (or rollback) in this same
+    call, so it is never held across an await.
+    
+    Args:
+        db: Database session
+        received: Hashed file on the blob store's filesystem
+        land_id: Land the document belongs to
+        document_type: Type of document
+        file_name: Original file name
+        uploaded_by: Uploading user
+    
+    Returns:
+        str: The new document ID
+    """
+    stored, moved = None, False
     try:
-        # Save file
-        file_path, file_size = save_uploaded_file(file, str(land_id))
-        
-        # Create document record
-        document_id = str(uuid.uuid4())
-        insert_query = text("""
-            INSERT INTO documents (
-                document_id, land_id, document_type, file_name, 
-                file_path, file_size, uploaded_by
-            ) VALUES (
-                :document_id, :land_id, :document_type, :file_name,
-                :file_path, :file_size, :uploaded_by
-            )
-        """)
-        
-        db.execute(insert_query, {
-            "document_id": document_id,
-            "land_id": str(land_id),
-            "document_type": document_type,
-            "file_name": file.filename,
-            "file_path": file_path,
-            "file_size": file_size,
-            "uploaded_by": current_user["user_id"]
-        })
-        
+        # A new blob is renamed into place, never copied
+        stored, moved = document_blobs.store_file(db, received.path, received.size, received.sha256)
+        document_id = insert_document(db, land_id, document_type, file_name, stored, uploaded_by)
         db.commit()
-        
-        # Fetch the created document
-        return await get_document(UUID(document_id), current_user, db)
-        
-    except Exception as e:
-        # Clean up file if database operation fails
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.unlink(file_path)
+    except Exception:
+        # Put the file back before the rollback releases the blob row
+        if moved:
+            os.replace(stored.path, received.path)
         db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to upload document: {str(e)}"
-        )
+        raise
+    return document_id
 
-@router.get("/land/{land_id}", response_model=List[DocumentResponse])
-async def get_land_documents(
-    land_id: UUID,
-    document_type: Optional[str] = None,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get all documents for a land."""
+def remove_document(db: Session, document_id: str, file_hash: Optional[str], file_path: Optional[str]):
+    """
+    Delete a document, commit, then remove its file if nothing else uses it.
+    
+    Blocking; run it in the threadpool. Files are only removed after the
+    delete has committed, so a failed commit leaves the document and its
+    file as they were.
+    
+    Args:
+        db: Database session
+        document_id: Document to delete
+        file_hash: Hash of its blob, if content addressed
+        file_path: Its file, for documents stored before content addressing
+    """
+    try:
+        db.execute(text("DELETE FROM documents WHERE document_id = :document_id"), {"document_id": document_id})
+        # Drop the blob reference; the file goes with the last one
+        unreferenced = bool(file_hash) and document_blobs.release(db, file_hash)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    if unreferenced:
+        document_blobs.purge(db, file_hash)
+    # Files stored before content addressing belong to one document
+    elif not file_hash and file_path and os.path.exists(file_path):
+        os.unlink(file_path)
+
+def finish_upload_session(db: Session, session: dict, size: int, sha256: str) -> str:
+    """
+    Turn a claimed, verified upload session into a document and discard it.
+    
+    Blocking; run it in the threadpool. The session is discarded in the same
+    call as the commit, so a completion cancelled while this runs cannot
+    leave a committed document with its session still claimable.
+    
+    Args:
+        db: Database session
+        session: Claimed upload session
+        size: Size of the assembled file
+        sha256: Hash of the assembled file
+    
+    Returns:
+        str: The new document ID
+    """
+    upload_id = session["upload_id"]
+    received = StoredFile(resumable_uploads.data_path(upload_id), size, sha256)
+    document_id = commit_document(
+        db, received, session["land_id"], session["document_type"], session["file_name"],
+        session["user_id"]
+    )
+    resumable_uploads.discard(upload_id)
+    return document_id
+
+def document_etag(file_hash: Optional[str], stat_result: os.stat_result) -> str:
+    """Strong ETag from the content hash (from size and mtime for files stored before hashing)"""
+    if file_hash:
+        return f'"{file_hash}"'
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+def is_not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETags were sent"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return int(last_modified) <= since.timestamp()
+    return False
+
+def land_document_rows(db: Session, land_id: UUID, current_user: dict,
+                       document_type: Optional[str] = None) -> list:
+    """Check the user may view a land's documents and return their rows"""
     # Check if land exists and user has permission
     land_check = text("""
         SELECT owner_id, status_key FROM lands WHERE land_id = :land_id
@@ -196,7 +308,227 @@ async def get_land_documents(
     
     base_query += " ORDER BY d.uploaded_at DESC"
     
-    results = db.execute(text(base_query), params).fetchall()
+    return db.execute(text(base_query), params).fetchall()
+
+def bundle_entries(rows) -> List[tuple[str, Path]]:
+    """Archive names (one folder per document type, duplicates numbered) for document rows"""
+    entries = []
+    seen = set()
+    for row in rows:
+        file_name = Path(row.file_name).name or str(row.document_id)
+        folder = Path(row.document_type or "other").name or "other"
+        name = f"{folder}/{file_name}"
+        copy = 1
+        while name.lower() in seen:
+            copy += 1
+            name = f"{folder}/{Path(file_name).stem} ({copy}){Path(file_name).suffix}"
+        seen.add(name.lower())
+        entries.append((name, Path(row.file_path)))
+    return entries
+
+def get_upload_session(upload_id: str, current_user: dict) -> dict:
+    """Look up a resumable upload session owned by the user"""
+    session = resumable_uploads.get(upload_id)
+    if session is None and resumable_uploads.is_claimed(upload_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload is already being completed"
+        )
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload session not found or expired"
+        )
+    
+    user_roles = current_user.get("roles", [])
+    if "administrator" not in user_roles and session["user_id"] != current_user["user_id"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions for this upload session"
+        )
+    return session
+
+def upload_status(session: dict) -> ResumableUploadStatus:
+    """Build the status of a resumable upload session"""
+    return ResumableUploadStatus(
+        upload_id=session["upload_id"],
+        land_id=session["land_id"],
+        file_name=session["file_name"],
+        total_size=session["total_size"],
+        chunk_size=session["chunk_size"],
+        total_chunks=resumable_uploads.total_chunks(session),
+        received_chunks=sorted(resumable_uploads.received_chunks(session["upload_id"])),
+        expires_at=datetime.fromtimestamp(session["expires_at"])
+    )
+
+def _document_response(row) -> DocumentResponse:
+    """Build a DocumentResponse from a list row."""
+    return DocumentResponse(
+        document_id=row.document_id,
+        land_id=row.land_id,
+        document_type=row.document_type,
+        file_name=row.file_name,
+        file_path=row.file_path,
+        file_size=row.file_size,
+        uploaded_by=row.uploaded_by,
+        uploaded_at=row.uploaded_at,
+        uploader_name=row.uploader_name,
+        land_title=row.land_title
+    )
+
+# Document endpoints
+@router.post("/upload/{land_id}", response_model=DocumentResponse)
+@max_body_size(MAX_FILE_SIZE + MULTIPART_OVERHEAD)
+async def upload_document(
+    land_id: UUID,
+    document_type: str = Form(...),
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Upload a document for a land (owner or admin only)."""
+    # Check if land exists and user has permission
+    check_upload_permission(db, land_id, current_user)
+    
+    # Validate file
+    is_valid, error_msg = validate_file(file.filename)
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error_msg
+        )
+    
+    # Stream to the blob store's incoming directory, hashing as it goes
+    received = await document_blobs.receive(file, MAX_FILE_SIZE)
+    try:
+        document_id = await run_in_threadpool(
+            commit_document, db, received, str(land_id), document_type, file.filename,
+            current_user["user_id"]
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to upload document: {str(e)}"
+        )
+    finally:
+        # Already stored content leaves the received copy behind
+        received.path.unlink(missing_ok=True)
+    
+    # Fetch the created document
+    return await get_document(UUID(document_id), current_user, db)
+
+@router.post("/uploads/{land_id}", response_model=ResumableUploadStatus)
+async def create_upload_session(
+    land_id: UUID,
+    upload: ResumableUploadCreate,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Start a resumable upload for a large document (owner or admin only)."""
+    check_upload_permission(db, land_id, current_user)
+    
+    is_valid, error_msg = validate_file(upload.file_name)
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error_msg
+        )
+    
+    session = await run_in_threadpool(
+        resumable_uploads.create, str(land_id), current_user["user_id"], upload.document_type,
+        upload.file_name, upload.total_size, upload.sha256
+    )
+    return await run_in_threadpool(upload_status, session)
+
+@router.get("/uploads/{upload_id}/status", response_model=ResumableUploadStatus)
+async def get_upload_status(
+    upload_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the chunks received so far, to resume an interrupted upload."""
+    session = await run_in_threadpool(get_upload_session, upload_id, current_user)
+    return await run_in_threadpool(upload_status, session)
+
+@router.put("/uploads/{upload_id}/chunks/{index}", response_model=ResumableUploadStatus)
+@max_body_size(resumable_uploads.chunk_size)
+async def upload_chunk(
+    upload_id: str,
+    index: int,
+    offset: int,
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """Upload one chunk (raw request body) at its byte offset."""
+    session = await run_in_threadpool(get_upload_session, upload_id, current_user)
+    await resumable_uploads.write_chunk(session, index, offset, request.stream())
+    return await run_in_threadpool(upload_status, session)
+
+@router.post("/uploads/{upload_id}/complete", response_model=DocumentResponse)
+async def complete_upload_session(
+    upload_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Assemble a fully uploaded file into a document."""
+    session = await run_in_threadpool(get_upload_session, upload_id, current_user)
+    
+    # Only one completion per session; retries and concurrent calls lose
+    if not await run_in_threadpool(resumable_uploads.claim, upload_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload is already being completed"
+        )
+    
+    try:
+        missing = await run_in_threadpool(resumable_uploads.missing_chunks, session)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload incomplete, missing chunks: {missing[:50]}"
+            )
+        
+        size, sha256 = await run_in_threadpool(resumable_uploads.hash_data, upload_id)
+        if session["sha256"] and session["sha256"] != sha256:
+            await run_in_threadpool(resumable_uploads.discard, upload_id)
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Uploaded data does not match the declared SHA-256"
+            )
+        
+        document_id = await run_in_threadpool(finish_upload_session, db, session, size, sha256)
+    
+    except BaseException as e:
+        # A rename, so safe to run inline even on cancellation; a no-op
+        # once the session has been discarded
+        resumable_uploads.release_claim(upload_id)
+        if isinstance(e, Exception) and not isinstance(e, HTTPException):
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to complete upload: {str(e)}"
+            )
+        raise
+    
+    return await get_document(UUID(document_id), current_user, db)
+
+@router.delete("/uploads/{upload_id}", response_model=MessageResponse)
+async def abort_upload_session(
+    upload_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Abort a resumable upload and discard its data."""
+    await run_in_threadpool(get_upload_session, upload_id, current_user)
+    await run_in_threadpool(resumable_uploads.discard, upload_id)
+    return MessageResponse(message="Upload session aborted")
+
+@router.get("/land/{land_id}", response_model=List[DocumentResponse])
+async def get_land_documents(
+    land_id: UUID,
+    document_type: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get all documents for a land."""
+    results = land_document_rows(db, land_id, current_user, document_type)
     
     return [
         DocumentResponse(
@@ -214,6 +546,22 @@ async def get_land_documents(
         for row in results
     ]
 
+@router.get("/land/{land_id}/bundle")
+async def download_land_bundle(
+    land_id: UUID,
+    document_type: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Download all documents for a land as one ZIP, streamed as it is built."""
+    results = land_document_rows(db, land_id, current_user, document_type)
+    
+    return StreamingResponse(
+        stream_zip(bundle_entries(results)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="land-{land_id}-documents.zip"'}
+    )
+
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: UUID,
@@ -327,7 +675,7 @@ async def delete_document(
     """Delete document (uploader or admin only)."""
     # Check if document exists and user has permission
     doc_check = text("""
-        SELECT d.uploaded_by, d.file_path, l.owner_id
+        SELECT d.uploaded_by, d.file_path, d.file_hash, l.owner_id
         FROM documents d
         JOIN lands l ON d.land_id = l.land_id
         WHERE d.document_id = :document_id
@@ -351,19 +699,12 @@ async def delete_document(
         )
     
     try:
-        # Delete database record
-        delete_query = text("DELETE FROM documents WHERE document_id = :document_id")
-        db.execute(delete_query, {"document_id": str(document_id)})
-        db.commit()
-        
-        # Delete physical file
-        if doc_result.file_path and os.path.exists(doc_result.file_path):
-            os.unlink(doc_result.file_path)
-        
+        await run_in_threadpool(
+            remove_document, db, str(document_id), doc_result.file_hash, doc_result.file_path
+        )
         return MessageResponse(message="Document deleted successfully")
-        
+    
     except Exception as e:
-        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete document: {str(e)}"
@@ -372,13 +713,15 @@ async def delete_document(
 @router.get("/download/{document_id}")
 async def download_document(
     document_id: UUID,
+    request: Request,
+    inline: bool = False,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Download document file."""
+    """Download document file (supports Range and conditional requests)."""
     # Check if document exists and user has permission
     doc_check = text("""
-        SELECT d.file_path, d.file_name, l.owner_id, l.status_key
+        SELECT d.file_path, d.file_name, d.file_hash, d.mime_type, l.owner_id, l.status_key
         FROM documents d
         JOIN lands l ON d.land_id = l.land_id
         WHERE d.document_id = :document_id
@@ -403,16 +746,31 @@ async def download_document(
         )
     
     # Check if file exists
-    if not os.path.exists(doc_result.file_path):
+    try:
+        stat_result = await run_in_threadpool(os.stat, doc_result.file_path)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document file not found on server"
         )
     
+    headers = {
+        "ETag": document_etag(doc_result.file_hash, stat_result),
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Cache-Control": DOWNLOAD_CACHE_CONTROL
+    }
+    if is_not_modified(request, headers["ETag"], stat_result.st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    # FileResponse serves Range requests (and If-Range) against these headers
     return FileResponse(
         path=doc_result.file_path,
         filename=doc_result.file_name,
-        media_type='application/octet-stream'
+        media_type=(doc_result.mime_type or mimetypes.guess_type(doc_result.file_name)[0]
+                    or 'application/octet-stream'),
+        headers=headers,
+        stat_result=stat_result,
+        content_disposition_type="inline" if inline else "attachment"
     )
 
 @router.get("/types/list", response_model=List[str])
@@ -468,10 +826,10 @@ async def get_my_uploads(
     ]
 
 # Admin endpoints
-@router.get("/admin/all", response_model=List[DocumentResponse])
+@router.get("/admin/all", response_model=CursorPaginatedResponse)
 async def get_all_documents(
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
     document_type: Optional[str] = None,
     current_user: dict = Depends(require_admin),
     db: Session = Depends(get_db)
@@ -488,28 +846,14 @@ async def get_all_documents(
         WHERE 1=1
     """
     
-    params = {"skip": skip, "limit": limit}
+    params = {}
     
     if document_type:
         base_query += " AND d.document_type = :document_type"
         params["document_type"] = document_type
     
-    base_query += " ORDER BY d.uploaded_at DESC OFFSET :skip LIMIT :limit"
+    base_query = apply_keyset(base_query, params, cursor, limit, "d.uploaded_at", "d.document_id")
     
     results = db.execute(text(base_query), params).fetchall()
     
-    return [
-        DocumentResponse(
-            document_id=row.document_id,
-            land_id=row.land_id,
-            document_type=row.document_type,
-            file_name=row.file_name,
-            file_path=row.file_path,
-            file_size=row.file_size,
-            uploaded_by=row.uploaded_by,
-            uploaded_at=row.uploaded_at,
-            uploader_name=row.uploader_name,
-            land_title=row.land_title
-        )
-        for row in results
-    ]
\ No newline at end of file
+    return build_cursor_page(results, limit, cursor, _document_response, id_attr="document_id", created_attr="uploaded_at")
@@ -9,7 +9,7 @@ from datetime import datetime, timezone
 from database import get_db, engine
 from redis_service import redis_service
 from rate_limiter import enhanced_limiter, RateLimits, check_rate_limiter_health
-from auth import get_current_user
+from auth import get_current_user, password_hasher
 from models.schemas import SuccessResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
@@ -390,6 +390,9 @@ def get_metrics(
         else:
             metrics["redis"] = {"connected": False}
         
+        # Password hashing pool metrics
+        metrics["password_hashing"] = password_hasher.get_stats()
+        
         # Application-specific metrics
         metrics["application"] = {
             "version": "1.0.0",
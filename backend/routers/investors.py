@@ -1,17 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 import uuid
 
-from database import get_db
+from database import get_db, get_async_db
 from auth import get_current_user, require_admin
 from models.schemas import (
     InterestCreate, InterestUpdate, InterestResponse,
-    LandVisibilityUpdate, MessageResponse
+    LandVisibilityUpdate, MessageResponse, CursorPaginatedResponse
 )
+from pagination import apply_keyset, build_cursor_page
+from redis_service import response_cache, cache_async_result
+from config import settings
 
 router = APIRouter(prefix="/investors", tags=["investors"])
 
@@ -48,6 +52,22 @@ def can_manage_interest(user_roles: List[str], user_id: str, interest_data: dict
     
     return False
 
+def _interest_response(row) -> InterestResponse:
+    """Build an InterestResponse from a list row."""
+    return InterestResponse(
+        interest_id=row.interest_id,
+        investor_id=row.investor_id,
+        land_id=row.land_id,
+        status=row.status,
+        comments=row.comments,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+        land_title=row.land_title,
+        land_location=row.land_location,
+        investor_name=row.investor_name,
+        investor_email=row.investor_email
+    )
+
 # Interest management endpoints
 @router.post("/interest", response_model=InterestResponse)
 async def express_interest(
@@ -131,6 +151,7 @@ async def express_interest(
         })
         
         db.commit()
+        response_cache.invalidate_tags(f"interests:{interest_data.land_id}", "interests:all")
         
         # Fetch the created interest
         return await get_interest(UUID(interest_id), current_user, db)
@@ -142,15 +163,15 @@ async def express_interest(
             detail=f"Failed to express interest: {str(e)}"
         )
 
-@router.get("/interests", response_model=List[InterestResponse])
+@router.get("/interests", response_model=CursorPaginatedResponse)
 async def get_interests(
     land_id: Optional[UUID] = None,
     investor_id: Optional[UUID] = None,
     status: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get interests with optional filters."""
     user_roles = current_user.get("roles", [])
@@ -168,7 +189,7 @@ async def get_interests(
         WHERE 1=1
     """
     
-    params = {"skip": skip, "limit": limit}
+    params = {}
     
     # Add filters
     if land_id:
@@ -190,26 +211,11 @@ async def get_interests(
         """
         params["user_id"] = current_user["user_id"]
     
-    base_query += " ORDER BY ii.created_at DESC OFFSET :skip LIMIT :limit"
+    base_query = apply_keyset(base_query, params, cursor, limit, "ii.created_at", "ii.interest_id")
     
-    results = db.execute(text(base_query), params).fetchall()
+    results = (await db.execute(text(base_query), params)).fetchall()
     
-    return [
-        InterestResponse(
-            interest_id=row.interest_id,
-            investor_id=row.investor_id,
-            land_id=row.land_id,
-            status=row.status,
-            comments=row.comments,
-            created_at=row.created_at,
-            updated_at=row.updated_at,
-            land_title=row.land_title,
-            land_location=row.land_location,
-            investor_name=row.investor_name,
-            investor_email=row.investor_email
-        )
-        for row in results
-    ]
+    return build_cursor_page(results, limit, cursor, _interest_response, id_attr="interest_id")
 
 @router.get("/interest/{interest_id}", response_model=InterestResponse)
 async def get_interest(
@@ -275,7 +281,7 @@ async def update_interest(
     """Update interest (investor or land owner only)."""
     # Check if interest exists and user has permission
     interest_check = text("""
-        SELECT ii.investor_id, ii.status as current_status, l.owner_id
+        SELECT ii.investor_id, ii.land_id, ii.status as current_status, l.owner_id
         FROM investor_interests ii
         JOIN lands l ON ii.land_id = l.land_id
         WHERE ii.interest_id = :interest_id
@@ -326,6 +332,7 @@ async def update_interest(
             
             db.execute(update_query, params)
             db.commit()
+            response_cache.invalidate_tags(f"interests:{interest_result.land_id}", "interests:all")
         
         return await get_interest(interest_id, current_user, db)
         
@@ -345,7 +352,7 @@ async def withdraw_interest(
     """Withdraw interest (investor only)."""
     # Check if interest exists and user has permission
     interest_check = text("""
-        SELECT investor_id FROM investor_interests 
+        SELECT investor_id, land_id FROM investor_interests 
         WHERE interest_id = :interest_id
     """)
     
@@ -373,6 +380,7 @@ async def withdraw_interest(
         db.execute(delete_query, {"interest_id": str(interest_id)})
         
         db.commit()
+        response_cache.invalidate_tags(f"interests:{interest_result.land_id}", "interests:all")
         
         return MessageResponse(message="Interest withdrawn successfully")
         
@@ -548,6 +556,7 @@ async def update_land_visibility(
         })
         
         db.commit()
+        response_cache.invalidate_tags(f"land:{land_id}", "lands:visible", "lands:status")
         
         return MessageResponse(message="Land visibility updated successfully")
         
@@ -563,7 +572,7 @@ async def get_visible_lands(
     visibility: Optional[str] = None,
     status: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -577,6 +586,14 @@ async def get_visible_lands(
             detail="Only investors can view visible lands"
         )
     
+    # The listing is the same for every investor, so it is cached once
+    cache_key = response_cache.build_key(
+        "lands:visible", visibility=visibility, status=status, skip=skip, limit=limit
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     # Build base query for lands visible to investors
     base_query = """
         SELECT l.land_id, l.title, l.location, l.area, l.price_per_acre,
@@ -612,7 +629,7 @@ async def get_visible_lands(
     
     results = db.execute(text(base_query), params).fetchall()
     
-    return [
+    lands = [
         {
             "land_id": row.land_id,
             "title": row.title,
@@ -630,17 +647,28 @@ async def get_visible_lands(
         }
         for row in results
     ]
+    
+    tags = ["lands:visible"]
+    for land in lands:
+        tags += [f"land:{land['land_id']}", f"interests:{land['land_id']}"]
+    response_cache.set(cache_key, lands, tags)
+    return lands
 
 # Statistics and reporting endpoints
-@router.get("/stats/interests")
-async def get_interest_stats(
-    land_id: Optional[UUID] = None,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get interest statistics."""
-    user_roles = current_user.get("roles", [])
-    
+@cache_async_result(
+    expire=settings.get('STATS_CACHE_TTL', 60),
+    key_prefix="stats",
+    single_flight=True,
+    early_refresh=1.0,
+    tags=lambda land_id, investor_id, owner_id, db: [f"interests:{land_id}" if land_id else "interests:all"]
+)
+async def _interest_stats(
+    land_id: Optional[str],
+    investor_id: Optional[str],
+    owner_id: Optional[str],
+    db: Session
+) -> dict:
+    """Aggregate interest counts, optionally scoped to a land, investor or land owner."""
     base_query = """
         SELECT 
             COUNT(*) as total_interests,
@@ -658,15 +686,14 @@ async def get_interest_stats(
     
     if land_id:
         base_query += " AND ii.land_id = :land_id"
-        params["land_id"] = str(land_id)
+        params["land_id"] = land_id
     
-    # Add permission filter for non-admin users
-    if "administrator" not in user_roles:
-        if "investor" in user_roles:
-            base_query += " AND ii.investor_id = :user_id"
-        else:
-            base_query += " AND l.owner_id = :user_id"
-        params["user_id"] = current_user["user_id"]
+    if investor_id:
+        base_query += " AND ii.investor_id = :user_id"
+        params["user_id"] = investor_id
+    elif owner_id:
+        base_query += " AND l.owner_id = :user_id"
+        params["user_id"] = owner_id
     
     result = db.execute(text(base_query), params).fetchone()
     
@@ -679,6 +706,25 @@ async def get_interest_stats(
         "lands_with_interest": result.lands_with_interest
     }
 
+@router.get("/stats/interests")
+async def get_interest_stats(
+    land_id: Optional[UUID] = None,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get interest statistics."""
+    user_roles = current_user.get("roles", [])
+    
+    # Add permission filter for non-admin users
+    investor_id = owner_id = None
+    if "administrator" not in user_roles:
+        if "investor" in user_roles:
+            investor_id = current_user["user_id"]
+        else:
+            owner_id = current_user["user_id"]
+    
+    return await _interest_stats(str(land_id) if land_id else None, investor_id, owner_id, db)
+
 @router.get("/stats/visibility")
 async def get_visibility_stats(
     current_user: dict = Depends(get_current_user),
@@ -687,6 +733,14 @@ async def get_visibility_stats(
     """Get land visibility statistics."""
     user_roles = current_user.get("roles", [])
     
+    cache_key = response_cache.build_key(
+        "stats:visibility",
+        scope="all" if "administrator" in user_roles else current_user["user_id"]
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     base_query = """
         SELECT 
             COUNT(*) as total_lands,
@@ -707,19 +761,22 @@ async def get_visibility_stats(
     
     result = db.execute(text(base_query), params).fetchone()
     
-    return {
+    stats = {
         "total_lands": result.total_lands,
         "public_lands": result.public_lands,
         "investor_only_lands": result.investor_only_lands,
         "private_lands": result.private_lands,
         "available_lands": result.available_lands
     }
+    
+    response_cache.set(cache_key, stats, ["lands:status"])
+    return stats
 
 # Admin endpoints
 @router.get("/admin/interests", response_model=List[InterestResponse])
 async def get_all_interests(
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = None,
     current_user: dict = Depends(require_admin),
     db: Session = Depends(get_db)
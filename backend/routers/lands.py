@@ -1,20 +1,91 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import List, Optional
 from uuid import UUID
 from decimal import Decimal
 
-from database import get_db
+from database import get_db, get_async_db
 from auth import get_current_user, require_admin
 from models.schemas import (
     LandCreate, LandUpdate, LandResponse,
     LandSectionCreate, LandSection,
-    SectionDefinition, MessageResponse
+    SectionDefinition, MessageResponse, CursorPaginatedResponse
 )
+from pagination import apply_keyset, build_cursor_page
+from redis_service import response_cache, redis_service
+from config import settings
 
 router = APIRouter(prefix="/lands", tags=["lands"])
 
+LAND_DETAIL_QUERY = text("""
+    SELECT l.land_id, l.owner_id, l.title, l.description, l.location,
+           l.total_area, l.price_per_sqft, l.total_price, l.coordinates,
+           l.status_key, l.is_visible_to_investors, l.created_at, l.updated_at,
+           u.first_name || ' ' || u.last_name as owner_name,
+           s.label as status_label
+    FROM lands l
+    JOIN users u ON l.owner_id = u.user_id
+    JOIN lu_status s ON l.status_key = s.status_key
+    WHERE l.land_id = :land_id
+""")
+
+def _land_response(row) -> LandResponse:
+    """Build a LandResponse from a land detail/list row."""
+    return LandResponse(
+        land_id=row.land_id,
+        owner_id=row.owner_id,
+        title=row.title,
+        description=row.description,
+        location=row.location,
+        total_area=Decimal(str(row.total_area)),
+        price_per_sqft=Decimal(str(row.price_per_sqft)),
+        total_price=Decimal(str(row.total_price)),
+        coordinates=row.coordinates,
+        status_key=row.status_key,
+        status_label=row.status_label,
+        is_visible_to_investors=row.is_visible_to_investors,
+        owner_name=row.owner_name,
+        created_at=row.created_at,
+        updated_at=row.updated_at
+    )
+
+def _check_land_access(result, current_user: dict) -> LandResponse:
+    """Raise 404/403 unless the current user may view the land row."""
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Land not found"
+        )
+    
+    # Check permissions
+    user_roles = current_user.get("roles", [])
+    if ("administrator" not in user_roles and 
+        str(result.owner_id) != current_user["user_id"] and
+        result.status_key != "published"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to view this land"
+        )
+    
+    return _land_response(result)
+
+def _list_scope_tags(current_user: dict) -> List[str]:
+    """Tags a land listing depends on, given who is listing."""
+    if "administrator" in current_user.get("roles", []):
+        return ["lands:all"]
+    return [f"owner:{current_user['user_id']}", "lands:published"]
+
+def _land_detail_key(land_id) -> str:
+    """Response cache key for a land detail, shared by all users."""
+    return response_cache.build_key("lands:detail", land_id=str(land_id))
+
+def _load_land(land_id: UUID, current_user: dict, db: Session) -> LandResponse:
+    """Load a land with the sync session used by write endpoints."""
+    result = db.execute(LAND_DETAIL_QUERY, {"land_id": str(land_id)}).fetchone()
+    return _check_land_access(result, current_user)
+
 # Land CRUD operations
 @router.post("/", response_model=LandResponse)
 async def create_land(
@@ -90,18 +161,21 @@ async def create_land(
         db.execute(update_query, params)
     
     db.commit()
+    response_cache.invalidate_tags(
+        f"owner:{current_user['user_id']}", "lands:all", "lands:status"
+    )
     
     # Fetch the created land
-    return await get_land(land_id, current_user, db)
+    return _load_land(land_id, current_user, db)
 
-@router.get("/", response_model=List[LandResponse])
+@router.get("/", response_model=CursorPaginatedResponse)
 async def list_lands(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
     limit: int = Query(100, ge=1, le=1000),
     status_filter: Optional[str] = Query(None, description="Filter by status"),
     owner_id: Optional[UUID] = Query(None, description="Filter by owner"),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List lands with optional filters."""
     # Build dynamic query based on user role and filters
@@ -117,10 +191,19 @@ async def list_lands(
         WHERE 1=1
     """
     
-    params = {"skip": skip, "limit": limit}
+    params = {}
     
     # Apply filters based on user role
     user_roles = current_user.get("roles", [])
+    cache_key = response_cache.build_key(
+        "lands:list",
+        scope="all" if "administrator" in user_roles else current_user["user_id"],
+        cursor=cursor, limit=limit, status_filter=status_filter, owner_id=owner_id
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     if "administrator" not in user_roles:
         # Non-admin users can only see their own lands or published lands
         base_query += " AND (l.owner_id = :current_user_id OR l.status_key = 'published')"
@@ -134,85 +217,39 @@ async def list_lands(
         base_query += " AND l.owner_id = :owner_id"
         params["owner_id"] = str(owner_id)
     
-    base_query += " ORDER BY l.created_at DESC OFFSET :skip LIMIT :limit"
+    base_query = apply_keyset(base_query, params, cursor, limit, "l.created_at", "l.land_id")
     
-    results = db.execute(text(base_query), params).fetchall()
+    results = (await db.execute(text(base_query), params)).fetchall()
     
-    return [
-        LandResponse(
-            land_id=row.land_id,
-            owner_id=row.owner_id,
-            title=row.title,
-            description=row.description,
-            location=row.location,
-            total_area=Decimal(str(row.total_area)),
-            price_per_sqft=Decimal(str(row.price_per_sqft)),
-            total_price=Decimal(str(row.total_price)),
-            coordinates=row.coordinates,
-            status_key=row.status_key,
-            status_label=row.status_label,
-            is_visible_to_investors=row.is_visible_to_investors,
-            owner_name=row.owner_name,
-            created_at=row.created_at,
-            updated_at=row.updated_at
-        )
-        for row in results
+    page = build_cursor_page(results, limit, cursor, _land_response, id_attr="land_id")
+    tags = _list_scope_tags(current_user) + [f"land:{item.land_id}" for item in page.items]
+    
+    # Warm the detail entries for every land on the page in the same round trip
+    entries = [
+        (_land_detail_key(item.land_id), item, [f"land:{item.land_id}", f"owner:{item.owner_id}"])
+        for item in page.items
     ]
+    response_cache.set_many(entries + [(cache_key, page, tags)])
+    return page
 
 @router.get("/{land_id}", response_model=LandResponse)
 async def get_land(
     land_id: UUID,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get land by ID."""
-    query = text("""
-        SELECT l.land_id, l.owner_id, l.title, l.description, l.location,
-               l.total_area, l.price_per_sqft, l.total_price, l.coordinates,
-               l.status_key, l.is_visible_to_investors, l.created_at, l.updated_at,
-               u.first_name || ' ' || u.last_name as owner_name,
-               s.label as status_label
-        FROM lands l
-        JOIN users u ON l.owner_id = u.user_id
-        JOIN lu_status s ON l.status_key = s.status_key
-        WHERE l.land_id = :land_id
-    """)
-    
-    result = db.execute(query, {"land_id": str(land_id)}).fetchone()
+    # The cached detail is shared by all users; access is re-checked per request
+    cache_key = _land_detail_key(land_id)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return _check_land_access(LandResponse(**cached), current_user)
     
-    if not result:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Land not found"
-        )
-    
-    # Check permissions
-    user_roles = current_user.get("roles", [])
-    if ("administrator" not in user_roles and 
-        str(result.owner_id) != current_user["user_id"] and
-        result.status_key != "published"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions to view this land"
-        )
+    result = (await db.execute(LAND_DETAIL_QUERY, {"land_id": str(land_id)})).fetchone()
     
-    return LandResponse(
-        land_id=result.land_id,
-        owner_id=result.owner_id,
-        title=result.title,
-        description=result.description,
-        location=result.location,
-        total_area=Decimal(str(result.total_area)),
-        price_per_sqft=Decimal(str(result.price_per_sqft)),
-        total_price=Decimal(str(result.total_price)),
-        coordinates=result.coordinates,
-        status_key=result.status_key,
-        status_label=result.status_label,
-        is_visible_to_investors=result.is_visible_to_investors,
-        owner_name=result.owner_name,
-        created_at=result.created_at,
-        updated_at=result.updated_at
-    )
+    land = _check_land_access(result, current_user)
+    response_cache.set(cache_key, land, [f"land:{land_id}", f"owner:{land.owner_id}"])
+    return land
 
 @router.put("/{land_id}", response_model=LandResponse)
 async def update_land(
@@ -265,8 +302,13 @@ async def update_land(
         
         db.execute(update_query, params)
         db.commit()
+        # Listings are tagged by scope rather than per land, so drop them too
+        response_cache.invalidate_tags(
+            f"land:{land_id}", f"owner:{land_result.owner_id}", "lands:all",
+            "lands:published", "lands:visible"
+        )
     
-    return await get_land(land_id, current_user, db)
+    return _load_land(land_id, current_user, db)
 
 @router.delete("/{land_id}", response_model=MessageResponse)
 async def delete_land(
@@ -306,6 +348,9 @@ async def delete_land(
     delete_query = text("DELETE FROM lands WHERE land_id = :land_id")
     db.execute(delete_query, {"land_id": str(land_id)})
     db.commit()
+    response_cache.invalidate_tags(
+        f"land:{land_id}", f"owner:{land_result.owner_id}", "lands:all", "lands:status"
+    )
     
     return MessageResponse(message="Land deleted successfully")
 
@@ -329,6 +374,9 @@ async def submit_land_for_review(
         db.commit()
         
         if result and result.success:
+            response_cache.invalidate_tags(
+                f"land:{land_id}", f"owner:{current_user['user_id']}", "lands:all", "lands:status"
+            )
             return MessageResponse(message="Land submitted for review successfully")
         else:
             raise HTTPException(
@@ -356,6 +404,9 @@ async def publish_land(
         db.commit()
         
         if result and result.success:
+            response_cache.invalidate_tags(
+                f"land:{land_id}", "lands:published", "lands:visible", "lands:all", "lands:status"
+            )
             return MessageResponse(message="Land published successfully")
         else:
             raise HTTPException(
@@ -383,6 +434,9 @@ async def mark_land_ready_to_buy(
         db.commit()
         
         if result and result.success:
+            response_cache.invalidate_tags(
+                f"land:{land_id}", "lands:published", "lands:visible", "lands:all", "lands:status"
+            )
             return MessageResponse(message="Land marked as ready to buy successfully")
         else:
             raise HTTPException(
@@ -405,7 +459,7 @@ async def get_land_sections(
 ):
     """Get all sections for a land."""
     # First check if user can access this land
-    await get_land(land_id, current_user, db)
+    _load_land(land_id, current_user, db)
     
     query = text("""
         SELECT ls.land_section_id, ls.land_id, ls.section_definition_id,
@@ -500,6 +554,10 @@ async def get_section_definitions(
     db: Session = Depends(get_db)
 ):
     """Get all available section definitions."""
+    cached = redis_service.get("lookup:section_definitions")
+    if cached is not None:
+        return cached
+    
     query = text("""
         SELECT section_definition_id, section_name, section_type, is_required, created_at
         FROM section_definitions
@@ -508,7 +566,7 @@ async def get_section_definitions(
     
     results = db.execute(query).fetchall()
     
-    return [
+    definitions = [
         SectionDefinition(
             section_definition_id=row.section_definition_id,
             section_name=row.section_name,
@@ -517,4 +575,6 @@ async def get_section_definitions(
             created_at=row.created_at
         )
         for row in results
-    ]
\ No newline at end of file
+    ]
+    redis_service.set("lookup:section_definitions", definitions, settings.get('LOOKUP_CACHE_TTL', 3600))
+    return definitions
\ No newline at end of file
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, HTTPException, Query, Depends, status
-from typing import Optional, List, Dict, Any
+from typing import Dict, Any
 import os
 import re
 from datetime import datetime, timedelta
 from pathlib import Path
 import json
+from fastapi.concurrency import run_in_threadpool
 from auth import get_current_user
+from config import settings
+from log_store import LogStore, LogStatsAggregator, decode_json_line, parse_timestamp
+from logs import get_logging_stats
 from models.schemas import (
     LogQueryParams, LogEntry, LogQueryResponse, ErrorResponse, 
     PaginationParams, PaginatedResponse, User
@@ -31,76 +35,102 @@ LOG_FILES = {
     "errors": LOGS_DIR / "renewmart_errors.log",
     "access": LOGS_DIR / "renewmart_access.log"
 }
+LOG_STORES = {log_type: LogStore(path) for log_type, path in LOG_FILES.items()}
+
+# Pattern for detailed logs: timestamp - name - level - filename:line - message
+DETAILED_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - ([^-]+) - (\w+) - ([^:]+):(\d+) - (.+)$')
+
+# Message part of access logs: method path - status - details
+ACCESS_MESSAGE_PATTERN = re.compile(r'^(\w+) ([^-]+) - (\d+)(.*)$')
+
+# Pattern for simple logs: timestamp - level - message
+SIMPLE_PATTERN = re.compile(r'^(\d{2}:\d{2}:\d{2}) - (\w+) - (.+)$')
+
+def _parse_json_record(record: Dict[str, Any], line: str) -> LogEntry:
+    """Build a LogEntry from a structured (JSON lines) record"""
+    fields = record.get("fields") or {}
+    logger_name = record.get("logger", "unknown")
+    filename = record.get("file", "unknown")
+    metadata = {
+        "logger_name": logger_name,
+        "filename": filename,
+        "line_number": record.get("line"),
+        **fields,
+        "type": fields.get("type", "structured"),
+        "format": "json"
+    }
+    if "exc" in record:
+        metadata["exception"] = record["exc"]
+    
+    return LogEntry.model_construct(
+        timestamp=parse_timestamp(line) or datetime.now(),
+        level=record.get("level", "UNKNOWN"),
+        source=f"{logger_name}:{filename}",
+        message=record.get("msg", ""),
+        metadata=metadata
+    )
 
 def parse_log_line(line: str) -> LogEntry:
     """
     Parse a log line and extract structured information.
     
+    JSON lines are decoded directly; text lines are matched against one
+    precompiled pattern, and the access-log fields are only extracted from
+    the message of lines that matched it. Entries are built without
+    re-validation since every field is already typed.
+    
     Args:
         line: Raw log line
     
     Returns:
         LogEntry: Parsed log information as Pydantic model
     """
-    # Pattern for detailed logs: timestamp - name - level - filename:line - message
-    detailed_pattern = r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - ([^-]+) - (\w+) - ([^:]+):(\d+) - (.+)$'
+    line = line.strip()
     
-    # Pattern for simple logs: timestamp - level - message
-    simple_pattern = r'^(\d{2}:\d{2}:\d{2}) - (\w+) - (.+)$'
-    
-    # Pattern for access logs: timestamp - name - level - filename:line - method path - status - details
-    access_pattern = r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - ([^-]+) - (\w+) - ([^:]+):(\d+) - (\w+) ([^-]+) - (\d+)(.*)$'
-    
-    # Try access pattern first
-    match = re.match(access_pattern, line.strip())
-    if match:
-        timestamp, logger_name, level, filename, line_no, method, path, status, details = match.groups()
-        try:
-            parsed_timestamp = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            parsed_timestamp = datetime.now()
-        
-        return LogEntry(
-            timestamp=parsed_timestamp,
-            level=level,
-            source=f"{logger_name.strip()}:{filename}",
-            message=f"{method} {path.strip()} - {status}{details}",
-            metadata={
-                "logger_name": logger_name.strip(),
-                "filename": filename,
-                "line_number": int(line_no),
-                "method": method,
-                "path": path.strip(),
-                "status_code": int(status),
-                "details": details.strip(),
-                "type": "access"
-            }
-        )
+    record = decode_json_line(line)
+    if record is not None:
+        return _parse_json_record(record, line)
     
-    # Try detailed pattern
-    match = re.match(detailed_pattern, line.strip())
+    match = DETAILED_PATTERN.match(line)
     if match:
         timestamp, logger_name, level, filename, line_no, message = match.groups()
-        try:
-            parsed_timestamp = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            parsed_timestamp = datetime.now()
+        logger_name = logger_name.strip()
+        parsed_timestamp = parse_timestamp(timestamp) or datetime.now()
         
-        return LogEntry(
+        access = ACCESS_MESSAGE_PATTERN.match(message)
+        if access:
+            method, path, status_code, details = access.groups()
+            return LogEntry.model_construct(
+                timestamp=parsed_timestamp,
+                level=level,
+                source=f"{logger_name}:{filename}",
+                message=f"{method} {path.strip()} - {status_code}{details}",
+                metadata={
+                    "logger_name": logger_name,
+                    "filename": filename,
+                    "line_number": int(line_no),
+                    "method": method,
+                    "path": path.strip(),
+                    "status_code": int(status_code),
+                    "details": details.strip(),
+                    "type": "access"
+                }
+            )
+        
+        return LogEntry.model_construct(
             timestamp=parsed_timestamp,
             level=level,
-            source=f"{logger_name.strip()}:{filename}",
+            source=f"{logger_name}:{filename}",
             message=message,
             metadata={
-                "logger_name": logger_name.strip(),
+                "logger_name": logger_name,
                 "filename": filename,
                 "line_number": int(line_no),
                 "type": "detailed"
             }
         )
     
-    # Try simple pattern
-    match = re.match(simple_pattern, line.strip())
+    match = SIMPLE_PATTERN.match(line)
     if match:
         timestamp, level, message = match.groups()
         try:
@@ -110,7 +140,7 @@ def parse_log_line(line: str) -> LogEntry:
         except ValueError:
             parsed_timestamp = datetime.now()
         
-        return LogEntry(
+        return LogEntry.model_construct(
             timestamp=parsed_timestamp,
             level=level,
             source="unknown",
@@ -119,42 +149,22 @@ def parse_log_line(line: str) -> LogEntry:
         )
     
     # If no pattern matches, return raw line
-    return LogEntry(
+    return LogEntry.model_construct(
         timestamp=datetime.now(),
         level="UNKNOWN",
         source="unknown",
-        message=line.strip(),
+        message=line,
         metadata={"type": "raw"}
     )
 
-def filter_logs_by_time(logs: List[LogEntry], start_time: Optional[datetime], end_time: Optional[datetime]) -> List[LogEntry]:
-    """
-    Filter logs by time range.
-    
-    Args:
-        logs: List of parsed log entries
-        start_time: Start time filter
-        end_time: End time filter
-    
-    Returns:
-        list: Filtered logs
-    """
-    if not start_time and not end_time:
-        return logs
-    
-    filtered = []
-    for log in logs:
-        log_time = log.timestamp
-        
-        # Apply filters
-        if start_time and log_time < start_time:
-            continue
-        if end_time and log_time > end_time:
-            continue
-        
-        filtered.append(log)
-    
-    return filtered
+# Per-minute statistics for /logs/stats, kept current by a background thread (see main.lifespan)
+log_stats = LogStatsAggregator(
+    LOG_FILES,
+    LOGS_DIR / "stats.json.gz",
+    parse_log_line,
+    retention_hours=settings.get('LOG_STATS_RETENTION_HOURS', 168),
+    save_interval=settings.get('LOG_STATS_SAVE_INTERVAL', 60)
+)
 
 @router.get("/", 
     response_model=LogQueryResponse,
@@ -207,55 +217,25 @@ async def get_logs(
         # Start timing for performance metrics
         start_time_exec = datetime.now()
         
-        # Read and parse log file
-        logs = []
-        with open(log_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    try:
-                        parsed_log = parse_log_line(line)
-                        logs.append(parsed_log)
-                    except Exception as e:
-                        # Skip malformed log lines
-                        continue
-        
-        # Reverse to get newest first
-        logs.reverse()
-        
-        # Apply filters
-        filtered_logs = logs
-        
-        # Filter by time
-        if query_params.start or query_params.end:
-            filtered_logs = filter_logs_by_time(filtered_logs, query_params.start, query_params.end)
-        
-        # Filter by level
-        if query_params.level:
-            level_upper = query_params.level.upper()
-            filtered_logs = [log for log in filtered_logs if log.level.upper() == level_upper]
-        
-        # Filter by source
-        if query_params.source:
-            filtered_logs = [log for log in filtered_logs if query_params.source.lower() in log.source.lower()]
-        
-        # Filter by message content
-        if query_params.message:
-            search_lower = query_params.message.lower()
-            filtered_logs = [
-                log for log in filtered_logs 
-                if search_lower in log.message.lower()
-            ]
-        
-        # Apply limit
-        total = len(filtered_logs)
-        limited_logs = filtered_logs[:query_params.limit]
+        # Read the live file and rotated segments newest first, filtering lazily until the limit is reached
+        limited_logs, has_more = await run_in_threadpool(
+            LOG_STORES[log_type].query,
+            parse_log_line,
+            start=query_params.start,
+            end=query_params.end,
+            level=query_params.level,
+            source=query_params.source,
+            message=query_params.message,
+            limit=query_params.limit
+        )
         
         # Calculate execution time
         execution_time = (datetime.now() - start_time_exec).total_seconds() * 1000
         
         return LogQueryResponse(
             logs=limited_logs,
-            total_count=total,
+            total_count=len(limited_logs),
+            has_more=has_more,
             query_params=query_params,
             execution_time_ms=execution_time
         )
@@ -321,50 +301,22 @@ async def get_log_stats(
         end_time = datetime.now()
         start_time = end_time - timedelta(hours=hours)
         
-        # Read and parse log file
-        logs = []
-        with open(log_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    parsed_log = parse_log_line(line)
-                    logs.append(parsed_log)
+        # Answer from pre-aggregated per-minute buckets; update() only reads new lines
+        await run_in_threadpool(log_stats.update)
+        bucket_stats = log_stats.stats(log_type, start_time, end_time)
         
-        # Filter by time range
-        filtered_logs = filter_logs_by_time(logs, start_time, end_time)
-        
-        # Calculate statistics
         stats = {
-            "total_entries": len(filtered_logs),
+            "total_entries": bucket_stats["total_entries"],
             "time_range": {
                 "start": start_time.strftime("%Y-%m-%d %H:%M:%S"),
                 "end": end_time.strftime("%Y-%m-%d %H:%M:%S"),
                 "hours": hours
             },
-            "levels": {},
-            "recent_errors": [],
-            "top_messages": {}
+            "levels": bucket_stats["levels"],
+            "recent_errors": bucket_stats["recent_errors"],
+            "top_messages": bucket_stats["top_messages"]
         }
         
-        # Count by level
-        for log in filtered_logs:
-            level = log.level
-            stats["levels"][level] = stats["levels"].get(level, 0) + 1
-        
-        # Get recent errors
-        error_logs = [log for log in filtered_logs if log.level in ["ERROR", "CRITICAL"]]
-        stats["recent_errors"] = [log.dict() for log in error_logs[:10]]  # Last 10 errors
-        
-        # Count message patterns
-        message_counts = {}
-        for log in filtered_logs:
-            message = log.message
-            # Truncate long messages for grouping
-            short_message = message[:100] + "..." if len(message) > 100 else message
-            message_counts[short_message] = message_counts.get(short_message, 0) + 1
-        
-        # Get top 10 most frequent messages
-        stats["top_messages"] = dict(sorted(message_counts.items(), key=lambda x: x[1], reverse=True)[:10])
-        
         return {
             "log_type": log_type,
             "stats": stats
@@ -381,6 +333,38 @@ async def get_log_stats(
             detail=f"Error analyzing log file: {str(e)}"
         )
 
+def _log_files_info() -> Dict[str, Any]:
+    """Describe each log file and its rotated segments (blocking)"""
+    files_info = {}
+    
+    for log_type, log_file in LOG_FILES.items():
+        if log_file.exists():
+            stat = log_file.stat()
+            files_info[log_type] = {
+                "path": str(log_file),
+                "size_bytes": stat.st_size,
+                "size_mb": round(stat.st_size / (1024 * 1024), 2),
+                "modified": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S"),
+                "exists": True,
+                "segments": [
+                    {
+                        "path": str(segment["path"]),
+                        "compressed": segment["compressed"],
+                        "size_bytes": segment["path"].stat().st_size,
+                        "first_timestamp": segment["first"].strftime("%Y-%m-%d %H:%M:%S") if segment["first"] else None,
+                        "last_timestamp": segment["last"].strftime("%Y-%m-%d %H:%M:%S") if segment["last"] else None
+                    }
+                    for segment in LOG_STORES[log_type].segments()[1:]
+                ]
+            }
+        else:
+            files_info[log_type] = {
+                "path": str(log_file),
+                "exists": False
+            }
+    
+    return files_info
+
 @router.get("/files",
     response_model=dict,
     summary="List log files",
@@ -407,27 +391,13 @@ async def list_log_files(
                 detail="Access denied. Admin privileges required."
             )
     
-        files_info = {}
-        
-        for log_type, log_file in LOG_FILES.items():
-            if log_file.exists():
-                stat = log_file.stat()
-                files_info[log_type] = {
-                    "path": str(log_file),
-                    "size_bytes": stat.st_size,
-                    "size_mb": round(stat.st_size / (1024 * 1024), 2),
-                    "modified": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S"),
-                    "exists": True
-                }
-            else:
-                files_info[log_type] = {
-                    "path": str(log_file),
-                    "exists": False
-                }
+        # Segment bounds may need a scan of newly rotated (gzipped) files
+        files_info = await run_in_threadpool(_log_files_info)
         
         return {
             "log_files": files_info,
-            "logs_directory": str(LOGS_DIR)
+            "logs_directory": str(LOGS_DIR),
+            "pipeline": get_logging_stats()
         }
     
     except Exception as e:
@@ -1,17 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 import uuid
 
-from database import get_db
+from database import get_db, get_async_db
 from auth import get_current_user, require_admin
 from models.schemas import (
     TaskCreate, TaskUpdate, TaskResponse, TaskHistoryResponse,
-    MessageResponse
+    MessageResponse, CursorPaginatedResponse
 )
+from pagination import apply_keyset, build_cursor_page
+from redis_service import response_cache, cache_async_result
+from config import settings
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -52,6 +56,26 @@ def can_manage_task(user_roles: List[str], user_id: str, task_data: dict) -> boo
     
     return False
 
+def _task_response(row) -> TaskResponse:
+    """Build a TaskResponse from a task list row."""
+    return TaskResponse(
+        task_id=row.task_id,
+        land_id=row.land_id,
+        task_type=row.task_type,
+        description=row.description,
+        assigned_to=row.assigned_to,
+        assigned_by=row.assigned_by,
+        status=row.status,
+        priority=row.priority,
+        due_date=row.due_date,
+        completion_notes=row.completion_notes,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+        land_title=row.land_title,
+        assigned_to_name=row.assigned_to_name,
+        assigned_by_name=row.assigned_by_name
+    )
+
 # Task endpoints
 @router.post("/", response_model=TaskResponse)
 async def create_task(
@@ -116,6 +140,7 @@ async def create_task(
         })
         
         db.commit()
+        response_cache.invalidate_tags("tasks:stats")
         
         # Fetch the created task
         return await get_task(UUID(task_id), current_user, db)
@@ -127,16 +152,16 @@ async def create_task(
             detail=f"Failed to create task: {str(e)}"
         )
 
-@router.get("/", response_model=List[TaskResponse])
+@router.get("/", response_model=CursorPaginatedResponse)
 async def get_tasks(
     land_id: Optional[UUID] = None,
     assigned_to: Optional[UUID] = None,
     status: Optional[str] = None,
     task_type: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get tasks with optional filters."""
     user_roles = current_user.get("roles", [])
@@ -156,7 +181,7 @@ async def get_tasks(
         WHERE 1=1
     """
     
-    params = {"skip": skip, "limit": limit}
+    params = {}
     
     # Add filters
     if land_id:
@@ -184,30 +209,11 @@ async def get_tasks(
         """
         params["user_id"] = current_user["user_id"]
     
-    base_query += " ORDER BY t.created_at DESC OFFSET :skip LIMIT :limit"
+    base_query = apply_keyset(base_query, params, cursor, limit, "t.created_at", "t.task_id")
     
-    results = db.execute(text(base_query), params).fetchall()
+    results = (await db.execute(text(base_query), params)).fetchall()
     
-    return [
-        TaskResponse(
-            task_id=row.task_id,
-            land_id=row.land_id,
-            task_type=row.task_type,
-            description=row.description,
-            assigned_to=row.assigned_to,
-            assigned_by=row.assigned_by,
-            status=row.status,
-            priority=row.priority,
-            due_date=row.due_date,
-            completion_notes=row.completion_notes,
-            created_at=row.created_at,
-            updated_at=row.updated_at,
-            land_title=row.land_title,
-            assigned_to_name=row.assigned_to_name,
-            assigned_by_name=row.assigned_by_name
-        )
-        for row in results
-    ]
+    return build_cursor_page(results, limit, cursor, _task_response, id_attr="task_id")
 
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
@@ -364,6 +370,7 @@ async def update_task(
             db.execute(update_query, params)
         
         db.commit()
+        response_cache.invalidate_tags("tasks:stats")
         
         return await get_task(task_id, current_user, db)
         
@@ -419,6 +426,7 @@ async def delete_task(
         db.execute(delete_task_query, {"task_id": str(task_id)})
         
         db.commit()
+        response_cache.invalidate_tags("tasks:stats")
         
         return MessageResponse(message="Task deleted successfully")
         
@@ -600,7 +608,7 @@ async def get_tasks_created_by_me(
 @router.get("/admin/all", response_model=List[TaskResponse])
 async def get_all_tasks(
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = None,
     task_type: Optional[str] = None,
     current_user: dict = Depends(require_admin),
@@ -690,15 +698,15 @@ async def get_task_priorities(
     # Return standard task priorities
     return ["low", "medium", "high", "urgent"]
 
-@router.get("/stats/summary")
-async def get_task_stats(
-    land_id: Optional[UUID] = None,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get task statistics summary."""
-    user_roles = current_user.get("roles", [])
-    
+@cache_async_result(
+    expire=settings.get('STATS_CACHE_TTL', 60),
+    key_prefix="stats",
+    single_flight=True,
+    early_refresh=1.0,
+    tags=lambda land_id, user_id, db: ["tasks:stats"]
+)
+async def _task_stats(land_id: Optional[str], user_id: Optional[str], db: Session) -> dict:
+    """Aggregate task counts, optionally scoped to a land and to tasks involving a user."""
     base_query = """
         SELECT 
             COUNT(*) as total_tasks,
@@ -715,16 +723,15 @@ async def get_task_stats(
     
     if land_id:
         base_query += " AND t.land_id = :land_id"
-        params["land_id"] = str(land_id)
+        params["land_id"] = land_id
     
-    # Add permission filter for non-admin users
-    if "administrator" not in user_roles:
+    if user_id:
         base_query += """
             AND (t.assigned_to = :user_id 
                  OR t.assigned_by = :user_id 
                  OR l.owner_id = :user_id)
         """
-        params["user_id"] = current_user["user_id"]
+        params["user_id"] = user_id
     
     result = db.execute(text(base_query), params).fetchone()
     
@@ -734,4 +741,18 @@ async def get_task_stats(
         "in_progress_tasks": result.in_progress_tasks,
         "completed_tasks": result.completed_tasks,
         "overdue_tasks": result.overdue_tasks
-    }
\ No newline at end of file
+    }
+
+@router.get("/stats/summary")
+async def get_task_stats(
+    land_id: Optional[UUID] = None,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get task statistics summary."""
+    user_roles = current_user.get("roles", [])
+    
+    # Add permission filter for non-admin users
+    user_id = None if "administrator" in user_roles else current_user["user_id"]
+    
+    return await _task_stats(str(land_id) if land_id else None, user_id, db)
@@ -1,19 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import List
+from typing import List, Optional
 from datetime import timedelta
 from uuid import UUID
 
 from database import get_db
 from models.schemas import (
     User, UserCreate, UserUpdate, UserLogin, Token, MessageResponse,
-    UserRole, UserRoleCreate, LuRole
+    UserRole, UserRoleCreate, LuRole, CursorPaginatedResponse
 )
 from auth import (
-    get_password_hash, authenticate_user, create_access_token,
-    get_current_active_user, require_admin, ACCESS_TOKEN_EXPIRE_MINUTES
+    get_password_hash_async, authenticate_user_async, create_access_token,
+    get_current_active_user, require_admin, ACCESS_TOKEN_EXPIRE_MINUTES,
+    principal_cache
 )
+from pagination import apply_keyset, build_cursor_page
+from redis_service import redis_service
+from config import settings
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -31,7 +35,7 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Hash password
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     
     # Create user
     insert_query = text("""
@@ -65,7 +69,7 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     """Authenticate user and return access token."""
-    user = authenticate_user(db, user_credentials.email, user_credentials.password)
+    user = await authenticate_user_async(db, user_credentials.email, user_credentials.password)
     
     if not user:
         raise HTTPException(
@@ -150,6 +154,7 @@ async def update_current_user_profile(
     
     result = db.execute(update_query, params).fetchone()
     db.commit()
+    principal_cache.invalidate(current_user["user_id"])
     
     return User(
         user_id=result.user_id,
@@ -162,36 +167,39 @@ async def update_current_user_profile(
         updated_at=result.updated_at
     )
 
-@router.get("/", response_model=List[User])
+def _user_response(row) -> User:
+    """Build a User from a user row."""
+    return User(
+        user_id=row.user_id,
+        email=row.email,
+        first_name=row.first_name,
+        last_name=row.last_name,
+        phone=row.phone,
+        is_active=row.is_active,
+        created_at=row.created_at,
+        updated_at=row.updated_at
+    )
+
+@router.get("/", response_model=CursorPaginatedResponse)
 async def list_users(
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
     current_user: dict = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """List all users (admin only)."""
-    query = text("""
+    base_query = """
         SELECT user_id, email, first_name, last_name, phone, is_active, created_at, updated_at
         FROM \"user\"
-        ORDER BY created_at DESC
-        OFFSET :skip LIMIT :limit
-    """)
+        WHERE 1=1
+    """
     
-    results = db.execute(query, {"skip": skip, "limit": limit}).fetchall()
+    params = {}
+    base_query = apply_keyset(base_query, params, cursor, limit, "created_at", "user_id")
     
-    return [
-        User(
-            user_id=row.user_id,
-            email=row.email,
-            first_name=row.first_name,
-            last_name=row.last_name,
-            phone=row.phone,
-            is_active=row.is_active,
-            created_at=row.created_at,
-            updated_at=row.updated_at
-        )
-        for row in results
-    ]
+    results = db.execute(text(base_query), params).fetchall()
+    
+    return build_cursor_page(results, limit, cursor, _user_response, id_attr="user_id")
 
 @router.get("/{user_id}", response_model=User)
 async def get_user(
@@ -261,6 +269,7 @@ async def assign_user_role(
         "role_key": role_data.role_key
     })
     db.commit()
+    principal_cache.invalidate(user_id)
     
     return MessageResponse(message="Role assigned successfully")
 
@@ -282,6 +291,7 @@ async def remove_user_role(
         "role_key": role_key
     })
     db.commit()
+    principal_cache.invalidate(user_id)
     
     if result.rowcount == 0:
         raise HTTPException(
@@ -322,10 +332,13 @@ async def get_available_roles(
     db: Session = Depends(get_db)
 ):
     """Get all available roles (admin only)."""
+    cached = redis_service.get("lookup:roles")
+    if cached is not None:
+        return cached
+    
     query = text("SELECT role_key, label FROM lu_roles ORDER BY label")
     results = db.execute(query).fetchall()
     
-    return [
-        LuRole(role_key=row.role_key, label=row.label)
-        for row in results
-    ]
\ No newline at end of file
+    roles = [{"role_key": row.role_key, "label": row.label} for row in results]
+    redis_service.set("lookup:roles", roles, settings.get('LOOKUP_CACHE_TTL', 3600))
+    return roles
\ No newline at end of file
@@ -4,12 +4,14 @@ from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from unittest.mock import patch, MagicMock
+import threading
 import time
 from datetime import datetime, timedelta
 
 from main import app
 from database import get_db, Base
-from auth import create_access_token, verify_password, get_password_hash
+from fastapi import HTTPException
+from auth import create_access_token, verify_password, get_password_hash, PasswordHashingPool
 from models.users import User
 from models.schemas import UserCreate, UserLogin
 
@@ -320,6 +322,45 @@ class TestPasswordSecurity:
         assert verify_password(password, hash1) is True
         assert verify_password(password, hash2) is True
 
+class TestPasswordHashingPool:
+    """Test the bounded password hashing pool."""
+    
+    def test_runs_work_off_the_event_loop(self):
+        """Work is executed on a pool thread and its result returned."""
+        pool = PasswordHashingPool(max_workers=1, max_pending=2)
+        
+        async def run():
+            return await pool.run(lambda: threading.current_thread().name)
+        
+        try:
+            assert asyncio.run(run()).startswith("password-hash")
+            stats = pool.get_stats()
+            assert stats["completed"] == 1
+            assert stats["queue_depth"] == 0
+        finally:
+            pool.shutdown()
+    
+    def test_rejects_when_saturated(self):
+        """Requests beyond max_pending fail fast with 503."""
+        release = threading.Event()
+        pool = PasswordHashingPool(max_workers=1, max_pending=1)
+        
+        async def run():
+            blocked = asyncio.ensure_future(pool.run(release.wait))
+            await asyncio.sleep(0.05)
+            with pytest.raises(HTTPException) as exc_info:
+                await pool.run(lambda: None)
+            release.set()
+            await blocked
+            return exc_info.value
+        
+        try:
+            error = asyncio.run(run())
+            assert error.status_code == 503
+            assert pool.get_stats()["rejected"] == 1
+        finally:
+            pool.shutdown()
+
 class TestTokenGeneration:
     """Test JWT token generation and validation."""
     
@@ -0,0 +1,774 @@
+import asyncio
+import fnmatch
+import json
+import os
+import subprocess
+import sys
+import pytest
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+from auth import PrincipalCache
+from redis_service import (
+    ResponseCache, CacheManager, NearCache, build_cache_key, cache_result, cache_async_result,
+    _should_refresh_early, _wrap_entry, SessionManager
+)
+from cache_codec import Codec, ValueSerializer, get_codec, COMPRESSED
+from models.schemas import LuRole
+
+@pytest.fixture
+def principal():
+    """Sample principal as returned by get_current_user."""
+    return {
+        "user_id": uuid4(),
+        "email": "cached@example.com",
+        "first_name": "Cached",
+        "last_name": "User",
+        "phone": None,
+        "is_active": True,
+        "created_at": datetime(2024, 1, 15, 10, 30, tzinfo=timezone.utc),
+        "updated_at": datetime(2024, 1, 15, 10, 30, tzinfo=timezone.utc),
+        "roles": ["landowner"]
+    }
+
+class TestPrincipalCache:
+    """Test the authenticated principal cache."""
+    
+    def test_hit_returns_copy(self, principal):
+        """Cached principals are returned as independent copies."""
+        cache = PrincipalCache(max_size=10, ttl=30)
+        user_id = str(principal["user_id"])
+        cache.set(user_id, principal)
+        
+        cached = cache.get(user_id)
+        assert cached == principal
+        
+        cached["roles"].append("administrator")
+        assert cache.get(user_id)["roles"] == ["landowner"]
+    
+    def test_invalidate(self, principal):
+        """Invalidation drops the entry regardless of key type."""
+        cache = PrincipalCache(max_size=10, ttl=30)
+        cache.set(str(principal["user_id"]), principal)
+        
+        cache.invalidate(principal["user_id"])
+        assert cache.get(str(principal["user_id"])) is None
+    
+    def test_lru_eviction(self, principal):
+        """The least recently used principal is evicted first."""
+        cache = PrincipalCache(max_size=2, ttl=30)
+        cache.set("a", principal)
+        cache.set("b", principal)
+        cache.get("a")
+        cache.set("c", principal)
+        
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+    
+    def test_expired_entry_is_a_miss(self, principal, monkeypatch):
+        """Entries older than the TTL are not served."""
+        cache = PrincipalCache(max_size=10, ttl=30)
+        cache.set("a", principal)
+        
+        import auth
+        real_monotonic = auth.time.monotonic
+        monkeypatch.setattr(auth.time, "monotonic", lambda: real_monotonic() + 31)
+        assert cache.get("a") is None
+    
+    def test_disabled_with_zero_ttl(self, principal):
+        """A TTL of zero disables caching."""
+        cache = PrincipalCache(max_size=10, ttl=0)
+        cache.set("a", principal)
+        assert cache.get("a") is None
+    
+    def test_role_removal_reaches_other_workers(self, principal, memory_redis, monkeypatch):
+        """A worker holding the principal locally drops it when another worker invalidates it."""
+        import redis_service as module
+        service = module.redis_service
+        worker_a = PrincipalCache(max_size=10, ttl=30, use_redis=True)
+        worker_b = PrincipalCache(max_size=10, ttl=30, use_redis=True)
+        monkeypatch.setattr(service, "_invalidation_listeners", [worker_b.apply_invalidation])
+        user_id = str(principal["user_id"])
+        worker_a.set(user_id, {**principal, "roles": ["landowner", "administrator"]})
+        assert worker_b.get(user_id)["roles"] == ["landowner", "administrator"]
+        
+        worker_a.invalidate(user_id)
+        channel, message = memory_redis.published[-1]
+        assert channel == service.INVALIDATION_CHANNEL
+        # Delivered to worker B's process by its pub/sub listener
+        service._handle_invalidation({"data": json.dumps({**json.loads(message), "origin": "worker-b"})})
+        
+        assert worker_b.get(user_id) is None
+    
+    def test_redis_payload_round_trip(self, principal):
+        """JSON payloads from Redis are restored to their original types."""
+        payload = {
+            **principal,
+            "user_id": str(principal["user_id"]),
+            "created_at": str(principal["created_at"]),
+            "updated_at": str(principal["updated_at"])
+        }
+        assert PrincipalCache._from_redis(payload) == principal
+
+class InMemoryRedis:
+    """Minimal stand-in for the redis client commands the caches use."""
+    
+    def __init__(self):
+        self.data = {}
+        self.scripts = {
+            SessionManager.CREATE_SCRIPT: self._session_create,
+            SessionManager.GET_SCRIPT: self._session_get,
+            SessionManager.UPDATE_SCRIPT: self._session_update,
+            SessionManager.DELETE_SCRIPT: self._session_delete,
+            SessionManager.INDEX_SCRIPT: self._session_index,
+            SessionManager.UNINDEX_SCRIPT: self._session_unindex,
+            SessionManager.STATS_SCRIPT: self._session_stats,
+        }
+    
+    def pipeline(self, transaction=True):
+        return InMemoryPipeline(self)
+    
+    def register_script(self, script):
+        handler = self.scripts[script]
+        return lambda keys, args: handler(keys, args)
+    
+    # Python equivalents of the SessionManager Lua scripts; like them, they only touch the keys passed in
+    def _touch(self, key, args):
+        if key not in self.data:
+            return False
+        self.data[key]["last_accessed"] = args[0]
+        return True
+    
+    def _session_create(self, keys, args):
+        old_role = self.data.get(keys[0], {}).get("role", "")
+        self.data[keys[0]] = dict(zip(args[1::2], args[2::2]))
+        return old_role
+    
+    def _session_get(self, keys, args):
+        if not self._touch(keys[0], args):
+            return None
+        return dict(self.data[keys[0]])
+    
+    def _session_update(self, keys, args):
+        if not self._touch(keys[0], args):
+            return None
+        session = self.data[keys[0]]
+        session.update(zip(args[2::2], args[3::2]))
+        return [session.get("role"), session.get("ttl"), session.get("created_ts")]
+    
+    def _session_delete(self, keys, args):
+        if keys[0] not in self.data:
+            return None
+        return self.data.pop(keys[0]).get("role", "")
+    
+    def _session_index(self, keys, args):
+        sid, expires_at, created, role = args
+        access = self.data.setdefault(keys[0], {})
+        if sid not in access:
+            self.data.setdefault(keys[1], {})[sid] = created
+            self.data[keys[2]] = self.data.get(keys[2], 0.0) + created
+            self.sadd(keys[3], role)
+        access[sid] = expires_at
+        return 1
+    
+    def _session_unindex(self, keys, args):
+        created = self.data.get(keys[1], {}).pop(args[0], None)
+        if created is not None:
+            self.data[keys[2]] -= created
+        return int(self.data.get(keys[0], {}).pop(args[0], None) is not None)
+    
+    def _session_stats(self, keys, args):
+        access = self.data.get(keys[0], {})
+        expired = sorted((score, sid) for sid, score in access.items() if score <= args[0])[:args[1]]
+        for _, sid in expired:
+            self.data[keys[2]] -= self.data[keys[1]].pop(sid)
+            access.pop(sid)
+        if not access:
+            self.data.pop(keys[2], None)
+            return [0, b"0", len(expired)]
+        return [len(access), str(self.data[keys[2]]).encode(), len(expired)]
+    
+    def hset(self, key, field=None, value=None, mapping=None):
+        values = self.data.setdefault(key, {})
+        values.update(mapping or {field: value})
+        return 1
+    
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+    
+    def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+    
+    def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            return self.delete(key)
+        return 0
+    
+    def get(self, key):
+        return self.data.get(key)
+    
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+    
+    def incrby(self, key, amount):
+        self.data[key] = int(self.data.get(key, 0)) + amount
+        return self.data[key]
+    
+    def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+    
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+    
+    def expire(self, key, seconds):
+        return key in self.data
+    
+    def exists(self, *keys):
+        return sum(1 for key in keys if key in self.data)
+    
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+    
+    unlink = delete
+    
+    def publish(self, channel, message):
+        self.published = getattr(self, "published", []) + [(channel, message)]
+        return 0
+    
+    def scan_iter(self, match="*", count=None):
+        return [key for key in list(self.data) if fnmatch.fnmatchcase(key, match)]
+
+class InMemoryPipeline:
+    """Queues calls against InMemoryRedis and replays them on execute."""
+    
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+    
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((getattr(self.client, name), args, kwargs))
+            return self
+        return queue
+    
+    def execute(self):
+        results = [func(*args, **kwargs) for func, args, kwargs in self.calls]
+        self.calls = []
+        return results
+
+class InMemoryAsyncRedis:
+    """Awaitable facade over InMemoryRedis for the redis.asyncio code paths."""
+    
+    def __init__(self, client):
+        self.client = client
+    
+    def register_script(self, script):
+        runner = self.client.register_script(script)
+        
+        async def call(keys, args):
+            return runner(keys, args)
+        return call
+    
+    def pipeline(self, transaction=True):
+        pipe = InMemoryPipeline(self.client)
+        execute = pipe.execute
+        
+        async def execute_async():
+            return execute()
+        pipe.execute = execute_async
+        return pipe
+    
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+        
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+@pytest.fixture
+def memory_redis(monkeypatch):
+    """Point the global redis_service at an in-memory client."""
+    import redis_service as module
+    client = InMemoryRedis()
+    monkeypatch.setattr(module.redis_service, "redis_client", client)
+    monkeypatch.setattr(module.redis_service, "binary_client", client)
+    async_client = InMemoryAsyncRedis(client)
+    monkeypatch.setattr(module.async_redis_service, "_get_client", lambda: async_client)
+    monkeypatch.setattr(module.redis_service, "is_connected", True)
+    monkeypatch.setattr(module.redis_service, "_scripts", {})
+    monkeypatch.setattr(module.async_redis_service, "_scripts", {})
+    return client
+
+class TestResponseCache:
+    """Test the tagged API response cache."""
+    
+    def test_build_key_ignores_param_order(self):
+        """Keys depend on parameter values, not keyword order."""
+        cache = ResponseCache()
+        assert cache.build_key("lands:list", a=1, b="x") == cache.build_key("lands:list", b="x", a=1)
+        assert cache.build_key("lands:list", a=1) != cache.build_key("lands:list", a=2)
+    
+    def test_invalidate_tags_drops_tagged_entries(self, memory_redis):
+        """Only entries registered under an invalidated tag are removed."""
+        cache = ResponseCache()
+        land_key = cache.build_key("lands:detail", land_id="1")
+        other_key = cache.build_key("lands:detail", land_id="2")
+        cache.set(land_key, {"land_id": "1"}, ["land:1", "owner:a"])
+        cache.set(other_key, {"land_id": "2"}, ["land:2", "owner:b"])
+        
+        assert cache.invalidate_tags("owner:a") == 1
+        assert cache.get(land_key) is None
+        assert cache.get(other_key) == {"land_id": "2"}
+    
+    def test_disabled_cache_is_a_miss(self, memory_redis):
+        """A disabled cache never stores or serves entries."""
+        cache = ResponseCache(enabled=False)
+        key = cache.build_key("stats:interests", scope="all")
+        
+        assert cache.set(key, {"total_interests": 1}, ["interests:all"]) is False
+        assert cache.get(key) is None
+
+class TestCacheManager:
+    """Test SCAN-based pattern invalidation."""
+    
+    def test_scan_invalidate_batches(self, memory_redis):
+        """Matching keys are unlinked in batches of the requested size."""
+        for i in range(5):
+            memory_redis.set(f"user:42:item:{i}", "x")
+        memory_redis.set("user:7:item:0", "x")
+        manager = CacheManager(batch_size=2)
+        
+        report = manager.scan_invalidate("user:42:*")
+        
+        assert report["keys_deleted"] == 5
+        assert report["batches"] == 3
+        assert report["completed"] is True
+        assert memory_redis.get("user:7:item:0") == "x"
+    
+    def test_invalidation_stats_accumulate(self, memory_redis):
+        """Cumulative metrics include every run and the last report."""
+        sessions = SessionManager()
+        sessions.create_session("42abc", {"role": "investor"})
+        manager = CacheManager(batch_size=10)
+        
+        assert manager.clear_user_cache("42") == 1
+        stats = manager.get_invalidation_stats()
+        
+        assert stats["runs"] == 3
+        assert stats["keys_deleted"] == 1
+        assert stats["last_run"]["pattern"] == "session:42*"
+        # Cleared sessions leave the role index as well
+        assert sessions.get_active_sessions()["total_sessions"] == 0
+    
+    def test_disconnected_report(self, monkeypatch):
+        """Without Redis the report is returned but marked incomplete."""
+        import redis_service as module
+        monkeypatch.setattr(module.redis_service, "is_connected", False)
+        
+        report = CacheManager().scan_invalidate("user:*")
+        assert report["keys_deleted"] == 0
+        assert report["completed"] is False
+
+class TestCacheKeys:
+    """Test deterministic cache keys for the caching decorators."""
+    
+    @staticmethod
+    def _sample(land_id, filters, db=None):
+        return None
+    
+    def test_key_is_stable_across_processes(self):
+        """Keys do not depend on the per-process hash seed."""
+        code = (
+            "from redis_service import build_cache_key\n"
+            "def f(land_id, filters, db=None): pass\n"
+            "print(build_cache_key('stats', f, ('abc',), {'filters': {'b': 1, 'a': [1, 2]}}))"
+        )
+        keys = set()
+        for seed in ("1", "2"):
+            result = subprocess.run(
+                [sys.executable, "-c", code],
+                capture_output=True, text=True, check=True,
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                env={**os.environ, "PYTHONHASHSEED": seed}
+            )
+            keys.add(result.stdout.strip().splitlines()[-1])
+        assert len(keys) == 1
+    
+    def test_excluded_arguments_do_not_change_key(self):
+        """Excluded arguments such as db sessions are left out of the key."""
+        first = build_cache_key("p", self._sample, ("abc", {"a": 1}), {"db": object()})
+        second = build_cache_key("p", self._sample, (), {"land_id": "abc", "filters": {"a": 1}, "db": object()})
+        assert first == second
+        assert first != build_cache_key("p", self._sample, ("xyz", {"a": 1}), {})
+    
+    def test_decorator_counts_hits_and_misses(self, memory_redis):
+        """Each decorated function keeps its own hit/miss counters."""
+        calls = []
+        
+        @cache_result(expire=60, key_prefix="test")
+        def compute(value, db=None):
+            calls.append(value)
+            return {"value": value}
+        
+        assert compute(1, db=object()) == {"value": 1}
+        assert compute(1, db=object()) == {"value": 1}
+        
+        assert calls == [1]
+        assert compute.cache_counters.snapshot()["hits"] == 1
+        assert compute.cache_counters.snapshot()["misses"] == 1
+
+class TestNearCache:
+    """Test the in-process L1 tier in front of Redis."""
+    
+    def test_lru_and_ttl(self, monkeypatch):
+        """Entries are evicted by size and expire after the TTL."""
+        cache = NearCache(max_size=2, ttl=10)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        
+        import redis_service as module
+        real_monotonic = module.time.monotonic
+        monkeypatch.setattr(module.time, "monotonic", lambda: real_monotonic() + 11)
+        assert cache.get("a") is None
+    
+    def test_lookup_keys_served_from_l1(self, memory_redis):
+        """Lookup keys hit L1 after the first Redis read; other keys always go to Redis."""
+        import redis_service as module
+        service = module.redis_service
+        service.near_cache.clear()
+        memory_redis.data["lookup:roles"] = '[{"role_key": "admin"}]'
+        memory_redis.data["other"] = '{"a": 1}'
+        
+        l2_hits = service.l2_hits
+        assert service.get("lookup:roles") == [{"role_key": "admin"}]
+        assert service.get("lookup:roles") == [{"role_key": "admin"}]
+        assert service.get("other") == {"a": 1}
+        assert service.l2_hits == l2_hits + 2
+        
+        service.delete("lookup:roles")
+        assert service.get("lookup:roles") is None
+        assert memory_redis.published[-1][0] == service.INVALIDATION_CHANNEL
+    
+    def test_remote_invalidation_ignores_own_messages(self):
+        """Messages from other workers evict keys; our own broadcasts are skipped."""
+        import redis_service as module
+        service = module.redis_service
+        service.near_cache.set("lookup:roles", "[]")
+        
+        own = {"origin": service.instance_id, "keys": ["lookup:roles"]}
+        service._handle_invalidation({"data": json.dumps(own)})
+        assert service.near_cache.get("lookup:roles") == "[]"
+        
+        remote = {"origin": "other-worker", "pattern": "lookup:*"}
+        service._handle_invalidation({"data": json.dumps(remote)})
+        assert service.near_cache.get("lookup:roles") is None
+
+class TestStampedeProtection:
+    """Test single-flight recomputation and early refresh."""
+    
+    def test_concurrent_misses_share_one_computation(self, monkeypatch):
+        """Concurrent callers in one process await a single computation."""
+        import redis_service as module
+        monkeypatch.setattr(module.redis_service, "is_connected", False)
+        calls = []
+        
+        @cache_async_result(expire=60, key_prefix="test", single_flight=True)
+        async def heavy(value, db=None):
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            return {"value": value}
+        
+        async def run():
+            return await asyncio.gather(*(heavy(1, db=object()) for _ in range(5)))
+        
+        results = asyncio.run(run())
+        
+        assert results == [{"value": 1}] * 5
+        assert calls == [1]
+        assert heavy.cache_counters.snapshot()["coalesced"] == 4
+    
+    def test_cancelled_leader_hands_over_to_a_waiter(self, monkeypatch):
+        """Waiters are not cancelled with the caller computing their result."""
+        import redis_service as module
+        monkeypatch.setattr(module.redis_service, "is_connected", False)
+        calls = []
+        
+        @cache_async_result(expire=60, key_prefix="test", single_flight=True)
+        async def heavy(value, db=None):
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            return {"value": value}
+        
+        async def run():
+            leader = asyncio.ensure_future(heavy(3))
+            await asyncio.sleep(0.01)
+            waiters = [asyncio.ensure_future(heavy(3)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await asyncio.gather(*waiters), leader.cancelled()
+        
+        results, leader_cancelled = asyncio.run(run())
+        
+        assert leader_cancelled is True
+        assert results == [{"value": 3}] * 3
+        assert calls == [3, 3]
+    
+    def test_lock_holder_elsewhere_serves_stale_value(self, memory_redis):
+        """While another worker holds the lock, an early refresh returns the stale value."""
+        calls = []
+        
+        @cache_result(expire=60, key_prefix="test", single_flight=True, early_refresh=1.0)
+        def heavy(value):
+            calls.append(value)
+            return {"value": value}
+        
+        key = build_cache_key("test", heavy.__wrapped__, (1,), {})
+        memory_redis.data[key] = json.dumps({**_wrap_entry({"value": "stale"}, 5.0, 60), "expires_at": 0})
+        memory_redis.set(f"lock:{key}", "other-worker", nx=True)
+        
+        assert heavy(1) == {"value": "stale"}
+        assert calls == []
+        assert heavy.cache_counters.snapshot()["stale_served"] == 1
+    
+    def test_lock_is_released_after_recompute(self, memory_redis):
+        """The recompute lock is released once the fresh value is stored."""
+        @cache_result(expire=60, key_prefix="test", single_flight=True)
+        def heavy(value):
+            return {"value": value}
+        
+        assert heavy(2) == {"value": 2}
+        key = build_cache_key("test", heavy.__wrapped__, (2,), {})
+        assert f"lock:{key}" not in memory_redis.data
+        assert heavy(2) == {"value": 2}
+        assert heavy.cache_counters.snapshot()["hits"] == 1
+    
+    def test_early_refresh_probability(self):
+        """Entries far from expiry are kept; expired ones always refresh."""
+        fresh = _wrap_entry({}, 0.01, 300)
+        expired = {**fresh, "expires_at": 0}
+        
+        assert _should_refresh_early(fresh, 1.0) is False
+        assert _should_refresh_early(expired, 1.0) is True
+        assert _should_refresh_early(expired, 0.0) is False
+
+class TestCacheCodec:
+    """Test binary cache value encoding."""
+    
+    @pytest.fixture(params=["msgpack", "json"])
+    def serializer(self, request):
+        return ValueSerializer(codec=get_codec(request.param), compress_threshold=256)
+    
+    def test_typed_round_trip(self, serializer):
+        """Decimal, UUID, datetime and date values keep their types."""
+        value = {
+            "land_id": uuid4(),
+            "total_price": Decimal("125000.50"),
+            "created_at": datetime(2024, 1, 15, 10, 30, tzinfo=timezone.utc),
+            "due": date(2024, 2, 1),
+            "tags": ["solar", 1, None, True]
+        }
+        
+        assert serializer.loads(serializer.dumps(value)) == value
+    
+    def test_large_payload_is_compressed(self, serializer):
+        """Payloads above the threshold are stored compressed."""
+        value = [{"title": "Solar farm", "location": "Austin, TX"}] * 50
+        encoded = serializer.dumps(value)
+        
+        assert encoded[0] & COMPRESSED
+        assert serializer.loads(encoded) == value
+    
+    def test_legacy_values_still_decode(self, serializer):
+        """Values written as plain JSON or text before codecs are still readable."""
+        assert serializer.loads('{"a": 1}') == {"a": 1}
+        assert serializer.loads(b"plain text") == "plain text"
+    
+    def test_pydantic_models_are_dumped(self, serializer):
+        """Pydantic models are stored as their field values."""
+        model = LuRole(role_key="investor", label="Investor")
+        
+        assert serializer.loads(serializer.dumps([model])) == [{"role_key": "investor", "label": "Investor"}]
+    
+    def test_codecs_must_implement_both_directions(self):
+        class DumpsOnly(Codec):
+            def dumps(self, value):
+                return b""
+        
+        with pytest.raises(TypeError):
+            DumpsOnly()
+
+class TestBatchOperations:
+    """Test pipelined multi-key RedisService operations."""
+    
+    def test_set_many_and_get_many(self, memory_redis):
+        """Values written together are read back together, with defaults for misses."""
+        import redis_service as module
+        service = module.redis_service
+        land_id = uuid4()
+        
+        assert service.set_many({"a": {"land_id": land_id}, "b": [1, 2]}, expire={"a": 30, "b": 60}) is True
+        
+        assert service.get_many(["a", "b", "missing"], default=0) == {
+            "a": {"land_id": land_id},
+            "b": [1, 2],
+            "missing": 0
+        }
+    
+    def test_delete_many(self, memory_redis):
+        """delete_many reports how many keys existed."""
+        import redis_service as module
+        module.redis_service.set_many({"a": 1, "b": 2})
+        
+        assert module.redis_service.delete_many(["a", "b", "c"]) == 2
+        assert module.redis_service.get("a") is None
+    
+    def test_pipeline_decodes_get_results(self, memory_redis):
+        """Queued commands run together and GET results are decoded."""
+        import redis_service as module
+        with module.redis_service.pipeline() as pipe:
+            pipe.set("counter:value", {"n": Decimal("1.5")}).get("counter:value").increment("counter:hits")
+        
+        assert pipe.succeeded is True
+        assert pipe.results[1] == {"n": Decimal("1.5")}
+        assert pipe.results[2] == 1
+    
+    def test_pipeline_degrades_without_redis(self, monkeypatch):
+        """Without Redis the batch is skipped rather than raising."""
+        import redis_service as module
+        monkeypatch.setattr(module.redis_service, "is_connected", False)
+        
+        assert module.redis_service.set_many({"a": 1}) is False
+        assert module.redis_service.get_many(["a"]) == {"a": None}
+        assert module.redis_service.delete_many(["a"]) == 0
+
+class TestAsyncRedisService:
+    """Test the redis.asyncio code paths."""
+    
+    def test_async_decorator_uses_async_client(self, memory_redis):
+        """Async cached functions store and read through the async service."""
+        calls = []
+        
+        @cache_async_result(expire=60, key_prefix="test", tags=lambda value: [f"value:{value}"])
+        async def compute(value):
+            calls.append(value)
+            return {"value": Decimal(value)}
+        
+        async def run():
+            return [await compute("1.5"), await compute("1.5")]
+        
+        assert asyncio.run(run()) == [{"value": Decimal("1.5")}] * 2
+        assert calls == ["1.5"]
+        assert any(key.endswith("value:1.5") for key in memory_redis.data)
+    
+    def test_async_session_round_trip(self, memory_redis):
+        """Async session helpers create, read, update and delete sessions."""
+        import redis_service as module
+        manager = module.SessionManager(session_prefix="test-session")
+        
+        async def run():
+            await manager.create_session_async("abc", {"user_id": "42"})
+            await manager.update_session_async("abc", {"theme": "dark"})
+            data = await manager.get_session_async("abc")
+            deleted = await manager.delete_session_async("abc")
+            return data, deleted, await manager.session_exists_async("abc")
+        
+        data, deleted, exists = asyncio.run(run())
+        assert data == {"user_id": "42", "theme": "dark"}
+        assert deleted is True
+        assert exists is False
+
+class TestSessionHashes:
+    """Sessions are stored as hashes and updated field by field."""
+    
+    def test_fields_round_trip_through_codec(self):
+        manager = SessionManager()
+        fields = manager._encode_fields({"user_id": 42, "amount": Decimal("1.50")})
+        assert fields[0::2] == ["d:user_id", "d:amount"]
+        raw = [b"created_at", b"2026-01-01T00:00:00", *[f.encode() if isinstance(f, str) else f for f in fields]]
+        session = manager._decode_fields(raw)
+        assert session["created_at"] == "2026-01-01T00:00:00"
+        assert session["data"] == {"user_id": 42, "amount": Decimal("1.50")}
+    
+    def test_missing_session_decodes_to_none(self):
+        assert SessionManager()._decode_fields(None) is None
+        assert SessionManager()._decode_fields([]) is None
+    
+    def test_update_writes_only_changed_fields(self, memory_redis):
+        manager = SessionManager(session_prefix="test-session")
+        assert manager.create_session("abc", {"user_id": "42", "theme": "light"})
+        stored = memory_redis.data["test-session:abc"]
+        user_field = stored["d:user_id"]
+        
+        assert manager.update_session("abc", {"theme": "dark"})
+        assert memory_redis.data["test-session:abc"]["d:user_id"] is user_field
+        assert manager.get_session("abc") == {"user_id": "42", "theme": "dark"}
+    
+    def test_touch_and_update_missing_session(self, memory_redis):
+        manager = SessionManager(session_prefix="test-session")
+        assert manager.touch_session("missing") is False
+        assert manager.update_session("missing", {"theme": "dark"}) is False
+        assert "test-session:missing" not in memory_redis.data
+        
+        manager.create_session("abc", {})
+        info = manager.get_session_info("abc")
+        assert info["data"] == {}
+        assert manager.touch_session("abc") is True
+
+class TestSessionIndex:
+    """The per-role session index backs the active-session analytics."""
+    
+    def test_counts_by_role_follow_create_and_delete(self, memory_redis):
+        manager = SessionManager(session_prefix="test-session")
+        manager.create_session("a", {"role": "investor"})
+        manager.create_session("b", {"roles": ["landowner", "investor"]})
+        manager.create_session("c", {}, role="landowner")
+        manager.delete_session("b")
+        
+        stats = manager.get_active_sessions()
+        assert stats["total_sessions"] == 2
+        assert stats["session_stats"] == {"investor": 1, "landowner": 1}
+        assert stats["average_age_seconds"]["overall"] >= 0
+        assert "test-session:b" not in memory_redis.data
+    
+    def test_idle_sessions_are_pruned_in_batches(self, memory_redis):
+        manager = SessionManager(session_prefix="test-session", default_expire=60, prune_batch_size=2)
+        for session_id in ("a", "b", "c"):
+            manager.create_session(session_id, {"role": "investor"})
+        access = memory_redis.data["{test-session:index}:investor:access"]
+        for session_id in ("a", "b", "c"):
+            access[session_id] -= 120
+        manager.touch_session("c")
+        
+        stats = manager.get_active_sessions()
+        assert stats["pruned"] == 2
+        assert stats["session_stats"] == {"investor": 1}
+    
+    def test_sessions_are_pruned_by_their_own_ttl(self, memory_redis, monkeypatch):
+        """A long-lived session outlasts the default expiry; a short one doesn't."""
+        import redis_service as module
+        manager = SessionManager(session_prefix="test-session", default_expire=60)
+        manager.create_session("remember-me", {"role": "investor"}, expire=3600)
+        manager.create_session("short", {"role": "investor"}, expire=10)
+        
+        now = module.time.time()
+        monkeypatch.setattr(module.time, "time", lambda: now + 120)
+        stats = manager.get_active_sessions()
+        assert stats["pruned"] == 1
+        assert stats["session_stats"] == {"investor": 1}
+    
+    def test_recreating_a_session_moves_it_between_roles(self, memory_redis):
+        manager = SessionManager(session_prefix="test-session")
+        manager.create_session("a", {"role": "investor"})
+        manager.create_session("a", {"role": "administrator"})
+        
+        assert manager.get_active_sessions()["session_stats"] == {"administrator": 1}
@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import io
+import json
+import zipfile
+import pytest
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from document_storage import BlobStore, ResumableUploads, stream_upload, stream_zip
+
+def make_upload(data, size=None):
+    return UploadFile(io.BytesIO(data), filename="survey.pdf", size=size)
+
+class TestStreamUpload:
+    """Test streaming uploads to disk."""
+    
+    def test_writes_hashes_and_renames(self, tmp_path):
+        """The file is hashed while written and only the final name remains."""
+        data = b"survey" * 50000
+        dest = tmp_path / "land" / "survey.pdf"
+        
+        stored = asyncio.run(stream_upload(make_upload(data), dest, max_size=len(data), chunk_size=4096))
+        
+        assert stored.path == dest
+        assert stored.size == len(data)
+        assert stored.sha256 == hashlib.sha256(data).hexdigest()
+        assert dest.read_bytes() == data
+        assert [path.name for path in dest.parent.iterdir()] == ["survey.pdf"]
+    
+    def test_oversized_upload_leaves_nothing_behind(self, tmp_path):
+        dest = tmp_path / "land" / "survey.pdf"
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(stream_upload(make_upload(b"x" * 10000), dest, max_size=4096, chunk_size=1024))
+        
+        assert exc_info.value.status_code == 413
+        assert list(dest.parent.iterdir()) == []
+    
+    def test_declared_size_is_rejected_before_copying(self, tmp_path):
+        upload = make_upload(b"x" * 10, size=10 * 1024 * 1024)
+        with pytest.raises(HTTPException):
+            asyncio.run(stream_upload(upload, tmp_path / "survey.pdf", max_size=4096))
+        
+        assert upload.file.tell() == 0
+        assert list(tmp_path.iterdir()) == []
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE document_blobs (
+                sha256 TEXT PRIMARY KEY,
+                file_path TEXT NOT NULL,
+                file_size BIGINT NOT NULL,
+                ref_count INTEGER NOT NULL DEFAULT 0
+            )
+        """))
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+def ref_count(db, sha256):
+    return db.execute(text("SELECT ref_count FROM document_blobs WHERE sha256 = :sha256"), {"sha256": sha256}).scalar()
+
+def store_upload(store, db, data):
+    """Receive an upload and reference its blob, as upload_document does."""
+    received = asyncio.run(store.receive(make_upload(data), max_size=len(data)))
+    stored, moved = store.store_file(db, received.path, received.size, received.sha256)
+    db.commit()
+    received.path.unlink(missing_ok=True)
+    return stored, moved
+
+class TestBlobStore:
+    """Test content-addressed storage with reference counts."""
+    
+    def test_duplicates_share_one_file(self, tmp_path, db):
+        """The second upload of the same content only bumps the reference count."""
+        store = BlobStore(tmp_path / "blobs")
+        data = b"survey" * 1000
+        
+        first, moved = store_upload(store, db, data)
+        assert moved is True
+        second, moved = store_upload(store, db, data)
+        
+        assert moved is False
+        assert second == first
+        assert first.path == tmp_path / "blobs" / first.sha256[:2] / first.sha256[2:4] / first.sha256
+        assert first.path.read_bytes() == data
+        assert ref_count(db, first.sha256) == 2
+        assert list((tmp_path / "blobs" / "incoming").iterdir()) == []
+    
+    def test_last_release_removes_the_blob(self, tmp_path, db):
+        store = BlobStore(tmp_path / "blobs")
+        stored, _ = store_upload(store, db, b"id scan")
+        store_upload(store, db, b"id scan")
+        
+        assert store.release(db, stored.sha256) is False
+        assert store.release(db, stored.sha256) is True
+        db.commit()
+        assert stored.path.exists()
+        assert ref_count(db, stored.sha256) == 0
+        
+        assert store.purge(db, stored.sha256) is True
+        assert not stored.path.exists()
+        assert ref_count(db, stored.sha256) is None
+    
+    def test_purge_skips_a_blob_referenced_again(self, tmp_path, db):
+        """An upload of the same content after the release keeps the file."""
+        store = BlobStore(tmp_path / "blobs")
+        stored, _ = store_upload(store, db, b"id scan")
+        store.release(db, stored.sha256)
+        db.commit()
+        
+        _, moved = store_upload(store, db, b"id scan")
+        assert moved is False
+        assert store.purge(db, stored.sha256) is False
+        assert stored.path.read_bytes() == b"id scan"
+        assert ref_count(db, stored.sha256) == 1
+    
+    def test_missing_file_is_rewritten(self, tmp_path, db):
+        store = BlobStore(tmp_path / "blobs")
+        stored, _ = store_upload(store, db, b"report")
+        stored.path.unlink()
+        
+        _, moved = store_upload(store, db, b"report")
+        assert moved is True
+        assert stored.path.read_bytes() == b"report"
+
+async def body(*blocks):
+    for block in blocks:
+        yield block
+
+class TestResumableUploads:
+    """Test chunked uploads that can be resumed."""
+    
+    @pytest.fixture
+    def uploads(self, tmp_path):
+        return ResumableUploads(tmp_path / "partial", chunk_size=1000, max_size=10000, ttl=3600)
+    
+    def create(self, uploads, size=2500):
+        return uploads.create("land-1", "user-1", "survey", "survey.pdf", size)
+    
+    def test_chunks_in_any_order_assemble_the_file(self, uploads, tmp_path, db):
+        """Chunks arrive out of order and the result moves into the blob store."""
+        data = bytes(range(256)) * 10
+        session = self.create(uploads, len(data))
+        for index in (2, 0, 1):
+            chunk = data[index * 1000:(index + 1) * 1000]
+            asyncio.run(uploads.write_chunk(session, index, index * 1000, body(chunk[:300], chunk[300:])))
+        
+        assert uploads.missing_chunks(session) == []
+        size, sha256 = uploads.hash_data(session["upload_id"])
+        assert (size, sha256) == (len(data), hashlib.sha256(data).hexdigest())
+        
+        stored, moved = BlobStore(tmp_path / "blobs").store_file(db, uploads.data_path(session["upload_id"]), size, sha256)
+        assert moved is True
+        assert stored.path.read_bytes() == data
+    
+    def test_interrupted_chunk_is_not_recorded(self, uploads):
+        """A chunk cut short must be sent again."""
+        session = self.create(uploads)
+        asyncio.run(uploads.write_chunk(session, 0, 0, body(b"x" * 1000)))
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(uploads.write_chunk(session, 1, 1000, body(b"x" * 400)))
+        
+        assert exc_info.value.status_code == 400
+        assert uploads.missing_chunks(session) == [1, 2]
+    
+    def test_offsets_and_sizes_are_checked(self, uploads):
+        session = self.create(uploads)
+        with pytest.raises(HTTPException):
+            asyncio.run(uploads.write_chunk(session, 1, 0, body(b"x" * 1000)))
+        with pytest.raises(HTTPException):
+            asyncio.run(uploads.write_chunk(session, 2, 2000, body(b"x" * 1000)))
+        with pytest.raises(HTTPException) as exc_info:
+            self.create(uploads, size=20000)
+        assert exc_info.value.status_code == 413
+    
+    def test_sessions_persist_on_disk_and_expire(self, uploads, tmp_path):
+        session = self.create(uploads)
+        restored = ResumableUploads(tmp_path / "partial", chunk_size=1000, max_size=10000, ttl=3600)
+        assert restored.get(session["upload_id"]) == session
+        assert restored.get("../etc") is None
+        
+        session["expires_at"] = 0
+        (tmp_path / "partial" / f"{session['upload_id']}.json").write_text(json.dumps(session))
+        assert restored.purge_expired() == 1
+        assert list((tmp_path / "partial").iterdir()) == []
+    
+    def test_only_one_completion_claims_a_session(self, uploads):
+        """A retried or concurrent completion finds the session already taken."""
+        session = self.create(uploads)
+        upload_id = session["upload_id"]
+        
+        assert uploads.claim(upload_id) is True
+        assert uploads.claim(upload_id) is False
+        assert uploads.get(upload_id) is None
+        assert uploads.is_claimed(upload_id) is True
+        
+        uploads.release_claim(upload_id)
+        assert uploads.get(upload_id) == session
+        assert uploads.claim(upload_id) is True
+        uploads.discard(upload_id)
+        assert list(uploads.root.iterdir()) == []
+
+class TestStreamZip:
+    """Test ZIP archives generated on the fly."""
+    
+    def test_archive_is_built_incrementally(self, tmp_path):
+        """Parts stay around one read block in size and form a valid archive."""
+        report = tmp_path / "report.pdf"
+        report.write_bytes(bytes(range(256)) * 4096)
+        notes = tmp_path / "notes.txt"
+        notes.write_text("boundary survey\n" * 1000)
+        
+        parts = list(stream_zip(
+            [("survey/report.pdf", report), ("other/notes.txt", notes), ("other/gone.pdf", tmp_path / "gone.pdf")],
+            chunk_size=64 * 1024
+        ))
+        
+        assert len(parts) > 10
+        assert max(len(part) for part in parts) < 64 * 1024 + 1024
+        with zipfile.ZipFile(io.BytesIO(b"".join(parts))) as archive:
+            assert archive.testzip() is None
+            assert archive.namelist() == ["survey/report.pdf", "other/notes.txt"]
+            assert archive.read("survey/report.pdf") == report.read_bytes()
+            assert archive.getinfo("other/notes.txt").compress_type == zipfile.ZIP_DEFLATED
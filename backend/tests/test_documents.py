@@ -0,0 +1,191 @@
+import hashlib
+import io
+import pytest
+import zipfile
+from types import SimpleNamespace
+from fastapi import FastAPI
+from starlette.requests import Request
+from fastapi.testclient import TestClient
+
+from auth import get_current_user
+from database import get_db
+from routers import documents
+from routers.documents import bundle_entries, commit_document, remove_document
+from document_storage import StoredFile
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+DOCUMENT_ID = "3fa85f64-5717-4562-b3fc-2c963f66afa6"
+
+class StubSession:
+    """Returns one fixed row for every query."""
+    
+    def __init__(self, row):
+        self.row = row
+    
+    def execute(self, *args, **kwargs):
+        return SimpleNamespace(fetchone=lambda: self.row, fetchall=lambda: [self.row])
+
+@pytest.fixture
+def pdf(tmp_path):
+    data = b"%PDF-1.7 " + bytes(range(256)) * 40
+    path = tmp_path / "blob"
+    path.write_bytes(data)
+    return path, data
+
+@pytest.fixture
+def client(pdf):
+    path, data = pdf
+    row = SimpleNamespace(
+        document_id=DOCUMENT_ID, document_type="survey", file_path=str(path), file_name="survey.pdf",
+        file_hash=hashlib.sha256(data).hexdigest(), mime_type="application/pdf",
+        owner_id="owner", status_key="published"
+    )
+    app = FastAPI()
+    app.include_router(documents.router)
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": "viewer", "roles": []}
+    app.dependency_overrides[get_db] = lambda: StubSession(row)
+    return TestClient(app)
+
+class TestDocumentDownload:
+    """Test caching headers, conditional requests and byte ranges on downloads."""
+    
+    def test_full_download_has_hash_etag_and_mime_type(self, client, pdf):
+        _, data = pdf
+        response = client.get(f"/documents/download/{DOCUMENT_ID}")
+        
+        assert response.status_code == 200
+        assert response.content == data
+        assert response.headers["etag"] == f'"{hashlib.sha256(data).hexdigest()}"'
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-disposition"].startswith("attachment")
+    
+    def test_conditional_requests_return_not_modified(self, client):
+        """A matching ETag or an unchanged date skips the body."""
+        first = client.get(f"/documents/download/{DOCUMENT_ID}")
+        etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+        
+        cached = client.get(f"/documents/download/{DOCUMENT_ID}", headers={"If-None-Match": f'W/"other", {etag}'})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+        
+        assert client.get(f"/documents/download/{DOCUMENT_ID}", headers={"If-Modified-Since": last_modified}).status_code == 304
+        # If-None-Match wins over If-Modified-Since
+        changed = client.get(f"/documents/download/{DOCUMENT_ID}", headers={"If-None-Match": '"other"', "If-Modified-Since": last_modified})
+        assert changed.status_code == 200
+    
+    def test_byte_ranges(self, client, pdf):
+        _, data = pdf
+        response = client.get(f"/documents/download/{DOCUMENT_ID}?inline=true", headers={"Range": "bytes=100-199"})
+        
+        assert response.status_code == 206
+        assert response.content == data[100:200]
+        assert response.headers["content-range"] == f"bytes 100-199/{len(data)}"
+        assert response.headers["content-disposition"].startswith("inline")
+        
+        stale = client.get(f"/documents/download/{DOCUMENT_ID}", headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+        assert stale.status_code == 200
+        assert stale.content == data
+
+class TestLandBundle:
+    """Test the streamed ZIP of all documents for a land."""
+    
+    def test_bundle_streams_a_zip(self, client, pdf):
+        _, data = pdf
+        response = client.get(f"/documents/land/{DOCUMENT_ID}/bundle")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert "content-length" not in response.headers
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert archive.namelist() == ["survey/survey.pdf"]
+            assert archive.read("survey/survey.pdf") == data
+    
+    def test_entry_names_are_unique_and_flat(self):
+        rows = [
+            SimpleNamespace(document_id="1", document_type="survey", file_name="plan.pdf", file_path="a"),
+            SimpleNamespace(document_id="2", document_type="survey", file_name="../plan.pdf", file_path="b"),
+            SimpleNamespace(document_id="3", document_type=None, file_name="id.png", file_path="c")
+        ]
+        assert [name for name, _ in bundle_entries(rows)] == ["survey/plan.pdf", "survey/plan (2).pdf", "other/id.png"]
+
+class TestUploadLimits:
+    """Test rejecting request bodies on their declared length."""
+    
+    def test_oversized_upload_is_rejected_before_the_form_is_parsed(self, client, monkeypatch):
+        def form(*args, **kwargs):
+            raise AssertionError("form parsed")
+        monkeypatch.setattr(Request, "form", form)
+        headers = {"Content-Type": "multipart/form-data; boundary=x"}
+        
+        response = client.post(f"/documents/upload/{DOCUMENT_ID}", content=b"--x--", headers={**headers, "Content-Length": str(2**31)})
+        assert response.status_code == 413
+        
+        chunked = client.post(f"/documents/upload/{DOCUMENT_ID}", content=iter([b"--x--"]), headers=headers)
+        assert chunked.status_code == 411
+
+class TestCommitDocument:
+    """Test the blocking store-and-commit step of uploads."""
+    
+    def test_failed_insert_puts_the_file_back(self, tmp_path, monkeypatch):
+        """Without a documents table the insert fails and nothing is left referenced."""
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE document_blobs (
+                    sha256 TEXT PRIMARY KEY, file_path TEXT NOT NULL,
+                    file_size BIGINT NOT NULL, ref_count INTEGER NOT NULL DEFAULT 0
+                )
+            """))
+        db = sessionmaker(bind=engine)()
+        monkeypatch.setattr(documents.document_blobs, "root", tmp_path / "blobs")
+        received_path = tmp_path / "received"
+        received_path.write_bytes(b"survey")
+        received = StoredFile(received_path, 6, hashlib.sha256(b"survey").hexdigest())
+        
+        with pytest.raises(Exception):
+            commit_document(db, received, "land", "survey", "survey.pdf", "user")
+        
+        assert received_path.read_bytes() == b"survey"
+        assert not documents.document_blobs.blob_path(received.sha256).exists()
+        assert db.execute(text("SELECT COUNT(*) FROM document_blobs")).scalar() == 0
+
+class TestRemoveDocument:
+    """Test the blocking delete-and-commit step of document deletion."""
+    
+    def test_file_is_removed_only_after_the_commit(self, tmp_path, monkeypatch):
+        """A failed commit leaves the document, its reference and its file in place."""
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE document_blobs (
+                    sha256 TEXT PRIMARY KEY, file_path TEXT NOT NULL,
+                    file_size BIGINT NOT NULL, ref_count INTEGER NOT NULL DEFAULT 0
+                )
+            """))
+            conn.execute(text("CREATE TABLE documents (document_id TEXT PRIMARY KEY, file_hash TEXT)"))
+        db = sessionmaker(bind=engine)()
+        monkeypatch.setattr(documents.document_blobs, "root", tmp_path / "blobs")
+        received_path = tmp_path / "received"
+        received_path.write_bytes(b"survey")
+        stored, _ = documents.document_blobs.store_file(db, received_path, 6, hashlib.sha256(b"survey").hexdigest())
+        db.execute(text("INSERT INTO documents VALUES ('doc', :sha256)"), {"sha256": stored.sha256})
+        db.commit()
+        
+        commit = db.commit
+        def failing_commit():
+            raise RuntimeError("connection lost")
+        monkeypatch.setattr(db, "commit", failing_commit)
+        with pytest.raises(RuntimeError):
+            remove_document(db, "doc", stored.sha256, str(stored.path))
+        
+        assert stored.path.read_bytes() == b"survey"
+        assert db.execute(text("SELECT ref_count FROM document_blobs")).scalar() == 1
+        assert db.execute(text("SELECT COUNT(*) FROM documents")).scalar() == 1
+        
+        monkeypatch.setattr(db, "commit", commit)
+        remove_document(db, "doc", stored.sha256, str(stored.path))
+        assert not stored.path.exists()
+        assert db.execute(text("SELECT COUNT(*) FROM document_blobs")).scalar() == 0
@@ -0,0 +1,250 @@
+import logging
+import logging.handlers
+import pytest
+from datetime import datetime, timedelta
+
+import log_store
+from log_store import (
+    LogOffsetIndex, LogStatsAggregator, LogStore, compress_segment, message_template, parse_timestamp,
+    query_log, read_lines_reverse, segment_namer
+)
+from routers.logs import parse_log_line
+
+BASE_TIME = datetime(2025, 9, 14, 18, 0, 0)
+
+def write_log(path, count, start=BASE_TIME):
+    lines = []
+    for i in range(count):
+        timestamp = (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S")
+        level = "ERROR" if i % 10 == 0 else "INFO"
+        lines.append(f"{timestamp} - renewmart.test - {level} - test.py:{i} - message {i}\n")
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(lines)
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "renewmart.log"
+    write_log(path, 500)
+    return path
+
+class TestReverseReader:
+    """Test reading log files backwards."""
+    
+    def test_lines_come_back_newest_first(self, log_file):
+        """Small blocks still yield whole lines with their offsets."""
+        lines = list(read_lines_reverse(log_file, block_size=37))
+        forward = log_file.read_text().splitlines()
+        
+        assert [line for _, line in lines] == forward[::-1]
+        raw = log_file.read_bytes()
+        assert all(raw[offset:].startswith(line.encode()) for offset, line in lines)
+    
+    def test_timestamp_parsing(self):
+        assert parse_timestamp("2025-09-14 18:22:19 - renewmart - INFO") == datetime(2025, 9, 14, 18, 22, 19)
+        assert parse_timestamp(b"Traceback (most recent call last):") is None
+
+class TestLogQuery:
+    """Test lazy filtering and the sidecar offset index."""
+    
+    def test_limit_stops_early_and_reports_more(self, log_file):
+        entries, has_more = query_log(log_file, parse_log_line, level="ERROR", limit=3)
+        
+        assert [entry.message for entry in entries] == ["message 490", "message 480", "message 470"]
+        assert has_more is True
+    
+    def test_time_range_uses_index(self, log_file):
+        """Time-range queries seek with the index and match a full scan."""
+        start, end = BASE_TIME + timedelta(seconds=100), BASE_TIME + timedelta(seconds=119)
+        indexed, _ = query_log(log_file, parse_log_line, start=start, end=end, limit=1000)
+        scanned, _ = query_log(log_file, parse_log_line, start=start, end=end, limit=1000, use_index=False)
+        
+        assert [entry.message for entry in indexed] == [f"message {i}" for i in range(119, 99, -1)]
+        assert indexed == scanned
+        assert log_file.with_name("renewmart.log.idx").exists()
+    
+    def test_index_extends_and_rebuilds_after_rotation(self, log_file):
+        index = LogOffsetIndex(log_file, stride=1024)
+        index.refresh()
+        entries = len(index.offsets)
+        end = BASE_TIME + timedelta(seconds=250)
+        raw = log_file.read_bytes()
+        first_newer = raw.index((end + timedelta(seconds=1)).strftime("%Y-%m-%d %H:%M:%S").encode())
+        offset = index.offset_after(end)
+        assert first_newer <= offset < first_newer + 1024 + 100
+        
+        write_log(log_file, 200, start=BASE_TIME + timedelta(seconds=500))
+        index.refresh()
+        assert len(index.offsets) > entries
+        assert LogOffsetIndex(log_file, stride=1024).offsets == index.offsets
+        
+        log_file.write_text("")
+        write_log(log_file, 10, start=BASE_TIME + timedelta(hours=1))
+        index.refresh()
+        assert index.indexed_size == log_file.stat().st_size
+        assert index.offset_after(BASE_TIME + timedelta(hours=2)) is None
+
+class TestLogStatsAggregator:
+    """Test incremental per-minute log statistics."""
+    
+    @pytest.fixture
+    def recent_log(self, tmp_path):
+        path = tmp_path / "renewmart.log"
+        start = datetime.now().replace(second=0, microsecond=0) - timedelta(hours=2)
+        write_log(path, 300, start=start)
+        return path, start
+    
+    def aggregator(self, tmp_path, path):
+        return LogStatsAggregator({"general": path}, tmp_path / "stats.json.gz", parse_log_line)
+    
+    def test_message_templates_collapse_ids(self):
+        assert message_template("GET /lands/3f1c2b9e-1d2a-4c5b-8e7f-0a1b2c3d4e5f - 200 - 4.51ms") == \
+            "GET /lands/<uuid> - <n> - <n>ms"
+    
+    def test_buckets_match_a_full_scan(self, tmp_path, recent_log):
+        path, start = recent_log
+        aggregator = self.aggregator(tmp_path, path)
+        aggregator.update()
+        
+        stats = aggregator.stats("general", start, start + timedelta(seconds=299))
+        assert stats["total_entries"] == 300
+        assert stats["levels"] == {"ERROR": 30, "INFO": 270}
+        assert stats["top_messages"] == {"message <n>": 300}
+        assert stats["recent_errors"][0]["message"] == "message 290"
+        
+        partial = aggregator.stats("general", start, start + timedelta(seconds=59))
+        assert partial["total_entries"] == 60
+    
+    def test_updates_are_incremental_and_persisted(self, tmp_path, recent_log):
+        path, start = recent_log
+        aggregator = self.aggregator(tmp_path, path)
+        aggregator.update()
+        write_log(path, 60, start=start + timedelta(seconds=300))
+        aggregator.update()
+        assert aggregator.stats("general", start, datetime.now())["total_entries"] == 360
+        
+        restored = self.aggregator(tmp_path, path)
+        restored.update()
+        assert restored.stats("general", start, datetime.now())["total_entries"] == 360
+    
+    def test_state_is_saved_only_when_changed(self, tmp_path, recent_log, monkeypatch):
+        """Idle ticks don't rewrite the state and saves are throttled."""
+        path, start = recent_log
+        aggregator = self.aggregator(tmp_path, path)
+        saves = []
+        save = aggregator._save
+        monkeypatch.setattr(aggregator, "_save", lambda: saves.append(1) or save())
+        
+        aggregator.update()
+        aggregator.update()
+        assert len(saves) == 1
+        
+        write_log(path, 60, start=start + timedelta(seconds=300))
+        aggregator.update()
+        assert len(saves) == 1
+        aggregator.flush()
+        assert len(saves) == 2
+        assert self.aggregator(tmp_path, path).positions == aggregator.positions
+    
+    def test_rotation_finishes_the_previous_file(self, tmp_path, recent_log):
+        path, start = recent_log
+        aggregator = self.aggregator(tmp_path, path)
+        aggregator.update()
+        
+        write_log(path, 10, start=start + timedelta(seconds=300))
+        path.rename(path.with_name("renewmart.log.1"))
+        write_log(path, 5, start=start + timedelta(seconds=400))
+        aggregator.update()
+        
+        assert aggregator.stats("general", start, datetime.now())["total_entries"] == 315
+
+    def test_one_started_aggregator_leads(self, tmp_path, recent_log):
+        """Workers sharing a state file elect one tailer; the next takes over when it stops."""
+        path, start = recent_log
+        leader, follower = self.aggregator(tmp_path, path), self.aggregator(tmp_path, path)
+        leader.start(interval=60)
+        follower.start(interval=60)
+        try:
+            assert leader._leader is True
+            assert follower._leader is False
+            
+            # The follower serves what the leader saved instead of tailing itself
+            leader.update()
+            write_log(path, 60, start=start + timedelta(seconds=300))
+            follower.update()
+            assert follower.stats("general", start, datetime.now())["total_entries"] == 300
+            
+            leader.stop()
+            follower.update()
+            assert follower._leader is True
+            assert follower.stats("general", start, datetime.now())["total_entries"] == 360
+        finally:
+            leader.stop()
+            follower.stop()
+        assert not list(tmp_path.glob("*.tmp"))
+
+class TestLogStore:
+    """Test querying across gzipped rotated segments."""
+    
+    def rotate_into_segments(self, path, ranges):
+        """Write one gzipped segment per start time (oldest first) and leave the last one live."""
+        for number, start in enumerate(ranges):
+            if number:
+                for older in LogStore(path).rotated_paths()[::-1]:
+                    index = int(older.name.split(".")[2])
+                    older.rename(path.with_name(f"{path.name}.{index + 1}.gz"))
+                compress_segment(str(path), str(path.with_name(path.name + ".1.gz")))
+            write_log(path, 50, start=start)
+    
+    def test_rotating_handler_writes_compressed_segments(self, tmp_path):
+        path = tmp_path / "renewmart.log"
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=4000, backupCount=20)
+        handler.rotator = compress_segment
+        handler.namer = segment_namer
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        ))
+        test_logger = logging.getLogger("renewmart.test.rotation")
+        test_logger.propagate = False
+        test_logger.addHandler(handler)
+        try:
+            for i in range(200):
+                test_logger.warning(f"message {i}")
+        finally:
+            test_logger.removeHandler(handler)
+            handler.close()
+        
+        store = LogStore(path)
+        assert len(store.rotated_paths()) > 2
+        assert all(segment.suffix == ".gz" for segment in store.rotated_paths())
+        entries, has_more = store.query(parse_log_line, limit=1000)
+        assert [entry.message for entry in entries] == [f"message {i}" for i in range(199, -1, -1)]
+        assert has_more is False
+        assert store.query(parse_log_line, limit=5)[1] is True
+    
+    def test_segments_outside_the_range_are_skipped(self, tmp_path, monkeypatch):
+        path = tmp_path / "renewmart.log"
+        starts = [BASE_TIME + timedelta(hours=hour) for hour in range(4)]
+        self.rotate_into_segments(path, starts)
+        opened = []
+        query_compressed = log_store._query_compressed
+        
+        def tracking(segment_path, *args):
+            opened.append(segment_path.name)
+            return query_compressed(segment_path, *args)
+        monkeypatch.setattr(log_store, "_query_compressed", tracking)
+        
+        store = LogStore(path)
+        entries, _ = store.query(parse_log_line, start=starts[1], end=starts[1] + timedelta(seconds=9))
+        assert [entry.message for entry in entries] == [f"message {i}" for i in range(9, -1, -1)]
+        assert opened == ["renewmart.log.2.gz"]
+        assert len(store._load_manifest()) == 3
+    
+    def test_aggregator_bootstraps_from_rotated_segments(self, tmp_path):
+        path = tmp_path / "renewmart.log"
+        now = datetime.now().replace(second=0, microsecond=0)
+        self.rotate_into_segments(path, [now - timedelta(hours=400), now - timedelta(hours=3), now - timedelta(hours=1)])
+        
+        aggregator = LogStatsAggregator({"general": path}, tmp_path / "stats.json.gz", parse_log_line)
+        aggregator.update()
+        assert aggregator.stats("general", now - timedelta(hours=168), now)["total_entries"] == 100
@@ -0,0 +1,113 @@
+import json
+import logging
+import queue
+from datetime import datetime
+
+from log_store import parse_timestamp
+from logs import BatchedRotatingFileHandler, BatchingQueueListener, DroppingQueueHandler, JsonLinesFormatter
+from routers.logs import parse_log_line
+
+def make_record(name, level, message):
+    return logging.LogRecord(name, level, __file__, 1, message, None, None)
+
+class TestLoggingPipeline:
+    """Test the queued, batched logging pipeline."""
+    
+    def test_full_queue_drops_and_counts(self):
+        """A full queue drops records instead of blocking the caller."""
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1), error_timeout=0.01)
+        handler.handle(make_record("renewmart", logging.INFO, "kept"))
+        handler.handle(make_record("renewmart", logging.INFO, "dropped"))
+        handler.handle(make_record("renewmart", logging.ERROR, "dropped too"))
+        
+        assert handler.queue.qsize() == 1
+        assert handler.dropped == {"INFO": 1, "ERROR": 1}
+    
+    def test_listener_routes_and_batches(self, tmp_path):
+        """Access records go to the access log and writes are grouped into batches."""
+        log_queue = queue.Queue()
+        app_handler = BatchedRotatingFileHandler(tmp_path / "app.log")
+        access_handler = BatchedRotatingFileHandler(tmp_path / "access.log")
+        error_handler = BatchedRotatingFileHandler(tmp_path / "errors.log")
+        error_handler.setLevel(logging.ERROR)
+        for i in range(50):
+            log_queue.put(make_record("renewmart.access", logging.INFO, f"GET /{i} - 200"))
+            log_queue.put(make_record("renewmart.database", logging.INFO, f"DB READ {i}"))
+        log_queue.put(make_record("renewmart", logging.ERROR, "failure"))
+        
+        listener = BatchingQueueListener(log_queue, [app_handler, error_handler], [access_handler], batch_size=32)
+        listener.start()
+        listener.stop()
+        for handler in (app_handler, access_handler, error_handler):
+            handler.close()
+        
+        assert (tmp_path / "access.log").read_text().splitlines()[-1] == "GET /49 - 200"
+        assert len((tmp_path / "app.log").read_text().splitlines()) == 51
+        assert (tmp_path / "errors.log").read_text() == "failure\n"
+        assert listener.records == 101
+        assert listener.batches < listener.records
+
+    def test_tracebacks_survive_the_queue(self, tmp_path):
+        """Exceptions logged through the queue reach the JSON and text formats."""
+        log_queue = queue.Queue()
+        json_handler = BatchedRotatingFileHandler(tmp_path / "app.log")
+        json_handler.setFormatter(JsonLinesFormatter())
+        text_handler = BatchedRotatingFileHandler(tmp_path / "errors.log")
+        text_handler.setFormatter(logging.Formatter("%(levelname)s - %(message)s"))
+        logger = logging.getLogger("renewmart.tests.queue")
+        logger.propagate = False
+        queue_handler = DroppingQueueHandler(log_queue)
+        logger.addHandler(queue_handler)
+        listener = BatchingQueueListener(log_queue, [json_handler, text_handler], [])
+        listener.start()
+        try:
+            try:
+                1 / 0
+            except ZeroDivisionError:
+                logger.error("division failed for %s", "plot-7", exc_info=True)
+        finally:
+            listener.stop()
+            logger.removeHandler(queue_handler)
+            json_handler.close()
+            text_handler.close()
+        
+        entry = json.loads((tmp_path / "app.log").read_text())
+        assert entry["msg"] == "division failed for plot-7"
+        assert entry["exc"].startswith("Traceback")
+        assert "ZeroDivisionError" in entry["exc"]
+        text = (tmp_path / "errors.log").read_text()
+        assert text.startswith("ERROR - division failed for plot-7\nTraceback")
+        assert "ZeroDivisionError" in text
+
+class TestStructuredLogs:
+    """Test the JSON lines format and the log line parser."""
+    
+    def test_json_records_parse_with_typed_fields(self):
+        """Event fields survive the round trip with their types."""
+        record = make_record("renewmart.access", logging.INFO, "GET /api/lands - 200 - 12.50ms")
+        record.created = datetime(2025, 9, 14, 18, 22, 19).timestamp()
+        record.event_fields = {"type": "access", "method": "GET", "path": "/api/lands", "status_code": 200, "response_time_ms": 12.5}
+        line = JsonLinesFormatter().format(record)
+        
+        entry = parse_log_line(line)
+        assert parse_timestamp(line) == entry.timestamp == datetime(2025, 9, 14, 18, 22, 19)
+        assert entry.level == "INFO"
+        assert entry.message == "GET /api/lands - 200 - 12.50ms"
+        assert entry.metadata["type"] == "access"
+        assert entry.metadata["status_code"] == 200
+        assert entry.metadata["response_time_ms"] == 12.5
+        assert entry.metadata["format"] == "json"
+    
+    def test_fallback_keeps_plain_records_as_text(self):
+        formatter = JsonLinesFormatter(fallback=logging.Formatter("%(levelname)s - %(message)s"))
+        assert formatter.format(make_record("renewmart", logging.INFO, "started")) == "INFO - started"
+    
+    def test_text_lines_still_parse(self):
+        entry = parse_log_line("2025-09-14 18:22:19 - renewmart.access - INFO - logs.py:330 - GET /api/lands - 200 - 12.50ms")
+        assert entry.timestamp == datetime(2025, 9, 14, 18, 22, 19)
+        assert entry.source == "renewmart.access:logs.py"
+        assert entry.metadata["type"] == "access"
+        assert entry.metadata["status_code"] == 200
+        assert entry.metadata["details"] == "- 12.50ms"
+        
+        assert parse_log_line("not a log line").metadata == {"type": "raw"}
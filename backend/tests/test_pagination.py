@@ -0,0 +1,52 @@
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+from fastapi import HTTPException
+
+from pagination import encode_cursor, decode_cursor, apply_keyset, build_cursor_page
+
+class TestKeysetPagination:
+    """Test cursor encoding and keyset page building."""
+    
+    def test_cursor_round_trip(self):
+        """Cursors decode back to the original keyset position."""
+        created_at = datetime(2024, 1, 15, 10, 30, tzinfo=timezone.utc)
+        row_id = uuid4()
+        
+        assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, row_id)
+    
+    def test_invalid_cursor_rejected(self):
+        """Malformed cursors are rejected with a 400."""
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor("not-a-cursor")
+        
+        assert exc_info.value.status_code == 400
+    
+    def test_apply_keyset_adds_predicate(self):
+        """A cursor adds the row comparison and fetches one extra row."""
+        params = {}
+        cursor = encode_cursor(datetime(2024, 1, 15, tzinfo=timezone.utc), uuid4())
+        query = apply_keyset("SELECT * FROM lands l WHERE 1=1", params, cursor, 10, "l.created_at", "l.land_id")
+        
+        assert "(l.created_at, l.land_id) < (:cursor_created_at, :cursor_id)" in query
+        assert query.endswith("ORDER BY l.created_at DESC, l.land_id DESC LIMIT :limit")
+        assert params["limit"] == 11
+    
+    def test_build_cursor_page(self):
+        """The extra row sets has_next and the last kept row becomes the cursor."""
+        rows = [
+            SimpleNamespace(land_id=uuid4(), created_at=datetime(2024, 1, day, tzinfo=timezone.utc))
+            for day in (3, 2, 1)
+        ]
+        
+        page = build_cursor_page(rows, 2, None, lambda row: row.land_id, id_attr="land_id")
+        
+        assert page.items == [rows[0].land_id, rows[1].land_id]
+        assert page.has_next is True
+        assert page.has_prev is False
+        assert decode_cursor(page.next_cursor) == (rows[1].created_at, rows[1].land_id)
+        
+        last_page = build_cursor_page(rows[:1], 2, page.next_cursor, lambda row: row.land_id, id_attr="land_id")
+        assert last_page.has_next is False
+        assert last_page.next_cursor is None
@@ -0,0 +1,97 @@
+import pytest
+from limits import parse
+from limits.strategies import FixedWindowRateLimiter, SlidingWindowCounterRateLimiter
+from concurrent.futures import ThreadPoolExecutor
+
+import rate_limiter
+from rate_limiter import SharedWindowTable, SlidingWindowEngine, SlidingWindowStorage
+
+@pytest.fixture
+def table(tmp_path):
+    return SharedWindowTable(str(tmp_path / "ratelimit"), slots=64)
+
+class TestSharedWindowTable:
+    """Test the shared-memory fallback counters."""
+    
+    def test_limit_is_enforced_within_a_window(self, table):
+        """Tokens are granted until the window is full."""
+        granted = [table.acquire("client", 3, 60, 1, 1, now=600.0) for _ in range(4)]
+        assert granted == [1, 1, 1, 0]
+    
+    def test_previous_window_is_weighted(self, table):
+        """Half-way through a window, half of the previous count still applies."""
+        assert table.acquire("client", 10, 60, 10, 1, now=600.0) == 10
+        assert table.acquire("client", 10, 60, 10, 1, now=690.0) == 5
+    
+    def test_tables_on_one_path_share_counters(self, table, tmp_path):
+        """Two workers mapping the same file draw from the same limit."""
+        other = SharedWindowTable(str(tmp_path / "ratelimit"), slots=64)
+        assert table.acquire("client", 2, 60, 1, 1, now=600.0) == 1
+        assert other.acquire("client", 2, 60, 1, 1, now=600.0) == 1
+        assert table.acquire("client", 2, 60, 1, 1, now=600.0) == 0
+        assert other.window("client", 60, now=600.0) == (0, 2)
+    
+    def test_fixed_window_counters(self, table):
+        """Counters add up within a window and start over in the next one."""
+        assert table.incr("client", 60, 1, now=600.0) == 1
+        assert table.incr("client", 60, 2, now=610.0) == 3
+        assert table.counter("client", now=650.0) == (3, 660)
+        assert table.counter("client", now=660.0) == (0, 660.0)
+        assert table.incr("client", 60, 1, now=665.0) == 1
+        assert table.counter("other", now=665.0) == (0, 665.0)
+    
+    def test_clear_resets_a_key(self, table):
+        table.acquire("client", 2, 60, 2, 1, now=600.0)
+        table.clear("client")
+        assert table.window("client", 60, now=600.0) == (0, 0)
+
+class TestSlidingWindowEngine:
+    """Test token leasing and the limits storage adapter."""
+    
+    def test_leases_avoid_a_call_per_request(self, table):
+        """Generous limits are served from a local lease between remote calls."""
+        engine = SlidingWindowEngine(None, table, lease_size=5, lease_min_limit=10)
+        results = [engine.acquire("client", 10, 60) for _ in range(12)]
+        
+        assert results == [True] * 10 + [False] * 2
+        assert engine.stats["fallback_calls"] == 4
+        assert engine.stats["lease_hits"] == 8
+    
+    def test_small_limits_are_not_leased(self, table):
+        """Strict limits such as logins take exactly one token per request."""
+        engine = SlidingWindowEngine(None, table, lease_size=5, lease_min_limit=100)
+        assert [engine.acquire("login", 3, 60) for _ in range(4)] == [True, True, True, False]
+        assert engine.stats["lease_hits"] == 0
+    
+    def test_storage_backs_the_sliding_window_strategy(self, table, monkeypatch):
+        """The limits strategy used by slowapi runs on the engine."""
+        engine = SlidingWindowEngine(None, table, lease_size=1)
+        monkeypatch.setattr(rate_limiter, "rate_limit_engine", engine)
+        strategy = SlidingWindowCounterRateLimiter(SlidingWindowStorage())
+        item = parse("2/minute")
+        
+        assert strategy.hit(item, "client") is True
+        assert strategy.hit(item, "client") is True
+        assert strategy.hit(item, "client") is False
+        assert strategy.get_window_stats(item, "client").remaining == 0
+    
+    def test_storage_backs_the_fixed_window_strategy(self, table, monkeypatch):
+        engine = SlidingWindowEngine(None, table)
+        monkeypatch.setattr(rate_limiter, "rate_limit_engine", engine)
+        strategy = FixedWindowRateLimiter(SlidingWindowStorage())
+        item = parse("2/minute")
+        
+        assert [strategy.hit(item, "client") for _ in range(3)] == [True, True, False]
+        stats = strategy.get_window_stats(item, "client")
+        assert stats.remaining == 0
+        assert stats.reset_time > 0
+        strategy.clear(item, "client")
+        assert strategy.hit(item, "client") is True
+    
+    def test_stats_are_counted_across_threads(self, table):
+        engine = SlidingWindowEngine(None, table, lease_size=1)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: engine.acquire("client", 1000, 60), range(400)))
+        
+        assert all(results)
+        assert engine.stats["fallback_calls"] == 400
@@ -2,15 +2,15 @@ from sqlalchemy import text
 from database import engine
 
 def verify_database_structure():
-    """Verify all 13 tables are created correctly with proper structure and data"""
+    """Verify all 14 tables are created correctly with proper structure and data"""
     conn = engine.connect()
     
     try:
         print("🔍 Verifying database structure...\n")
         
-        # Expected 13 tables
+        # Expected 14 tables
         expected_tables = {
-            'documents', 'investor_interests', 'land_sections', 'lands',
+            'document_blobs', 'documents', 'investor_interests', 'land_sections', 'lands',
             'lu_energy_type', 'lu_roles', 'lu_status', 'lu_task_status',
             'section_definitions', 'task_history', 'tasks', 'user', 'user_roles'
         }
@@ -117,8 +117,8 @@ def verify_database_structure():
             print(f"    ✓ {view[0]}")
         
         # Final verification
-        if len(actual_tables) == 13 and not missing_tables:
-            print("\n🎉 SUCCESS: All 13 tables created successfully!")
+        if len(actual_tables) == 14 and not missing_tables:
+            print("\n🎉 SUCCESS: All 14 tables created successfully!")
             print("✅ Database structure matches the schema requirements")
             print("✅ All seed data inserted correctly")
             print("✅ Foreign key constraints established")